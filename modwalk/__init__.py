@@ -18,20 +18,140 @@ if TYPE_CHECKING:
     import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
 
 from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
-from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
-from future.standard_library import install_aliases
-install_aliases()
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+    from future.standard_library import install_aliases
+    install_aliases()
+
+if TYPE_CHECKING:
+    from .batch import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .checkpoint import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .client import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .content import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .coop import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .daemon import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .distrib import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .fingerprint import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .index import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .installed import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .memprof import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .memo import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .modwalk import *  # noqa: F401,F403; pylint: disable=wildcard-import
+    from .order import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .persist import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .precompile import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .progress import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .records import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .remote import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .sample import *  # noqa: F401,F403 # pylint: disable=wildcard-import
+    from .symbols import *  # noqa: F401,F403 # pylint: disable=wildcard-import
 
 # ---- Imports ---------------------------------------------------------
 
+import importlib as _importlib
 import logging as _logging
+import sys as _sys
 
-from .main import *  # noqa: F401,F403 # pylint: disable=wildcard-import
-from .modwalk import *  # noqa: F401,F403; pylint: disable=wildcard-import
 from .version import __version__  # noqa: F401
 
+# This shares its name with its sub-module, so bind it now, rather than on
+# first access, or which of the two modwalk.precompile is would depend
+# on what was imported first
+from .precompile import precompile  # noqa: F401
+
 # ---- Data ------------------------------------------------------------
 
 __all__ = ()
 
 LOGGER = _logging.getLogger(__name__)
+
+# Where each name exported by a sub-module (via its __all__) lives; they
+# are imported on first access, so "import modwalk" costs no more than
+# the standard library modules it needs (in particular, not Twisted,
+# which only coop, daemon, distrib, and main need)
+_EXPORTS = {
+    'batched': 'batch',
+    'perbatch': 'batch',
+    'Checkpoint': 'checkpoint',
+    'request': 'client',
+    'ContentFilter': 'content',
+    'coopconsume': 'coop',
+    'WalkServer': 'daemon',
+    'Coordinator': 'distrib',
+    'ResultFeed': 'distrib',
+    'WalkResult': 'distrib',
+    'WorkQueue': 'distrib',
+    'WorkerFactory': 'distrib',
+    'clientdesc': 'distrib',
+    'spawnworker': 'distrib',
+    'changed': 'fingerprint',
+    'filedigest': 'fingerprint',
+    'fingerprints': 'fingerprint',
+    'loadfingerprints': 'fingerprint',
+    'savefingerprints': 'fingerprint',
+    'ModuleIndex': 'index',
+    'ModuleRecord': 'index',
+    'installedspecs': 'installed',
+    'MemoryProfile': 'memprof',
+    'MemoryUsage': 'memprof',
+    'CACHE_SIZE_DFLT': 'memo',
+    'ResultCache': 'memo',
+    'memoized': 'memo',
+    'ModuleProxy': 'modwalk',
+    'modgen': 'modwalk',
+    'scannames': 'modwalk',
+    'submodnames': 'modwalk',
+    'BreadthFirst': 'order',
+    'CheapestFirst': 'order',
+    'DepthFirst': 'order',
+    'Frontier': 'order',
+    'ImportTimes': 'order',
+    'SortedByName': 'order',
+    'VISIT_ORDERS': 'order',
+    'frontierfactory': 'order',
+    'dumpcompact': 'persist',
+    'loadcompact': 'persist',
+    'sourcefiles': 'precompile',
+    'Progress': 'progress',
+    'ProgressStatus': 'progress',
+    'estimate': 'progress',
+    'STATUS_FAILED': 'records',
+    'STATUS_LOADED': 'records',
+    'STATUS_PROXIED': 'records',
+    'WalkRecord': 'records',
+    'WalkTable': 'records',
+    'AgentRecord': 'remote',
+    'walkinterpreter': 'remote',
+    'walkinterpreters': 'remote',
+    'Sample': 'sample',
+    'SymbolIndex': 'symbols',
+    'SymbolRef': 'symbols',
+}
+
+# ---- Functions -------------------------------------------------------
+
+# ======================================================================
+def _export(name):
+    # type: (typing.Text) -> typing.Any
+    value = getattr(_importlib.import_module('.' + _EXPORTS[name], __name__), name)
+    globals()[name] = value
+
+    return value
+
+# ---- Initialization --------------------------------------------------
+
+if _sys.version_info >= (3, 7):
+    def __getattr__(name):
+        # type: (typing.Text) -> typing.Any
+        if name not in _EXPORTS:
+            raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+        return _export(name)
+
+    def __dir__():
+        # type: (...) -> typing.List[typing.Text]
+        return sorted(set(globals()) | set(_EXPORTS))
+else:  # no module __getattr__ (PEP 562), so import everything now
+    for _name in _EXPORTS:
+        _export(_name)
@@ -0,0 +1,160 @@
+# -*- encoding: utf-8; test-case-name: tests.test_remote -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+# This runs inside other interpreters (see modwalk.remote), which may not
+# have modwalk (or future) installed, so it sticks to the standard
+# library and is run as a script (its source is passed with -c)
+
+# ---- Imports -----------------------------------------------------------
+
+import importlib
+import json
+import os
+import pkgutil
+import re
+import sys
+
+try:
+    from importlib.machinery import all_suffixes
+except ImportError:  # py2
+    import imp
+
+    def all_suffixes():
+        # type: (...) -> typing.List[typing.Text]
+        return [suffix for suffix, _, _ in imp.get_suffixes()]
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+# These mirror those in modwalk.modwalk, so that the agent finds the
+# same candidates as submodnames does
+_PKG_MOD = '__init__'
+
+_PYCACHE_DIR = '__pycache__'
+
+_RE_MOD_NAME = r'^[A-Za-z_][0-9A-Za-z_]*$'
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def main(
+        argv=None,  # type: typing.Optional[typing.Sequence[typing.Text]]
+):  # type: (...) -> int
+    # Expects a single argument, a JSON object with "mod_specs" (a list of
+    # [name, recurse] pairs) and optionally "path" (entries to put at the
+    # front of sys.path), and writes one compact JSON array per module
+    # walked to stdout (see walk)
+    argv = sys.argv[1:] if argv is None else argv
+    args = json.loads(argv[0])
+    sys.path[0:0] = args.get('path', ())
+
+    # Keep what imported modules write (even from C) out of the records
+    out = os.fdopen(os.dup(1), 'w')
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    for record in walk(args['mod_specs']):
+        out.write(json.dumps(record, separators=(',', ':')))
+        out.write('\n')
+        out.flush()
+
+    out.close()
+
+    return 0
+
+# ========================================================================
+def walk(
+        mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Text, bool]]
+):  # type: (...) -> typing.Iterator[typing.List[typing.Any]]
+    # Imports each module in mod_specs (and, where recurse is true, the
+    # sub-modules and sub-packages of packages, depth first, in order of
+    # name), and generates [name, path, is_package, error] for each,
+    # where path and error may be None
+    stack = [(name, bool(recurse)) for name, recurse in reversed(list(mod_specs))]
+    seen = set()
+
+    while stack:
+        name, recurse = stack.pop()
+
+        if name in seen:
+            continue
+
+        seen.add(name)
+
+        try:
+            mod = importlib.import_module(name)
+        except (Exception, SystemExit) as exc:  # pylint: disable=broad-except
+            yield [name, None, 0, '{}: {}'.format(type(exc).__name__, exc)]
+
+            continue
+
+        search_path = getattr(mod, '__path__', None)
+        yield [name, getattr(mod, '__file__', None), int(search_path is not None), None]
+
+        if recurse \
+                and search_path is not None:
+            sub_names = sorted(name + '.' + sub_name for sub_name in _submodnames(search_path))
+            stack.extend((sub_name, recurse) for sub_name in reversed(sub_names))
+
+# ========================================================================
+def _submodnames(
+        search_path,  # type: typing.Iterable[typing.Text]
+):  # type: (...) -> typing.Set[typing.Text]
+    # A stdlib-only port of modwalk.modwalk.submodnames (including
+    # directories without an __init__ module, i.e., namespace packages,
+    # which pkgutil.iter_modules skips), except that entries that aren't
+    # directories (e.g., inside zip archives) are left to pkgutil
+    suffixes = sorted(set(all_suffixes()), key=len, reverse=True)
+    candidates = set()
+
+    for path_entry in search_path:
+        if not os.path.isdir(path_entry):
+            candidates.update(sub_name for _, sub_name, _ in pkgutil.iter_modules([path_entry]))
+
+            continue
+
+        try:
+            ent_names = os.listdir(path_entry)
+        except OSError:
+            continue
+
+        for ent_name in ent_names:
+            for suffix in suffixes:
+                if ent_name.endswith(suffix):
+                    ent_base = ent_name[:-len(suffix)]
+
+                    if ent_base != _PKG_MOD \
+                            and re.search(_RE_MOD_NAME, ent_base):
+                        candidates.add(ent_base)
+
+                    break
+            else:
+                if ent_name != _PYCACHE_DIR \
+                        and re.search(_RE_MOD_NAME, ent_name) \
+                        and os.path.isdir(os.path.join(path_entry, ent_name)):
+                    candidates.add(ent_name)
+
+    return candidates
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# -*- encoding: utf-8; test-case-name: tests.test_batch -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import timeit
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'batched',
+    'perbatch',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def batched(
+        iterable,  # type: typing.Iterable[typing.Any]
+        size,  # type: int
+        interval=None,  # type: typing.Optional[float]
+        clock=timeit.default_timer,  # type: typing.Callable[[], float]
+):  # type: (...) -> typing.Iterator[typing.List[typing.Any]]
+    """
+    A pipeline stage that generates the items of ``iterable`` in lists of
+    ``size``. If ``interval`` is provided, a list is also generated as
+    soon as an item arrives at least ``interval`` seconds (according to
+    ``clock``) after the first one in the list, so slow walks still
+    deliver regularly. The last list may be short.
+
+    >>> list(batched(range(7), 3))
+    [[0, 1, 2], [3, 4, 5], [6]]
+    """
+    if size < 1:
+        raise ValueError('size must be at least 1 (not {})'.format(size))
+
+    batch = []  # type: typing.List[typing.Any]
+    deadline = None  # type: typing.Optional[float]
+
+    for item in iterable:
+        batch.append(item)
+
+        if interval is not None \
+                and deadline is None:
+            deadline = clock() + interval
+
+        if len(batch) >= size \
+                or deadline is not None and clock() >= deadline:
+            yield batch
+            batch = []
+            deadline = None
+
+    if batch:
+        yield batch
+
+# ========================================================================
+def perbatch(
+        callback,  # type: typing.Callable[..., typing.Any]
+        *args,  # type: typing.Any
+        **kw  # type: typing.Any
+):  # type: (...) -> typing.Callable[[typing.Iterable[typing.List[typing.Any]]], typing.Iterator[typing.Any]]
+    """
+    Adapts ``callback`` (which takes a list of items, followed by
+    ``args`` and ``kw``) into a callback for a chain fed by
+    :func:`batched`. The returned callable lazily calls ``callback`` once
+    per list and generates its results, which may be
+    :class:`~twisted.internet.defer.Deferred`\\ s (e.g., for writes to a
+    database or remote service).
+
+    >>> list(perbatch(len)(batched(range(7), 3)))
+    [3, 3, 1]
+    """
+    def _perbatch(batches):
+        # type: (typing.Iterable[typing.List[typing.Any]]) -> typing.Iterator[typing.Any]
+        for batch in batches:
+            yield callback(batch, *args, **kw)
+
+    return _perbatch
@@ -0,0 +1,183 @@
+# -*- encoding: utf-8; test-case-name: tests.test_checkpoint -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import io
+import logging
+import os
+
+from .persist import (
+    dumpcompact,
+    loadcompact,
+)
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'Checkpoint',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 1
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class Checkpoint(object):
+    """
+    Periodically saves the state of a :func:`~modwalk.modwalk.modgen` walk
+    (its pending frontier and the names of the modules it has already
+    delivered) to ``path``, at most once every ``interval`` delivered
+    modules. :meth:`load` recovers that state so a walk can be resumed.
+
+    Only names are saved, since what is delivered is just the modules
+    themselves (anything derived from them is up to the callbacks that
+    consume the walk), and a name is all it takes to skip a module.
+
+    In between saves, the name of each module is also appended to a
+    small journal (``path`` with ``.inflight`` added) as the walk gets to
+    it. If the walk is cut short by something that kills the interpreter
+    (rather than by an exception), the last one is the likely culprit, so
+    :meth:`load` treats it as :attr:`failed` rather than visiting it
+    again.
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            path,  # type: typing.Text
+            interval=1000,  # type: int
+    ):  # type: (...) -> None
+        if interval < 1:
+            raise ValueError('interval must be at least 1 (not {})'.format(interval))
+
+        self.path = path
+        self.interval = interval
+        self.failed = set()  # type: typing.Set[typing.Text]
+        self._journal_path = path + '.inflight'
+        self._delivered_count = 0
+        self._saved_count = 0
+
+    # ---- Public methods ------------------------------------------------
+
+    def load(self):
+        # type: (...) -> typing.Tuple[typing.List[typing.Tuple[typing.Text, bool]], typing.Set[typing.Text]]
+        """
+        Returns ``(mod_specs, seen)`` from the last save, suitable for
+        passing back to :func:`~modwalk.modwalk.modgen`. Modules in
+        ``mod_specs`` are names (imported only when visited). ``seen``
+        includes those that are :attr:`failed`.
+        """
+        state = loadcompact(self.path)
+
+        if state.get('version') != _FORMAT_VERSION:
+            raise ValueError('"{}" has unsupported checkpoint version {!r}'.format(self.path, state.get('version')))
+
+        seen = set(state['delivered'])
+        self.failed = set(state.get('failed', ()))
+
+        try:
+            with io.open(self._journal_path, encoding='utf-8') as f:
+                in_flight = f.read().split()
+        except (IOError, OSError):
+            in_flight = []
+
+        if in_flight \
+                and in_flight[-1] not in seen:
+            _LOGGER.warning('module "%s" was in flight when the walk was interrupted (skipping)', in_flight[-1])
+            self.failed.add(in_flight[-1])
+
+        mod_specs = [(name, bool(recurse)) for name, recurse in state['frontier'] if name not in self.failed]
+        self._delivered_count = self._saved_count = len(seen)
+        _LOGGER.info('resuming from "%s" (%d delivered, %d failed, %d pending)', self.path, len(seen), len(self.failed), len(mod_specs))
+
+        return mod_specs, seen | self.failed
+
+    def save(
+            self,
+            mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+            seen,  # type: typing.Iterable[typing.Text]
+    ):  # type: (...) -> None
+        """
+        Saves ``mod_specs`` (the frontier, whose modules may be module
+        objects or names) and ``seen`` unconditionally.
+        """
+        state = {
+            'version': _FORMAT_VERSION,
+            'frontier': [(getattr(mod, '__name__', mod), int(bool(recurse))) for mod, recurse in mod_specs],
+            'delivered': sorted(set(seen) - self.failed),
+            'failed': sorted(self.failed),
+        }
+
+        # Nothing is in flight between modules, so the journal is done
+        self.stopped()
+
+        dumpcompact(state, self.path)
+        self._saved_count = self._delivered_count
+        _LOGGER.debug('saved checkpoint to "%s" (%d delivered, %d pending)', self.path, len(state['delivered']), len(state['frontier']))
+
+    def started(self, mod_name):
+        # type: (typing.Text) -> None
+        """
+        Called by :func:`~modwalk.modwalk.modgen` as it gets to
+        ``mod_name`` (i.e., before importing it, if it does), so that
+        :meth:`load` can tell which module was in flight if the walk is
+        interrupted.
+        """
+        with io.open(self._journal_path, 'a', encoding='utf-8') as f:
+            f.write(u'{}\n'.format(mod_name))
+
+    def stopped(self):
+        # type: (...) -> None
+        """
+        Called by :func:`~modwalk.modwalk.modgen` when the walk stops
+        without crashing (i.e., it finishes, or is closed or interrupted
+        by an exception), so that :meth:`load` doesn't mistake the last
+        module for the culprit.
+        """
+        try:
+            os.remove(self._journal_path)
+        except OSError:
+            pass
+
+    def update(
+            self,
+            mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+            seen,  # type: typing.Sized
+    ):  # type: (...) -> None
+        """
+        Called by :func:`~modwalk.modwalk.modgen` whenever its state is
+        consistent. Saves if at least :attr:`interval` modules have been
+        delivered since the last save, or if the walk is complete (i.e.,
+        ``mod_specs`` is empty).
+        """
+        self._delivered_count = len(seen)
+
+        if self._delivered_count - self._saved_count >= self.interval \
+                or not mod_specs:
+            self.save(mod_specs, seen)  # type: ignore
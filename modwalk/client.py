@@ -0,0 +1,116 @@
+# -*- encoding: utf-8; test-case-name: tests.test_daemon -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+# This is the thin side of modwalk --serve, so it sticks to the standard
+# library (no Twisted, no argparse) to start quickly
+import json
+import socket
+import sys
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'request',
+)
+
+_USAGE = """
+usage: modwalk-client SOCKET [ARG ...]
+
+Send ARGs to the modwalk server listening on SOCKET (see modwalk --serve) and print its output.
+""".strip()
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def main():
+    # type: (...) -> None
+    sys.exit(_main())
+
+# ========================================================================
+def request(
+        socket_path,  # type: typing.Text
+        argv,  # type: typing.Iterable[typing.Text]
+        timeout=None,  # type: typing.Optional[float]
+):  # type: (...) -> typing.Dict[typing.Text, typing.Any]
+    """
+    Sends ``argv`` (command line arguments for ``modwalk``) to the server
+    listening on ``socket_path`` and returns its response, a ``dict``
+    with the exit ``status`` and anything written to ``stdout`` and
+    ``stderr``.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    chunks = []
+
+    try:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps({'argv': list(argv)}).encode('utf-8') + b'\n')
+
+        # The response is a single line
+        while True:
+            chunk = sock.recv(64 * 1024)
+
+            if not chunk:
+                break
+
+            chunks.append(chunk)
+
+            if chunk.endswith(b'\n'):
+                break
+    finally:
+        sock.close()
+
+    response = b''.join(chunks)
+
+    if not response.endswith(b'\n'):
+        raise EnvironmentError('connection to "{}" closed before a response was received'.format(socket_path))
+
+    return json.loads(response.decode('utf-8'))
+
+# ========================================================================
+def _main(
+        argv=None,  # type: typing.Optional[typing.Sequence[typing.Text]]
+):  # type: (...) -> int
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not argv \
+            or argv[0] in ('-h', '--help'):
+        print(_USAGE, file=sys.stdout if argv else sys.stderr)
+
+        return 0 if argv else 2
+
+    try:
+        response = request(argv[0], argv[1:])
+    except (EnvironmentError, ValueError) as exc:
+        print('modwalk-client: {}'.format(exc), file=sys.stderr)
+
+        return 2
+
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+
+    return response['status']
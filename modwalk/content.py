@@ -0,0 +1,190 @@
+# -*- encoding: utf-8; test-case-name: tests.test_content -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import mmap
+
+try:
+    from concurrent import futures as _futures
+    from importlib import machinery as _machinery
+except ImportError:  # py2
+    _futures = None  # type: ignore
+    _machinery = None  # type: ignore
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'ContentFilter',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_SOURCE_EXT = '.py'
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class ContentFilter(object):
+    """
+    A ``prefilter`` for :func:`~modwalk.modwalk.modgen` that skips
+    discovered modules whose source doesn't match any of ``predicates``
+    (each of which is either ``bytes`` to look for, or a compiled
+    ``bytes`` regular expression to search for), so that they are never
+    imported. Sources are memory-mapped rather than read, and checked
+    using up to ``jobs`` threads (a handful per CPU by default).
+
+    Packages are always visited (so that what's in them can be checked),
+    as are modules whose source can't be checked (e.g., extension
+    modules).
+
+    >>> import re
+    >>> content_filter = ContentFilter([b'@register', re.compile(br'^from \\.registry import', re.M)])
+    >>> content_filter.matches(b'@register\\ndef f(): pass\\n'), content_filter.matches(b'from .registry import add\\n'), content_filter.matches(b'register = None\\n')
+    (True, True, False)
+    >>> content_filter.close()
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            predicates,  # type: typing.Iterable[typing.Union[bytes, typing.Pattern[bytes]]]
+            jobs=None,  # type: typing.Optional[int]
+    ):  # type: (...) -> None
+        self._predicates = []  # type: typing.List[typing.Union[bytes, typing.Pattern[bytes]]]
+
+        for predicate in predicates:
+            if not isinstance(getattr(predicate, 'pattern', predicate), bytes):
+                raise TypeError('predicates must be bytes or compiled bytes patterns (not {!r})'.format(predicate))
+
+            self._predicates.append(predicate)
+
+        if not self._predicates:
+            raise ValueError('at least one predicate is required')
+
+        self._jobs = jobs
+        self._executor = None  # type: typing.Any
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __call__(
+            self,
+            names,  # type: typing.List[typing.Text]
+            search_path,  # type: typing.List[typing.Text]
+    ):  # type: (...) -> typing.List[typing.Text]
+        if _machinery is None:
+            return names
+
+        args = [(name, search_path) for name in names]
+
+        if self._executor is None \
+                and _futures is not None \
+                and self._jobs != 1:
+            self._executor = _futures.ThreadPoolExecutor(max_workers=self._jobs)
+
+        if self._executor is None \
+                or len(args) < 2:
+            keeps = map(self._keep, args)
+        else:
+            keeps = self._executor.map(self._keep, args)
+
+        return [name for name, keep in zip(names, keeps) if keep]
+
+    # ---- Public methods ------------------------------------------------
+
+    def close(self):
+        # type: (...) -> None
+        """
+        Stops any threads used for checking.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def matches(self, content):
+        # type: (typing.Any) -> bool
+        """
+        Returns whether ``content`` (``bytes``, or anything else that
+        supports the buffer protocol, like an :class:`~mmap.mmap`)
+        matches any of the predicates.
+        """
+        for predicate in self._predicates:
+            if isinstance(predicate, bytes):
+                if content.find(predicate) >= 0:
+                    return True
+            elif predicate.search(content) is not None:
+                return True
+
+        return False
+
+    def matchesfile(self, path):
+        # type: (typing.Text) -> bool
+        """
+        Returns whether the contents of the file at ``path`` match any of
+        the predicates.
+        """
+        with open(path, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mapped
+                return self.matches(b'')
+
+            try:
+                return self.matches(mm)
+            finally:
+                mm.close()
+
+    # ---- Private methods -----------------------------------------------
+
+    def _keep(self, arg):
+        # type: (typing.Tuple[typing.Text, typing.List[typing.Text]]) -> bool
+        mod_name, search_path = arg
+
+        try:
+            spec = _machinery.PathFinder.find_spec(mod_name, search_path)
+        except Exception:  # pylint: disable=broad-except
+            # Leave it for the walk to report
+            return True
+
+        if spec is None \
+                or spec.submodule_search_locations is not None \
+                or not spec.has_location \
+                or not spec.origin.endswith(_SOURCE_EXT):
+            return True
+
+        try:
+            keep = self.matchesfile(spec.origin)
+        except EnvironmentError as exc:
+            _LOGGER.debug('unable to read "%s" (%s)', spec.origin, exc)
+
+            return True
+
+        if not keep:
+            _LOGGER.debug('"%s" does not match (skipping)', spec.origin)
+
+        return keep
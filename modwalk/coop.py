@@ -0,0 +1,146 @@
+# -*- encoding: utf-8; test-case-name: tests.test_coop -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import timeit
+
+from twisted.internet import defer as t_i_defer
+from twisted.internet import task as t_i_task
+from twisted.python import failure as t_p_failure
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'coopconsume',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+TIME_SLICE_DFLT = 0.01
+CONCURRENCY_DFLT = 10
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def coopconsume(
+        iterable,  # type: typing.Iterable[typing.Any]
+        time_slice=TIME_SLICE_DFLT,  # type: float
+        concurrency=CONCURRENCY_DFLT,  # type: int
+        reactor=None,  # type: typing.Any
+        ready=None,  # type: typing.Optional[typing.Callable[[], typing.Optional[t_i_defer.Deferred]]]
+):  # type: (...) -> t_i_defer.Deferred
+    """
+    Consumes ``iterable`` (e.g., a callback pipeline fed by
+    :func:`~modwalk.modwalk.modgen`) cooperatively, returning to the
+    reactor at least once every ``time_slice`` seconds so that other work
+    (network I/O, timers, etc.) can proceed. Any
+    :class:`~twisted.internet.defer.Deferred` generated by ``iterable`` is
+    waited on, with at most ``concurrency`` outstanding at a time.
+
+    Returns a :class:`~twisted.internet.defer.Deferred` that fires with
+    ``None`` once ``iterable`` is exhausted and every generated
+    :class:`~twisted.internet.defer.Deferred` has fired, or errs back with
+    the first failure (from ``iterable`` or from one of those
+    :class:`~twisted.internet.defer.Deferred`\\ s).
+
+    If given, ``ready`` is called before each item is taken from
+    ``iterable``, and if it returns a
+    :class:`~twisted.internet.defer.Deferred` (e.g., because the walk
+    feeding ``iterable`` is waiting on results from elsewhere; see
+    :meth:`~modwalk.distrib.ResultFeed.whenReady`), that is waited on
+    first.
+    """
+    if concurrency < 1:
+        raise ValueError('concurrency must be at least 1 (not {})'.format(concurrency))
+
+    if reactor is None:
+        from twisted.internet import reactor  # pylint: disable=redefined-outer-name
+
+    cooperator = t_i_task.Cooperator(
+        terminationPredicateFactory=lambda: _timeslice(time_slice),
+        scheduler=lambda work: reactor.callLater(0, work),
+    )
+
+    d = cooperator.cooperate(_drain(iter(iterable), concurrency, ready)).whenDone()
+    d.addCallback(lambda _: None)
+
+    return d
+
+# ========================================================================
+def _drain(
+        iterator,  # type: typing.Iterator[typing.Any]
+        concurrency,  # type: int
+        ready=None,  # type: typing.Optional[typing.Callable[[], typing.Optional[t_i_defer.Deferred]]]
+):  # type: (...) -> typing.Iterator[typing.Optional[t_i_defer.Deferred]]
+    pending = set()  # type: typing.Set[t_i_defer.Deferred]
+    failures = []  # type: typing.List[typing.Any]
+
+    def _done(_result, _d):
+        pending.discard(_d)
+
+        if isinstance(_result, t_p_failure.Failure):
+            failures.append(_result)
+
+    def _anydone():
+        return t_i_defer.DeferredList(list(pending), fireOnOneCallback=True)
+
+    while True:
+        if ready is not None:
+            waiting = ready()
+
+            if waiting is not None:
+                yield waiting
+
+        try:
+            result = next(iterator)
+        except StopIteration:
+            break
+
+        if isinstance(result, t_i_defer.Deferred):
+            pending.add(result)
+            result.addBoth(_done, result)
+
+            while len(pending) >= concurrency \
+                    and not failures:
+                yield _anydone()
+
+        if failures:
+            failures[0].raiseException()
+
+        yield None
+
+    while pending \
+            and not failures:
+        yield _anydone()
+
+    if failures:
+        failures[0].raiseException()
+
+# ========================================================================
+def _timeslice(time_slice):
+    # type: (float) -> typing.Callable[[], bool]
+    deadline = timeit.default_timer() + time_slice
+
+    return lambda: timeit.default_timer() >= deadline
@@ -0,0 +1,295 @@
+# -*- encoding: utf-8; test-case-name: tests.test_daemon -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import importlib
+import io
+import json
+import logging
+import os
+import sys
+import traceback
+
+from twisted.internet import defer as t_i_defer
+from twisted.internet import protocol as t_i_protocol
+from twisted.protocols import basic as t_p_basic
+
+from .modwalk import (
+    logimporterror,
+    modgen,
+)
+
+try:
+    from importlib.machinery import EXTENSION_SUFFIXES as _EXTENSION_SUFFIXES
+except ImportError:  # py2
+    _EXTENSION_SUFFIXES = ('.pyd', '.so')
+
+try:
+    from importlib import reload as _reload
+except ImportError:  # py2, where it's a builtin
+    _reload = reload  # type: ignore # noqa: F821 # pylint: disable=undefined-variable
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'WalkServer',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Requests and responses are single lines of JSON, and responses carry
+# everything the callback chain printed
+_MAX_LINE_BYTES = 64 * 1024 * 1024
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class _ServeProtocol(t_p_basic.LineReceiver):
+
+    delimiter = b'\n'
+    MAX_LENGTH = _MAX_LINE_BYTES
+
+    # ---- Overrides -----------------------------------------------------
+
+    def lineReceived(self, line):
+        try:
+            request = json.loads(line.decode('utf-8'))
+            argv = [str(arg) for arg in request['argv']]
+        except (KeyError, TypeError, ValueError):
+            self._respond({'status': 2, 'stdout': '', 'stderr': 'malformed request\n'})
+
+            return
+
+        d = self.factory.handle(argv)
+        d.addCallback(self._respond)
+
+    # ---- Private methods -----------------------------------------------
+
+    def _respond(self, response):
+        # type: (typing.Dict[typing.Text, typing.Any]) -> None
+        if self.transport is not None:
+            self.sendLine(json.dumps(response).encode('utf-8'))
+
+# ========================================================================
+class WalkServer(t_i_protocol.ServerFactory):
+    """
+    Serves walk requests (see :mod:`modwalk.client`) from a long-lived
+    process, so that modules stay imported (and discovered directories
+    stay listed) between requests. Each request is a list of command line
+    arguments, which is passed to ``walk``, along with :meth:`track` (a
+    pipeline stage ``walk`` must put in front of its callback chain).
+    ``walk`` returns a :class:`~twisted.internet.defer.Deferred` that fires
+    once the chain is done (or ``None`` if there was nothing to do).
+
+    Requests are handled one at a time, with anything written to
+    ``sys.stdout`` or ``sys.stderr`` in the meantime captured for the
+    response. Before each one, modules passed through :meth:`track` by
+    earlier requests are reloaded if their files have changed since (or
+    evicted from ``sys.modules`` if their files are gone).
+    """
+
+    protocol = _ServeProtocol
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            walk,  # type: typing.Callable[[typing.List[typing.Text], typing.Callable[[typing.Iterable[typing.Any]], typing.Iterator[typing.Any]]], typing.Optional[t_i_defer.Deferred]]
+    ):  # type: (...) -> None
+        self._walk = walk
+        self._lock = t_i_defer.DeferredLock()
+        self._mtimes = {}  # type: typing.Dict[typing.Text, typing.Tuple[typing.Text, typing.Optional[float]]]
+
+    # ---- Public methods ------------------------------------------------
+
+    def handle(self, argv):
+        # type: (typing.List[typing.Text]) -> t_i_defer.Deferred
+        """
+        Returns a :class:`~twisted.internet.defer.Deferred` that fires
+        with the response to ``argv`` (a JSON-serializable ``dict`` with
+        ``status``, ``stdout``, and ``stderr``) once it (and any requests
+        ahead of it) has been handled.
+        """
+        return self._lock.run(self._handle, argv)
+
+    def refresh(self):
+        # type: (...) -> typing.List[typing.Text]
+        """
+        Reloads (or evicts) tracked modules whose files have changed and
+        returns their names.
+        """
+        changed = []
+
+        for mod_name in sorted(self._mtimes):
+            path, mtime = self._mtimes[mod_name]
+            cur_mtime = _mtime(path)
+
+            if cur_mtime == mtime:
+                continue
+
+            changed.append(mod_name)
+            mod = sys.modules.get(mod_name)
+
+            if cur_mtime is None:
+                _LOGGER.info('"%s" is gone (evicting "%s")', path, mod_name)
+                del self._mtimes[mod_name]
+                sys.modules.pop(mod_name, None)
+
+                continue
+
+            self._mtimes[mod_name] = (path, cur_mtime)
+
+            if mod is None:
+                continue
+
+            if path.endswith(tuple(_EXTENSION_SUFFIXES)):
+                _LOGGER.warning('"%s" changed, but extension modules cannot be reloaded (restart to pick up changes)', path)
+
+                continue
+
+            _LOGGER.info('"%s" changed (reloading "%s")', path, mod_name)
+
+            try:
+                _reload(mod)
+            except Exception:  # pylint: disable=broad-except
+                logimporterror(_LOGGER, mod_name)
+                del self._mtimes[mod_name]
+                sys.modules.pop(mod_name, None)
+
+        if changed:
+            importlib.invalidate_caches()
+
+        return changed
+
+    def track(self, mods):
+        # type: (typing.Iterable[typing.Any]) -> typing.Iterator[typing.Any]
+        """
+        A pipeline stage that records the files of ``mods`` (so that
+        :meth:`refresh` can reload them when they change) and generates
+        them.
+        """
+        for mod in mods:
+            path = getattr(mod, '__file__', None)
+
+            if path:
+                self._mtimes[mod.__name__] = (path, _mtime(path))
+
+            yield mod
+
+    def warm(self, mod_specs):
+        # type: (typing.Iterable[typing.Tuple[typing.Any, bool]]) -> int
+        """
+        Walks ``mod_specs`` (without any callbacks), so the first
+        requests for them find everything already imported. Returns the
+        number of modules walked.
+        """
+        return sum(1 for _ in self.track(modgen(mod_specs)))
+
+    # ---- Private methods -----------------------------------------------
+
+    def _handle(self, argv):
+        # type: (typing.List[typing.Text]) -> t_i_defer.Deferred
+        self.refresh()
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        orig_stdout, orig_stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = _TextWriter(stdout), _TextWriter(stderr)
+
+        try:
+            d = t_i_defer.maybeDeferred(self._walk, argv, self.track)
+        except SystemExit as exc:
+            # E.g., from argparse, for --help or usage errors
+            d = t_i_defer.succeed(exc)
+
+        def _status(_arg):
+            if isinstance(_arg, SystemExit):
+                code = _arg.code
+
+                if code is None \
+                        or isinstance(code, int):
+                    return code or 0
+
+                print(code, file=sys.stderr)
+
+                return 1
+
+            return 0
+
+        def _failed(_failure):
+            if _failure.check(SystemExit):
+                return _status(_failure.value)
+
+            print(''.join(traceback.format_exception(_failure.type, _failure.value, _failure.getTracebackObject())), end='', file=sys.stderr)
+
+            return 1
+
+        def _response(_status):
+            sys.stdout, sys.stderr = orig_stdout, orig_stderr
+
+            return {
+                'status': _status,
+                'stdout': stdout.getvalue(),
+                'stderr': stderr.getvalue(),
+            }
+
+        d.addCallbacks(_status, _failed)
+        d.addCallback(_response)
+
+        return d
+
+# ========================================================================
+class _TextWriter(object):
+    # Accepts both native (py2) and text strings, like sys.stdout does,
+    # and passes them to a text stream
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(self, stream):
+        # type: (io.StringIO) -> None
+        self._stream = stream
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __getattr__(self, name):
+        # type: (typing.Text) -> typing.Any
+        return getattr(self._stream, name)
+
+    # ---- Public methods ------------------------------------------------
+
+    def write(self, s):
+        # type: (typing.Any) -> int
+        if isinstance(s, bytes):
+            s = s.decode('utf-8', 'replace')
+
+        return self._stream.write(str(s))
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def _mtime(path):
+    # type: (typing.Text) -> typing.Optional[float]
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
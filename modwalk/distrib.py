@@ -0,0 +1,679 @@
+# -*- encoding: utf-8; test-case-name: tests.test_distrib -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import collections
+import importlib
+import logging
+import os
+import sys
+
+from twisted.internet import defer as t_i_defer
+from twisted.internet import error as t_i_error
+from twisted.internet import protocol as t_i_protocol
+from twisted.protocols import amp as t_p_amp
+from twisted.python import failure as t_p_failure
+
+from .modwalk import (
+    logimporterror,
+    submodnames,
+)
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'Coordinator',
+    'ResultFeed',
+    'WalkResult',
+    'WorkQueue',
+    'WorkerFactory',
+    'clientdesc',
+    'spawnworker',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Stay comfortably below AMP's per-value limit (65535 bytes)
+_CHUNK_BYTES = 60000
+
+MAX_ATTEMPTS_DFLT = 3
+
+WORKER_TIMEOUT_DFLT = 60.0
+
+# How long a ResultFeed waits on the reactor at a time when it has to
+_FEED_WAIT_SECS = 0.05
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class WalkResult(collections.namedtuple('WalkResult', ('name', 'path', 'error', 'worker'))):
+    """
+    The outcome of visiting the module ``name`` remotely. ``error`` is
+    ``None`` if (and only if) the module was imported successfully.
+    ``__name__`` is an alias for ``name``, so callbacks written for module
+    objects work on these, too.
+    """
+
+    __slots__ = ()
+
+    @property
+    def __name__(self):  # type: ignore
+        # type: (...) -> typing.Text
+        return self.name
+
+# ========================================================================
+class Visit(t_p_amp.Command):
+    # Coordinator -> worker: import (and, if recurse is true, discover the
+    # children of) a module; children are sent back via Discovered before
+    # this is answered
+    arguments = [
+        (b'name', t_p_amp.Unicode()),
+        (b'recurse', t_p_amp.Boolean()),
+    ]
+
+    response = [
+        (b'path', t_p_amp.Unicode(optional=True)),
+        (b'error', t_p_amp.Unicode(optional=True)),
+    ]
+
+# ========================================================================
+class Discovered(t_p_amp.Command):
+    # Worker -> coordinator: sub-modules found while visiting parent
+    arguments = [
+        (b'parent', t_p_amp.Unicode()),
+        (b'names', t_p_amp.ListOf(t_p_amp.Unicode())),
+    ]
+
+    requiresAnswer = False
+
+# ========================================================================
+class WorkQueue(object):
+    """
+    Pending ``(name, recurse)`` work units for a distributed walk. Each
+    worker has its own queue, which receives the sub-modules it discovers
+    (so it tends to import modules whose parents it has already imported).
+    A worker whose queue is empty takes from the shared queue (holding the
+    roots and any reclaimed work), and failing that, steals the oldest
+    (i.e., shallowest and likely largest) unit from the worker with the
+    most queued.
+
+    Units assigned to a worker that is removed before completing them are
+    reclaimed, unless they have already been attempted ``max_attempts``
+    times, in which case they are abandoned (see :meth:`remove`).
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Text, bool]]
+            max_attempts=MAX_ATTEMPTS_DFLT,  # type: int
+    ):  # type: (...) -> None
+        self.max_attempts = max_attempts
+        self._shared = collections.deque()  # type: typing.Deque[typing.Tuple[typing.Text, bool]]
+        self._local = {}  # type: typing.Dict[typing.Any, typing.Deque[typing.Tuple[typing.Text, bool]]]
+        self._assigned = {}  # type: typing.Dict[typing.Any, typing.Tuple[typing.Text, bool]]
+        self._attempts = collections.Counter()  # type: typing.Counter[typing.Text]
+        self._seen = set()  # type: typing.Set[typing.Text]
+        self.push(None, mod_specs)
+
+    # ---- Public methods ------------------------------------------------
+
+    def add(self, worker):
+        # type: (typing.Any) -> None
+        self._local.setdefault(worker, collections.deque())
+
+    def complete(self, worker):
+        # type: (typing.Any) -> typing.Tuple[typing.Text, bool]
+        """
+        Marks the unit assigned to ``worker`` as complete and returns it.
+        """
+        return self._assigned.pop(worker)
+
+    def done(self):
+        # type: (...) -> bool
+        return not self._shared \
+            and not self._assigned \
+            and not any(self._local.values())
+
+    def isidle(self, worker):
+        # type: (typing.Any) -> bool
+        return worker in self._local \
+            and worker not in self._assigned
+
+    def next(self, worker):
+        # type: (typing.Any) -> typing.Optional[typing.Tuple[typing.Text, bool]]
+        """
+        Assigns the next unit to ``worker`` and returns it, or returns
+        ``None`` if there is nothing left to assign.
+        """
+        assert self.isidle(worker)
+        local = self._local[worker]
+
+        if local:
+            mod_spec = local.popleft()
+        elif self._shared:
+            mod_spec = self._shared.popleft()
+        else:
+            victim = max(self._local, key=lambda w: len(self._local[w]))
+
+            if not self._local[victim]:
+                return None
+
+            mod_spec = self._local[victim].pop()
+            _LOGGER.debug('%s stole "%s" from %s', worker, mod_spec[0], victim)
+
+        self._assigned[worker] = mod_spec
+        self._attempts[mod_spec[0]] += 1
+
+        return mod_spec
+
+    def push(
+            self,
+            worker,  # type: typing.Any
+            mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Text, bool]]
+    ):  # type: (...) -> None
+        """
+        Queues ``mod_specs`` (discovered by ``worker``, or shared if
+        ``worker`` is ``None``). Units already queued are ignored.
+        """
+        queue = self._shared if worker is None else self._local[worker]
+        new_mod_specs = [mod_spec for mod_spec in mod_specs if mod_spec[0] not in self._seen]
+        self._seen.update(mod_spec[0] for mod_spec in new_mod_specs)
+        queue.extendleft(reversed(new_mod_specs))
+
+    def remove(self, worker):
+        # type: (typing.Any) -> typing.Optional[typing.Tuple[typing.Text, bool]]
+        """
+        Removes ``worker``, reclaiming its queued units and the one it was
+        assigned (if any). Returns the assigned unit if it was abandoned
+        (because it had been attempted too many times), ``None`` otherwise.
+        """
+        abandoned = None
+        self._shared.extend(self._local.pop(worker, ()))
+        mod_spec = self._assigned.pop(worker, None)
+
+        if mod_spec is not None:
+            if self._attempts[mod_spec[0]] >= self.max_attempts:
+                abandoned = mod_spec
+            else:
+                _LOGGER.info('reassigning "%s" (lost %s)', mod_spec[0], worker)
+                self._shared.appendleft(mod_spec)
+
+        return abandoned
+
+# ========================================================================
+class _CoordinatorProtocol(t_p_amp.AMP):
+
+    # ---- Overrides -----------------------------------------------------
+
+    def connectionMade(self):
+        super(_CoordinatorProtocol, self).connectionMade()
+        peer = self.transport.getPeer()
+
+        if hasattr(peer, 'port'):
+            self.peer_name = '{}:{}'.format(peer.host, peer.port)
+        else:
+            self.peer_name = 'local#{}'.format(id(self))
+
+        self.factory.workerjoined(self)
+
+    def connectionLost(self, reason):
+        super(_CoordinatorProtocol, self).connectionLost(reason)
+        self.factory.workerleft(self)
+
+    # ---- Responders ----------------------------------------------------
+
+    @Discovered.responder
+    def discovered(self, parent, names):
+        self.factory.discovered(self, parent, names)
+
+        return {}
+
+# ========================================================================
+class Coordinator(t_i_protocol.ServerFactory):
+    """
+    Hands out ``mod_specs`` (``(name, recurse)`` pairs) and their
+    discovered sub-modules to connected workers (see
+    :class:`WorkerFactory`), one module at a time, via a
+    :class:`WorkQueue`. Each :class:`WalkResult` is passed to ``onresult``
+    (if given) as it arrives. :meth:`whenDone` fires with the list of all
+    of them once the walk is complete, at which point the workers are
+    disconnected.
+
+    If ``timeout`` is given, and no worker is connected for that many
+    seconds (according to ``reactor``) while work is pending (e.g.,
+    because none ever connected, or because local workers could no
+    longer be respawned), the walk is given up, and :meth:`whenDone`
+    errs back with a :exc:`RuntimeError`.
+    """
+
+    protocol = _CoordinatorProtocol
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Text, bool]]
+            max_attempts=MAX_ATTEMPTS_DFLT,  # type: int
+            onresult=None,  # type: typing.Optional[typing.Callable[[WalkResult], None]]
+            timeout=None,  # type: typing.Optional[float]
+            reactor=None,  # type: typing.Any
+    ):  # type: (...) -> None
+        if reactor is None:
+            from twisted.internet import reactor  # pylint: disable=redefined-outer-name
+
+        self.queue = WorkQueue(mod_specs, max_attempts)
+        self.onresult = onresult
+        self.results = []  # type: typing.List[WalkResult]
+        self._workers = set()  # type: typing.Set[_CoordinatorProtocol]
+        self._waiting = []  # type: typing.List[t_i_defer.Deferred]
+        self._timeout = timeout
+        self._reactor = reactor
+        self._starving = None  # type: typing.Any
+        self._failure = None  # type: typing.Optional[t_p_failure.Failure]
+        self.finished = False
+
+    # ---- Overrides -----------------------------------------------------
+
+    def startFactory(self):
+        # type: (...) -> None
+        self._starve()
+
+    # ---- Public methods ------------------------------------------------
+
+    def discovered(self, worker, parent, names):
+        # type: (_CoordinatorProtocol, typing.Text, typing.Iterable[typing.Text]) -> None
+        _LOGGER.debug('%s discovered %d module(s) in "%s"', _peer(worker), len(names), parent)
+        self.queue.push(worker, ((name, True) for name in names))
+        self._dispatch()
+
+    def whenDone(self):
+        # type: (...) -> t_i_defer.Deferred
+        d = t_i_defer.Deferred()
+
+        if self._failure is not None:
+            d.errback(self._failure)
+        elif self.finished:
+            d.callback(self.results)
+        else:
+            self._waiting.append(d)
+
+        return d
+
+    def workerjoined(self, worker):
+        # type: (_CoordinatorProtocol) -> None
+        _LOGGER.info('worker %s joined', _peer(worker))
+        self._workers.add(worker)
+        self.queue.add(worker)
+
+        if self._starving is not None:
+            self._starving.cancel()
+            self._starving = None
+
+        self._dispatch()
+
+    def workerleft(self, worker):
+        # type: (_CoordinatorProtocol) -> None
+        if worker not in self._workers:
+            return
+
+        self._workers.discard(worker)
+        abandoned = self.queue.remove(worker)
+
+        if not self.finished:
+            _LOGGER.warning('worker %s left', _peer(worker))
+
+        if abandoned is not None:
+            self._record(WalkResult(abandoned[0], None, 'abandoned after {} failed attempt(s)'.format(self.queue.max_attempts), _peer(worker)))
+
+        self._dispatch()
+
+        if not self._workers:
+            self._starve()
+
+    # ---- Private methods -----------------------------------------------
+
+    def _dispatch(self):
+        # type: (...) -> None
+        if self.finished:
+            return
+
+        if self.queue.done():
+            self._finish()
+
+            return
+
+        for worker in list(self._workers):
+            if not self.queue.isidle(worker):
+                continue
+
+            mod_spec = self.queue.next(worker)
+
+            if mod_spec is None:
+                break
+
+            name, recurse = mod_spec
+            d = worker.callRemote(Visit, name=name, recurse=recurse)
+            d.addCallbacks(self._visited, self._visitfailed, callbackArgs=(worker, name), errbackArgs=(worker, name))
+
+    def _finish(
+            self,
+            failure=None,  # type: typing.Optional[t_p_failure.Failure]
+    ):  # type: (...) -> None
+        self.finished = True
+        self._failure = failure
+
+        if self._starving is not None:
+            self._starving.cancel()
+            self._starving = None
+
+        for worker in list(self._workers):
+            worker.transport.loseConnection()
+
+        waiting, self._waiting = self._waiting, []
+
+        for d in waiting:
+            if failure is None:
+                d.callback(self.results)
+            else:
+                d.errback(failure)
+
+    def _record(self, result):
+        # type: (WalkResult) -> None
+        self.results.append(result)
+
+        if self.onresult is not None:
+            self.onresult(result)
+
+    def _starve(self):
+        # type: (...) -> None
+        if self.finished \
+                or self._timeout is None \
+                or self._starving is not None:
+            return
+
+        def _starved():
+            self._starving = None
+            _LOGGER.error('no workers for %s second(s) (giving up)', self._timeout)
+            self._finish(t_p_failure.Failure(RuntimeError('no workers connected for {} second(s) with work still pending'.format(self._timeout))))
+
+        self._starving = self._reactor.callLater(self._timeout, _starved)
+
+    def _visited(self, response, worker, name):
+        if worker not in self._workers:
+            return
+
+        self.queue.complete(worker)
+        self._record(WalkResult(name, response.get('path'), response.get('error'), _peer(worker)))
+        self._dispatch()
+
+    def _visitfailed(self, failure, worker, name):
+        if failure.check(t_i_error.ConnectionDone, t_i_error.ConnectionLost, t_p_amp.ConnectionLost):
+            # workerleft takes care of reclaiming the unit
+            return
+
+        if worker not in self._workers:
+            return
+
+        self.queue.complete(worker)
+        self._record(WalkResult(name, None, failure.getErrorMessage(), _peer(worker)))
+        self._dispatch()
+
+# ========================================================================
+class ResultFeed(object):
+    """
+    An iterator over the :class:`WalkResult`\\ s given to :meth:`push`
+    (e.g., by a :class:`Coordinator`'s ``onresult``) as they arrive, so a
+    callback pipeline can consume a distributed walk while it is still
+    going. Iteration stops once :meth:`finish` is called and everything
+    pushed has been generated (or raises what :meth:`finish` was given).
+
+    A consumer that must not block should wait on :meth:`whenReady`
+    (e.g., via :func:`~modwalk.coop.coopconsume`'s ``ready``) before each
+    step. Where a step takes more than is ready (e.g., to fill a batch),
+    the feed runs ``reactor`` until the next result arrives.
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            reactor=None,  # type: typing.Any
+    ):  # type: (...) -> None
+        if reactor is None:
+            from twisted.internet import reactor  # pylint: disable=redefined-outer-name
+
+        self._reactor = reactor
+        self._results = collections.deque()  # type: typing.Deque[WalkResult]
+        self._waiting = []  # type: typing.List[t_i_defer.Deferred]
+        self._finished = False
+        self._failure = None  # type: typing.Optional[t_p_failure.Failure]
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __iter__(self):
+        # type: (...) -> ResultFeed
+        return self
+
+    def __next__(self):
+        # type: (...) -> WalkResult
+        while not self._results \
+                and not self._finished:
+            if not getattr(self._reactor, 'running', False):
+                raise RuntimeError('no result is ready, and the reactor isn\'t running to deliver one')
+
+            self._reactor.iterate(_FEED_WAIT_SECS)
+
+        if self._results:
+            return self._results.popleft()
+
+        if self._failure is not None:
+            self._failure.raiseException()
+
+        raise StopIteration
+
+    next = __next__  # py2
+
+    # ---- Public methods ------------------------------------------------
+
+    def finish(
+            self,
+            failure=None,  # type: typing.Optional[t_p_failure.Failure]
+    ):  # type: (...) -> None
+        self._finished = True
+        self._failure = failure
+        self._ready()
+
+    def push(self, result):
+        # type: (WalkResult) -> None
+        self._results.append(result)
+        self._ready()
+
+    def whenReady(self):
+        # type: (...) -> typing.Optional[t_i_defer.Deferred]
+        """
+        Returns ``None`` if the next step won't have to wait, or a
+        :class:`~twisted.internet.defer.Deferred` that fires once it
+        won't.
+        """
+        if self._results \
+                or self._finished:
+            return None
+
+        d = t_i_defer.Deferred()
+        self._waiting.append(d)
+
+        return d
+
+    # ---- Private methods -----------------------------------------------
+
+    def _ready(self):
+        # type: (...) -> None
+        waiting, self._waiting = self._waiting, []
+
+        for d in waiting:
+            d.callback(None)
+
+# ========================================================================
+class _WorkerProcessProtocol(t_i_protocol.ProcessProtocol):
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(self, onexit):
+        self._onexit = onexit
+
+    # ---- Overrides -----------------------------------------------------
+
+    def processEnded(self, reason):
+        if self._onexit is not None:
+            self._onexit(reason)
+
+# ========================================================================
+class _WorkerProtocol(t_p_amp.AMP):
+
+    # ---- Overrides -----------------------------------------------------
+
+    def connectionLost(self, reason):
+        super(_WorkerProtocol, self).connectionLost(reason)
+        self.factory.disconnected(reason)
+
+    # ---- Responders ----------------------------------------------------
+
+    @Visit.responder
+    def visit(self, name, recurse):
+        try:
+            mod = importlib.import_module(name)
+        except Exception as exc:  # pylint: disable=broad-except
+            logimporterror(_LOGGER, name)
+
+            return {'error': '{}: {}'.format(type(exc).__name__, exc)}
+
+        search_path = getattr(mod, '__path__', None)
+
+        if recurse \
+                and search_path:
+            mod_pfx = name + '.'
+            names = [mod_pfx + candidate for candidate in sorted(submodnames(search_path))]
+
+            for chunk in _chunks(names):
+                self.callRemote(Discovered, parent=name, names=chunk)
+
+        path = getattr(mod, '__file__', None)
+
+        return {} if path is None else {'path': path}
+
+# ========================================================================
+class WorkerFactory(t_i_protocol.ClientFactory):
+    """
+    Connects to a :class:`Coordinator` and imports each module it is
+    asked to visit. :meth:`whenDisconnected` fires once the coordinator
+    disconnects (i.e., when the walk is complete).
+    """
+
+    protocol = _WorkerProtocol
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(self):
+        # type: (...) -> None
+        self._disconnected = t_i_defer.Deferred()
+
+    # ---- Public methods ------------------------------------------------
+
+    def disconnected(self, reason):
+        if not self._disconnected.called:
+            self._disconnected.callback(None)
+
+    def whenDisconnected(self):
+        # type: (...) -> t_i_defer.Deferred
+        return self._disconnected
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def clientdesc(address):
+    # type: (typing.Any) -> typing.Text
+    """
+    Returns a client endpoint description for connecting to ``address``
+    (e.g., from a listening port's ``getHost()``).
+    """
+    if hasattr(address, 'port'):
+        host = address.host
+
+        if host in ('0.0.0.0', '::', ''):
+            host = '127.0.0.1'
+
+        return 'tcp:host={}:port={}'.format(host.replace(':', r'\:'), address.port)
+
+    return 'unix:path={}'.format(address.name.decode('utf-8') if isinstance(address.name, bytes) else address.name)
+
+# ========================================================================
+def spawnworker(
+        reactor,  # type: typing.Any
+        endpoint_desc,  # type: typing.Text
+        onexit=None,  # type: typing.Optional[typing.Callable[[typing.Any], None]]
+):  # type: (...) -> typing.Any
+    """
+    Spawns a local worker process (running ``modwalk --worker``) that
+    connects to ``endpoint_desc`` (a client endpoint description). Its
+    output is inherited. ``onexit`` (if given) is called with the reason
+    once it exits.
+    """
+    args = [
+        sys.executable,
+        '-c',
+        'from modwalk.main import main ; main()',
+        '--worker',
+        endpoint_desc,
+    ]
+
+    return reactor.spawnProcess(_WorkerProcessProtocol(onexit), args[0], args, env=os.environ, childFDs={0: 'w', 1: 1, 2: 2})
+
+# ========================================================================
+def _chunks(names):
+    # type: (typing.Iterable[typing.Text]) -> typing.Iterator[typing.List[typing.Text]]
+    chunk = []  # type: typing.List[typing.Text]
+    chunk_bytes = 0
+
+    for name in names:
+        # Each ListOf element is prefixed with a two-byte length
+        name_bytes = len(name.encode('utf-8')) + 2
+
+        if chunk \
+                and chunk_bytes + name_bytes > _CHUNK_BYTES:
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+
+        chunk.append(name)
+        chunk_bytes += name_bytes
+
+    if chunk:
+        yield chunk
+
+# ========================================================================
+def _peer(worker):
+    # type: (t_p_amp.AMP) -> typing.Text
+    return getattr(worker, 'peer_name', None) or repr(worker)
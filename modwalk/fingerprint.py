@@ -0,0 +1,221 @@
+# -*- encoding: utf-8; test-case-name: tests.test_fingerprint -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import binascii
+import collections
+import hashlib
+import io
+import json
+import logging
+import mmap
+
+from .modwalk import modgen
+
+try:
+    from concurrent import futures as _futures
+except ImportError:  # py2
+    _futures = None  # type: ignore
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'changed',
+    'filedigest',
+    'fingerprints',
+    'loadfingerprints',
+    'savefingerprints',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 1
+
+_HASH = hashlib.sha256
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def changed(
+        old,  # type: typing.Mapping[typing.Text, typing.Text]
+        new,  # type: typing.Mapping[typing.Text, typing.Text]
+):  # type: (...) -> typing.List[typing.Text]
+    """
+    Returns the names (in order) whose digests differ between ``old`` and
+    ``new`` (e.g., as returned by :func:`fingerprints`), including those
+    found in only one of them. Because a package's digest covers
+    everything beneath it, a package that isn't in the result can be
+    skipped along with all of its contents.
+
+    >>> changed({'a': '1', 'a.b': '2', 'c': '3'}, {'a': '4', 'a.b': '5', 'd': '6'})
+    ['a', 'a.b', 'c', 'd']
+    >>> changed({'a': '1'}, {'a': '1'})
+    []
+    """
+    return sorted(name for name in set(old).union(new) if old.get(name) != new.get(name))
+
+# ========================================================================
+def filedigest(
+        path,  # type: typing.Text
+        loader=None,  # type: typing.Any
+):  # type: (...) -> bytes
+    """
+    Returns the (binary) digest of the contents of the file at ``path``,
+    which is memory-mapped rather than read. If ``path`` isn't a regular
+    file (e.g., it is inside a zip archive), its contents are read with
+    ``loader.get_data`` instead, if ``loader`` has one.
+    """
+    h = _HASH()
+
+    try:
+        with open(path, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mapped
+                pass
+            else:
+                try:
+                    h.update(mm)
+                finally:
+                    mm.close()
+    except EnvironmentError:
+        if not hasattr(loader, 'get_data'):
+            raise
+
+        h.update(loader.get_data(path))
+
+    return h.digest()
+
+# ========================================================================
+def fingerprints(
+        mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+        jobs=None,  # type: typing.Optional[int]
+        modules=True,  # type: bool
+):  # type: (...) -> typing.Dict[typing.Text, typing.Text]
+    """
+    Returns an ordered mapping of the name of each module that a (lazy)
+    :func:`~modwalk.modwalk.modgen` walk of ``mod_specs`` would visit to
+    the hexadecimal digest of its contents. Nothing new is imported, and
+    files are hashed using up to ``jobs`` threads (a handful per CPU by
+    default).
+
+    A module's digest is that of its file (including those of extension
+    modules). A package's digest (like a node in a Merkle tree) combines
+    that of its ``__init__`` with the names and digests of its walked
+    sub-modules and sub-packages, so it changes if and only if something
+    beneath it changes (or is added or removed). If ``modules`` is
+    false, only packages (and walked modules outside of any walked
+    package) are included in the result.
+    """
+    paths = collections.OrderedDict()  # type: typing.Dict[typing.Text, typing.Tuple[typing.Optional[typing.Text], typing.Any]]
+    children = {}  # type: typing.Dict[typing.Text, typing.List[typing.Text]]
+
+    for mod in modgen(mod_specs, lazy=True):
+        mod_name = mod.__name__
+        paths[mod_name] = (getattr(mod, '__file__', None), getattr(mod, '__loader__', None))
+
+        if hasattr(mod, '__path__'):
+            children.setdefault(mod_name, [])
+
+    for mod_name in paths:
+        parent_name = mod_name.rpartition('.')[0]
+
+        if parent_name in children:
+            children[parent_name].append(mod_name)
+
+    file_digests = {}  # type: typing.Dict[typing.Text, bytes]
+    located = [(mod_name, path, loader) for mod_name, (path, loader) in paths.items() if path]
+
+    def _digest(_located):
+        mod_name, path, loader = _located
+
+        try:
+            return mod_name, filedigest(path, loader)
+        except EnvironmentError as exc:
+            _LOGGER.warning('unable to read "%s" (%s)', path, exc)
+
+            return mod_name, b''
+
+    # hashlib releases the GIL while hashing, so threads are enough
+    if _futures is None \
+            or jobs == 1:
+        file_digests.update(map(_digest, located))
+    else:
+        with _futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            file_digests.update(executor.map(_digest, located))
+
+    digests = {}  # type: typing.Dict[typing.Text, bytes]
+
+    # Children have longer names than their parents, so they come first
+    for mod_name in sorted(paths, key=lambda name: name.count('.'), reverse=True):
+        digest = file_digests.get(mod_name, b'')
+
+        if mod_name in children:
+            h = _HASH(digest)
+
+            for child_name in sorted(children[mod_name]):
+                h.update(child_name.rpartition('.')[2].encode('utf-8') + b'\0' + digests[child_name])
+
+            digest = h.digest()
+
+        digests[mod_name] = digest
+
+    return collections.OrderedDict(
+        (mod_name, binascii.hexlify(digests[mod_name]).decode('ascii'))
+        for mod_name in paths
+        if modules
+        or mod_name in children
+        or mod_name.rpartition('.')[0] not in children
+    )
+
+# ========================================================================
+def loadfingerprints(path):
+    # type: (typing.Text) -> typing.Dict[typing.Text, typing.Text]
+    """
+    Returns the digests previously written to ``path`` by
+    :func:`savefingerprints`.
+    """
+    with io.open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f, object_pairs_hook=collections.OrderedDict)
+
+    if state.get('version') != _FORMAT_VERSION:
+        raise ValueError('"{}" has unsupported fingerprint version {!r}'.format(path, state.get('version')))
+
+    return state['digests']
+
+# ========================================================================
+def savefingerprints(
+        digests,  # type: typing.Mapping[typing.Text, typing.Text]
+        path,  # type: typing.Text
+):  # type: (...) -> None
+    """
+    Writes ``digests`` (e.g., as returned by :func:`fingerprints`) to
+    ``path`` as JSON.
+    """
+    with io.open(path, 'w', encoding='utf-8') as f:
+        f.write(str(json.dumps({'version': _FORMAT_VERSION, 'digests': digests}, indent=2)))
+        f.write(u'\n')
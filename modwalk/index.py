@@ -0,0 +1,318 @@
+# -*- encoding: utf-8; test-case-name: tests.test_index -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import collections
+import logging
+import os
+
+from .persist import (
+    dumpcompact,
+    loadcompact,
+)
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'ModuleIndex',
+    'ModuleRecord',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 1
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+ModuleRecord = collections.namedtuple('ModuleRecord', ('name', 'path', 'is_package'))
+
+# ========================================================================
+class _Node(object):
+
+    __slots__ = ('children', 'record')
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(self):
+        # type: (...) -> None
+        self.children = None  # type: typing.Optional[typing.Dict[typing.Text, _Node]]
+        self.record = None  # type: typing.Optional[ModuleRecord]
+
+# ========================================================================
+class ModuleIndex(object):
+    """
+    :class:`ModuleRecord`\\ s keyed by fully qualified name, stored in a
+    trie with one node per name component, so that all modules under a
+    prefix, or the children or ancestors of a module, can be found without
+    scanning every record.
+
+    >>> idx = ModuleIndex()
+    >>> for name, is_package in (('a', True), ('a.b', True), ('a.b.c', False), ('a.d', False), ('ab', False)):
+    ...     idx.add(ModuleRecord(name, None, is_package))
+    >>> [r.name for r in idx.prefix('a')]
+    ['a', 'a.b', 'a.b.c', 'a.d']
+    >>> [r.name for r in idx.children('a')]
+    ['a.b', 'a.d']
+    >>> [r.name for r in idx.ancestors('a.b.c')]
+    ['a.b', 'a']
+    >>> 'a.b' in idx, 'a.x' in idx, len(idx)
+    (True, False, 5)
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            records=(),  # type: typing.Iterable[ModuleRecord]
+    ):  # type: (...) -> None
+        self._root = _Node()
+        self._len = 0
+
+        for record in records:
+            self.add(record)
+
+    # ---- Class methods -------------------------------------------------
+
+    @classmethod
+    def fromwalk(
+            cls,
+            mods,  # type: typing.Iterable[typing.Any]
+    ):  # type: (...) -> ModuleIndex
+        """
+        Returns a new index of ``mods`` (e.g., as generated by
+        :func:`~modwalk.modwalk.modgen`).
+        """
+        idx = cls()
+        collections.deque(idx.collect(mods), maxlen=0)
+
+        return idx
+
+    @classmethod
+    def load(cls, path):
+        # type: (typing.Text) -> ModuleIndex
+        """
+        Returns an index previously written to ``path`` by :meth:`save`.
+        """
+        state = loadcompact(path)
+
+        if state.get('version') != _FORMAT_VERSION:
+            raise ValueError('"{}" has unsupported index version {!r}'.format(path, state.get('version')))
+
+        dirs = state['dirs']
+
+        return cls(
+            ModuleRecord(name, None if dir_idx is None else os.path.join(dirs[dir_idx], base_name), bool(is_package))
+            for name, dir_idx, base_name, is_package in state['records']
+        )
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __contains__(self, name):
+        # type: (typing.Any) -> bool
+        node = self._find(name)
+
+        return node is not None \
+            and node.record is not None
+
+    def __getitem__(self, name):
+        # type: (typing.Text) -> ModuleRecord
+        node = self._find(name)
+
+        if node is None \
+                or node.record is None:
+            raise KeyError(name)
+
+        return node.record
+
+    def __iter__(self):
+        # type: (...) -> typing.Iterator[ModuleRecord]
+        return self._descend(self._root)
+
+    def __len__(self):
+        # type: (...) -> int
+        return self._len
+
+    # ---- Public methods ------------------------------------------------
+
+    def add(self, record):
+        # type: (ModuleRecord) -> None
+        """
+        Adds ``record``, replacing any existing record with the same name.
+        """
+        node = self._root
+
+        for part in record.name.split('.'):
+            if node.children is None:
+                node.children = {}
+
+            child = node.children.get(part)
+
+            if child is None:
+                child = node.children[part] = _Node()
+
+            node = child
+
+        if node.record is None:
+            self._len += 1
+
+        node.record = record
+
+    def addmodule(self, mod):
+        # type: (typing.Any) -> ModuleRecord
+        """
+        Adds (and returns) a record for the module object ``mod``.
+        """
+        record = ModuleRecord(mod.__name__, getattr(mod, '__file__', None), hasattr(mod, '__path__'))
+        self.add(record)
+
+        return record
+
+    def ancestors(self, name):
+        # type: (typing.Text) -> typing.List[ModuleRecord]
+        """
+        Returns the records for the (indexed) ancestors of ``name``,
+        nearest first.
+        """
+        records = []
+        node = self._root
+
+        for part in name.split('.')[:-1]:
+            node = (node.children or {}).get(part)
+
+            if node is None:
+                break
+
+            if node.record is not None:
+                records.append(node.record)
+
+        records.reverse()
+
+        return records
+
+    def children(self, name):
+        # type: (typing.Text) -> typing.List[ModuleRecord]
+        """
+        Returns the records for the immediate children of ``name``, in
+        order of name.
+        """
+        node = self._find(name)
+
+        if node is None \
+                or node.children is None:
+            return []
+
+        return [node.children[part].record for part in sorted(node.children) if node.children[part].record is not None]
+
+    def collect(
+            self,
+            mods,  # type: typing.Iterable[typing.Any]
+    ):  # type: (...) -> typing.Iterator[typing.Any]
+        """
+        Adds a record for each module object in ``mods`` as it is
+        generated (i.e., as a pipeline stage).
+        """
+        for mod in mods:
+            self.addmodule(mod)
+            yield mod
+
+    def discard(self, name):
+        # type: (typing.Text) -> None
+        """
+        Removes the record for ``name`` (but not those of its
+        descendants), if there is one.
+        """
+        node = self._find(name)
+
+        if node is not None \
+                and node.record is not None:
+            node.record = None
+            self._len -= 1
+
+    def prefix(self, name):
+        # type: (typing.Text) -> typing.Iterator[ModuleRecord]
+        """
+        Generates the records for ``name`` and all of its descendants, in
+        order of name.
+        """
+        node = self._find(name)
+
+        if node is None:
+            return iter(())
+
+        return self._descend(node)
+
+    def save(self, path):
+        # type: (typing.Text) -> None
+        """
+        Writes the index to ``path``.
+        """
+        # Directories are stored once each and referred to by index
+        dir_idxs = {}  # type: typing.Dict[typing.Text, int]
+        records = []
+
+        for record in self:
+            if record.path is None:
+                dir_idx = base_name = None
+            else:
+                dir_name, base_name = os.path.split(record.path)
+                dir_idx = dir_idxs.setdefault(dir_name, len(dir_idxs))
+
+            records.append((record.name, dir_idx, base_name, int(record.is_package)))
+
+        dumpcompact({
+            'version': _FORMAT_VERSION,
+            'dirs': sorted(dir_idxs, key=dir_idxs.__getitem__),
+            'records': records,
+        }, path)
+
+    # ---- Private methods -----------------------------------------------
+
+    def _descend(self, node):
+        # type: (_Node) -> typing.Iterator[ModuleRecord]
+        stack = [node]
+
+        while stack:
+            node = stack.pop()
+
+            if node.record is not None:
+                yield node.record
+
+            if node.children:
+                stack.extend(node.children[part] for part in sorted(node.children, reverse=True))
+
+    def _find(self, name):
+        # type: (typing.Text) -> typing.Optional[_Node]
+        node = self._root  # type: typing.Optional[_Node]
+
+        for part in name.split('.'):
+            if node is None \
+                    or node.children is None:
+                return None
+
+            node = node.children.get(part)
+
+        return node
@@ -0,0 +1,242 @@
+# -*- encoding: utf-8; test-case-name: tests.test_installed -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import csv
+import logging
+import os
+import re
+import sys
+import sysconfig
+
+from .modwalk import (
+    _PKG_MOD,
+    _PYCACHE_DIR,
+    _RE_MOD_NAME,
+    _suffixes,
+    submodnames,
+)
+from .persist import (
+    dumpcompact,
+    loadcompact,
+)
+
+try:
+    from importlib import metadata as _metadata
+except ImportError:  # py2 and py3 before 3.8
+    try:
+        import importlib_metadata as _metadata  # type: ignore
+    except ImportError:
+        _metadata = None  # type: ignore
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'installedspecs',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 1
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def installedspecs(
+        path=None,  # type: typing.Optional[typing.Iterable[typing.Text]]
+        submodules=False,  # type: bool
+        stdlib=False,  # type: bool
+        cache_path=None,  # type: typing.Optional[typing.Text]
+):  # type: (...) -> typing.List[typing.Tuple[typing.Text, bool]]
+    """
+    Returns ``(name, recurse)`` pairs (suitable for
+    :func:`~modwalk.modwalk.modgen`) for every top-level module and
+    package found on ``path`` (``sys.path`` by default), in order of
+    name. Nothing is imported. Roots are found by listing each entry of
+    ``path`` and from the ``top_level.txt`` and ``RECORD`` files of the
+    distributions installed there (which also name roots that listings
+    miss, like those of editable installs). Entries belonging to the
+    standard library are skipped unless ``stdlib`` is true, as is the
+    current directory.
+
+    If ``submodules`` is true, every module listed in a distribution's
+    ``RECORD`` is also returned (with ``recurse`` false), so a walk of the
+    result visits them without discovering them. Roots not owned by any
+    distribution are returned with ``recurse`` true.
+
+    If provided, ``cache_path`` is where the result is cached. The cache
+    is reused until the interpreter, ``path``, or the modification time
+    of any entry in ``path`` changes (which installing or removing a
+    distribution does).
+    """
+    # The current directory (the empty entry) isn't where things are
+    # installed
+    path_entries = [path_entry for path_entry in (sys.path if path is None else path) if path_entry and (stdlib or not _isstdlib(path_entry))]
+    cache_key = None
+
+    if cache_path is not None:
+        cache_key = {
+            'executable': sys.executable,
+            'version': sys.version,
+            'path': path_entries,
+            'mtimes': [_mtime(path_entry) for path_entry in path_entries],
+            'submodules': submodules,
+        }
+
+        try:
+            cached = loadcompact(cache_path)
+        except (EnvironmentError, ValueError):
+            cached = None
+
+        if cached is not None \
+                and cached.get('version') == _FORMAT_VERSION \
+                and cached.get('key') == cache_key:
+            return [(mod_name, bool(recurse)) for mod_name, recurse in cached['specs']]
+
+    roots = set(submodnames(path_entries))
+    dist_roots = set()  # type: typing.Set[typing.Text]
+    dist_mod_names = set()  # type: typing.Set[typing.Text]
+
+    for dist in _distributions(path_entries):
+        dist_roots.update(_toplevel(dist))
+        mod_names = _recordmodnames(dist)
+        dist_roots.update(mod_name.partition('.')[0] for mod_name in mod_names)
+        dist_mod_names.update(mod_names)
+
+    # Some roots can't be found by listing path entries (e.g., those of
+    # editable installs, which are found by their own finders)
+    roots.update(dist_roots)
+
+    if submodules:
+        owned_roots = set(mod_name.partition('.')[0] for mod_name in dist_mod_names)
+        mod_specs = [(mod_name, False) for mod_name in dist_mod_names | (roots & owned_roots)]
+        mod_specs.extend((root, True) for root in roots - owned_roots)
+    else:
+        mod_specs = [(root, True) for root in roots]
+
+    mod_specs.sort()
+
+    if cache_path is not None:
+        dumpcompact({
+            'version': _FORMAT_VERSION,
+            'key': cache_key,
+            'specs': [(mod_name, int(recurse)) for mod_name, recurse in mod_specs],
+        }, cache_path)
+
+    return mod_specs
+
+# ========================================================================
+def _distributions(path_entries):
+    # type: (typing.List[typing.Text]) -> typing.Iterable[typing.Any]
+    if _metadata is None:
+        return ()
+
+    return _metadata.distributions(path=path_entries)
+
+# ========================================================================
+def _isstdlib(path_entry):
+    # type: (typing.Text) -> bool
+    real_path = os.path.realpath(path_entry)
+    paths = sysconfig.get_paths()
+    site_dirs = set(os.path.realpath(paths[key]) for key in ('purelib', 'platlib') if key in paths)
+
+    if real_path in site_dirs:
+        return False
+
+    # Anything else under the base installation (e.g., "lib/python3.X",
+    # "lib/python3X.zip", "lib/python3.X/lib-dynload") is the standard
+    # library
+    for prefix in set((sys.base_prefix, sys.base_exec_prefix) if hasattr(sys, 'base_prefix') else (sys.prefix, sys.exec_prefix)):
+        prefix = os.path.join(os.path.realpath(prefix), '')
+
+        if real_path.startswith(prefix) \
+                and not any(real_path.startswith(os.path.join(site_dir, '')) for site_dir in site_dirs):
+            return True
+
+    return False
+
+# ========================================================================
+def _mtime(path_entry):
+    # type: (typing.Text) -> typing.Optional[float]
+    try:
+        return os.stat(path_entry).st_mtime
+    except OSError:
+        return None
+
+# ========================================================================
+def _recordmodnames(dist):
+    # type: (typing.Any) -> typing.Set[typing.Text]
+    # Module names (including those of any packages, namespace or
+    # otherwise, leading up to them) from the paths in dist's RECORD
+    suffixes = _suffixes()
+    mod_names = set()  # type: typing.Set[typing.Text]
+
+    record = dist.read_text('RECORD')
+
+    if record is not None:
+        # Cheaper than dist.files, which makes a path object of each
+        rel_paths = (row[0] for row in csv.reader(record.splitlines()) if row)
+    else:
+        # E.g., an egg-info directory with SOURCES.txt instead
+        rel_paths = (rel_path.as_posix() for rel_path in dist.files or ())
+
+    for rel_path in rel_paths:
+        parts = tuple(rel_path.split('/'))
+
+        if not parts \
+                or not all(re.search(_RE_MOD_NAME, part) and part != _PYCACHE_DIR for part in parts[:-1]):
+            # Outside the path entry (e.g., "../../bin/tool"), or in a
+            # directory that can't be a package (e.g., "__pycache__",
+            # "tool-1.0.dist-info")
+            continue
+
+        file_name = parts[-1]
+
+        for suffix in suffixes:
+            if file_name.endswith(suffix):
+                base = file_name[:-len(suffix)]
+                break
+        else:
+            continue
+
+        if base == _PKG_MOD:
+            parts = parts[:-1]
+        elif re.search(_RE_MOD_NAME, base):
+            parts = parts[:-1] + (base,)
+        else:
+            continue
+
+        for i in range(1, len(parts) + 1):
+            mod_names.add('.'.join(parts[:i]))
+
+    return mod_names
+
+# ========================================================================
+def _toplevel(dist):
+    # type: (typing.Any) -> typing.List[typing.Text]
+    top_level = dist.read_text('top_level.txt') or ''
+
+    return [line.strip() for line in top_level.splitlines() if re.search(_RE_MOD_NAME, line.strip())]
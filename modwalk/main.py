@@ -30,23 +30,66 @@ from past.builtins import execfile  # type: ignore
 # ---- Imports -----------------------------------------------------------
 
 import argparse
-import collections
 import importlib
 import logging
 import os
+import re
 import sys
 
 from twisted import logger as t_logger
 from twisted.internet import defer as t_i_defer
+from twisted.internet import endpoints as t_i_endpoints
 from twisted.internet import reactor as t_i_reactor
 from twisted.internet import task as t_i_task
 from twisted.python import failure as t_p_failure
 
+from .batch import batched
+from .checkpoint import Checkpoint
+from .content import ContentFilter
+from .coop import (
+    CONCURRENCY_DFLT,
+    TIME_SLICE_DFLT,
+    coopconsume,
+)
+from .daemon import WalkServer
+from .distrib import (
+    MAX_ATTEMPTS_DFLT,
+    WORKER_TIMEOUT_DFLT,
+    Coordinator,
+    ResultFeed,
+    WorkerFactory,
+    clientdesc,
+    spawnworker,
+)
+from .fingerprint import (
+    changed,
+    fingerprints,
+    loadfingerprints,
+    savefingerprints,
+)
+from .index import ModuleIndex
+from .installed import installedspecs
+from .memo import CACHE_SIZE_DFLT
+from .memprof import MemoryProfile
 from .modwalk import (
     logimporterror,
     modgen,
 )
-
+from .order import (
+    VISIT_ORDERS,
+    ImportTimes,
+)
+from .precompile import (
+    precompile,
+    sourcefiles,
+)
+from .progress import (
+    Progress,
+    estimate,
+)
+from .remote import walkinterpreters
+from .sample import Sample
+from .symbols import SymbolIndex
 from .version import __release__
 
 # ---- Data --------------------------------------------------------------
@@ -220,16 +263,9 @@ class ModuleAppender(argparse.Action):
             mod_specs = []
             setattr(namespace, self.dest, mod_specs)
 
-        for value in values:
-            try:
-                mod = importlib.import_module(value)
-            except Exception:  # pylint: disable=broad-except
-                if namespace.suppress_import_errors:
-                    logimporterror(_LOGGER, value, logging.WARNING)
-                else:
-                    raise
-            else:
-                mod_specs.append((mod, self._should_recurse))
+        # These are imported once all the arguments have been parsed (see
+        # _importspecs), since (e.g.) --interpreter walks them elsewhere
+        mod_specs.extend((value, self._should_recurse) for value in values)
 
 # ---- Functions ---------------------------------------------------------
 
@@ -257,6 +293,86 @@ def main():
     configlogging()
     sys.exit(_main())
 
+# ========================================================================
+def _coordinate(
+        endpoint_desc,  # type: typing.Text
+        mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+        workers,  # type: int
+        max_attempts,  # type: int
+        worker_timeout,  # type: typing.Optional[float]
+):  # type: (...) -> typing.Tuple[t_i_defer.Deferred, ResultFeed]
+    # Results are fed to the callback chain as they arrive
+    feed = ResultFeed(t_i_reactor)
+
+    def _onresult(_result):
+        if _result.error is None:
+            _LOGGER.debug('%s loaded "%s"', _result.worker, _result.name)
+            feed.push(_result)
+        else:
+            _LOGGER.info('unable to load "%s" on %s (skipping): %s', _result.name, _result.worker, _result.error)
+
+    coordinator = Coordinator([(getattr(mod, '__name__', mod), bool(recurse)) for mod, recurse in mod_specs], max_attempts, _onresult, worker_timeout, t_i_reactor)
+    # Don't respawn local workers forever if (e.g.) they can't start
+    respawns_left = [workers * max_attempts]
+
+    def _listening(_port):
+        client_desc = clientdesc(_port.getHost())
+        _LOGGER.info('coordinating workers on %s', client_desc)
+
+        def _spawn(_reason=None):
+            if coordinator.finished:
+                return
+
+            if _reason is not None:
+                if respawns_left[0] <= 0:
+                    _LOGGER.warning('local worker exited (not respawning)')
+
+                    return
+
+                respawns_left[0] -= 1
+                _LOGGER.info('local worker exited (respawning)')
+
+            spawnworker(t_i_reactor, client_desc, _spawn)
+
+        for _ in range(workers):
+            _spawn()
+
+        def _stoplistening(_arg):
+            return t_i_defer.maybeDeferred(_port.stopListening).addBoth(lambda _: _arg)
+
+        d = coordinator.whenDone()
+        d.addBoth(_stoplistening)
+        d.addCallbacks(lambda _: feed.finish(), feed.finish)
+
+        return feed
+
+    # Like a local walk, start once the reactor is running, so the chain
+    # can wait on it for results
+    d = t_i_task.deferLater(t_i_reactor, 0, t_i_endpoints.serverFromString(t_i_reactor, endpoint_desc).listen, coordinator)
+    d.addCallback(_listening)
+
+    return d, feed
+
+# ========================================================================
+def _importspecs(
+        mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Text, bool]]
+        suppress_import_errors,  # type: bool
+):  # type: (...) -> typing.List[typing.Tuple[typing.Any, bool]]
+    imported = []
+
+    for mod_name, recurse in mod_specs:
+        try:
+            mod = importlib.import_module(mod_name)
+        except Exception:  # pylint: disable=broad-except
+            if suppress_import_errors:
+                logimporterror(_LOGGER, mod_name, logging.WARNING)
+            else:
+                raise
+        else:
+            imported.append((mod, recurse))
+
+    return imported
+
 # ========================================================================
 def _main(
         argv=None,  # type: typing.Optional[typing.Sequence[typing.Text]]
@@ -264,12 +380,260 @@ def _main(
     parser = _parser()
     namespace = parser.parse_args(argv)
 
-    if not namespace.mod_specs:
-        parser.print_help()
+    if namespace.worker_endpoint:
+        return _work(namespace.worker_endpoint)
 
+    if namespace.serve_path:
+        return _serve(namespace.serve_path, _importspecs(namespace.mod_specs, namespace.suppress_import_errors))
+
+    d = _walk(parser, namespace)
+
+    if d is None:
         return 0
 
-    d = t_i_task.deferLater(t_i_reactor, 0, modgen, namespace.mod_specs)
+    d.addBoth(_stopreactor)
+    t_i_reactor.run()
+
+    return 0
+
+# ========================================================================
+def _serve(
+        socket_path,  # type: typing.Text
+        mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+):  # type: (...) -> int
+    def _onrequest(_argv, _track):
+        parser = _parser(prog='modwalk')
+        namespace = parser.parse_args(_argv)
+
+        if namespace.serve_path \
+                or namespace.worker_endpoint \
+                or namespace.coordinator_endpoint:
+            parser.error('--serve, --worker, and --coordinate cannot be used with a server')
+
+        return _walk(parser, namespace, stages=(_track,))
+
+    server = WalkServer(_onrequest)
+
+    if mod_specs:
+        _LOGGER.info('warmed %d module(s)', server.warm(mod_specs))
+
+    def _listening(_port):
+        _LOGGER.info('serving on "%s"', socket_path)
+
+    # Only the owner may connect, since requests can run arbitrary code;
+    # wantPID also replaces the socket if it was left by a dead server
+    endpoint = t_i_endpoints.UNIXServerEndpoint(t_i_reactor, socket_path, mode=0o600, wantPID=True)
+    d = endpoint.listen(server)
+    d.addCallbacks(_listening, _stopreactor)
+    t_i_reactor.run()
+
+    return 0
+
+# ========================================================================
+def _stopreactor(_arg):
+    if isinstance(_arg, t_p_failure.Failure):
+        _T_LOGGER.failure('Unhandled error', _arg)
+
+    t_i_reactor.stop()
+
+    # Suppress "Main loop terminated." message
+    t_logger.globalLogPublisher.removeObserver(_T_LOG_OBSERVER)
+
+# ========================================================================
+def _walk(
+        parser,  # type: argparse.ArgumentParser
+        namespace,  # type: argparse.Namespace
+        stages=(),  # type: typing.Iterable[typing.Callable[[typing.Any], typing.Any]]
+):  # type: (...) -> typing.Optional[t_i_defer.Deferred]
+    # Starts the walk (and callback chain) described by namespace,
+    # returning a Deferred that fires when it's done (or None if there's
+    # nothing to walk); each of stages is added to the pipeline ahead of
+    # the callback chain
+    if namespace.batch_interval is not None \
+            and not namespace.batch_size:
+        parser.error('--batch-interval requires --batch')
+
+    if namespace.interpreters:
+        mod_specs = namespace.mod_specs
+    else:
+        mod_specs = _importspecs(namespace.mod_specs, namespace.suppress_import_errors)
+
+    seen = ()  # type: typing.Iterable[typing.Text]
+    checkpoint = None
+
+    if namespace.checkpoint_path:
+        checkpoint = Checkpoint(namespace.checkpoint_path, namespace.checkpoint_interval)
+
+        if namespace.resume \
+                and os.path.exists(namespace.checkpoint_path):
+            mod_specs, seen = checkpoint.load()
+    elif namespace.resume:
+        parser.error('--resume requires --checkpoint')
+
+    if namespace.installed \
+            and not seen:
+        mod_specs = list(mod_specs) + installedspecs(submodules=namespace.installed == 'modules', stdlib=namespace.installed_stdlib, cache_path=namespace.installed_cache_path)
+    elif namespace.installed_stdlib \
+            or namespace.installed_cache_path:
+        parser.error('--installed-stdlib and --installed-cache require --installed')
+
+    if not mod_specs \
+            and not seen:
+        parser.print_help()
+
+        return None
+
+    if namespace.interpreters:
+        if namespace.installed \
+                or namespace.coordinator_endpoint:
+            parser.error('--interpreter cannot be used with --installed or --coordinate')
+
+        return _walkinterpreters(namespace.interpreters, mod_specs)
+
+    if namespace.pycache_prefix is not None:
+        if not hasattr(sys, 'pycache_prefix'):
+            parser.error('--pycache-prefix requires Python 3.8 or newer')
+
+        sys.pycache_prefix = namespace.pycache_prefix  # type: ignore
+
+    if namespace.precompile:
+        compiled, failures = precompile(sourcefiles(mod_specs), namespace.pycache_prefix, namespace.jobs)
+        _LOGGER.info('precompiled %d source file(s)', compiled)
+
+        for path, error in failures:
+            _LOGGER.warning('unable to compile "%s": %s', path, error)
+
+    if namespace.fingerprint:
+        digests = fingerprints(mod_specs, namespace.jobs, modules=namespace.fingerprint == 'modules')
+
+        if namespace.fingerprint_path:
+            savefingerprints(digests, namespace.fingerprint_path)
+
+        if namespace.fingerprint_since_path:
+            names = changed(loadfingerprints(namespace.fingerprint_since_path), digests)
+        else:
+            names = list(digests)
+
+        for mod_name in names:
+            # Those that are gone get a placeholder digest
+            print('{}  {}'.format(digests.get(mod_name, '-' * 64), mod_name))
+
+        return None
+    elif namespace.fingerprint_path \
+            or namespace.fingerprint_since_path:
+        parser.error('--fingerprint-json and --fingerprint-since require --fingerprint')
+
+    import_times = None
+
+    if namespace.import_times_path:
+        if os.path.exists(namespace.import_times_path):
+            import_times = ImportTimes.load(namespace.import_times_path)
+        else:
+            import_times = ImportTimes()
+
+    memory = None
+
+    if namespace.memory_path \
+            or namespace.memory_top:
+        if namespace.coordinator_endpoint:
+            parser.error('--memory and --memory-top cannot be used with --coordinate')
+
+        memory = MemoryProfile(blocks=namespace.memory_blocks)
+
+    sample = None
+
+    if namespace.sample_fraction is not None \
+            or namespace.sample_count is not None:
+        if namespace.coordinator_endpoint:
+            parser.error('--sample-fraction and --sample-count cannot be used with --coordinate')
+
+        if namespace.sample_fraction is not None \
+                and namespace.sample_count is not None:
+            parser.error('--sample-fraction and --sample-count cannot be used together')
+
+        try:
+            sample = Sample(mod_specs, namespace.sample_fraction, namespace.sample_count, 0 if namespace.sample_seed is None else namespace.sample_seed)
+        except ValueError as exc:
+            parser.error('invalid sample ({})'.format(exc))
+    elif namespace.sample_seed is not None:
+        parser.error('--sample-seed requires --sample-fraction or --sample-count')
+
+    prefilter = sample
+    content_filter = None
+
+    if namespace.contains \
+            or namespace.contains_regexes:
+        if namespace.coordinator_endpoint:
+            parser.error('--contains and --contains-regex cannot be used with --coordinate')
+
+        predicates = [text.encode('utf-8') for text in namespace.contains]
+
+        for regex in namespace.contains_regexes:
+            try:
+                predicates.append(re.compile(regex.encode('utf-8'), re.MULTILINE))
+            except re.error as exc:
+                parser.error('invalid --contains-regex {!r} ({})'.format(regex, exc))
+
+        content_filter = ContentFilter(predicates, namespace.jobs)
+
+        if sample is None:
+            prefilter = content_filter
+        else:
+            def _prefilter(_names, _search_path):
+                return content_filter(sample(_names, _search_path), _search_path)
+
+            prefilter = _prefilter
+
+    progress = None
+
+    if namespace.progress:
+        if namespace.coordinator_endpoint:
+            parser.error('--progress cannot be used with --coordinate')
+
+        progress = Progress(estimate(mod_specs) if sample is None else len(sample), namespace.progress_interval)
+        progress.start()
+    elif namespace.progress_interval is not None:
+        parser.error('--progress-interval requires --progress')
+
+    feed = None
+
+    if namespace.coordinator_endpoint:
+        d, feed = _coordinate(namespace.coordinator_endpoint, mod_specs, namespace.workers, namespace.max_attempts, namespace.worker_timeout)
+    else:
+        d = t_i_task.deferLater(t_i_reactor, 0, modgen, mod_specs, seen, checkpoint, namespace.order, import_times, namespace.lazy, memory=memory, progress=progress, prefilter=prefilter)
+
+    if namespace.index_path:
+        index = ModuleIndex()
+        d.addCallback(index.collect)
+
+        def _saveindex(_arg):
+            index.save(namespace.index_path)
+
+            return _arg
+
+    if namespace.symbols_path:
+        if os.path.exists(namespace.symbols_path):
+            symbols = SymbolIndex.load(namespace.symbols_path)
+        else:
+            symbols = SymbolIndex()
+
+        # Modules that have gone away are only pruned after a full walk
+        # (i.e., not one that was resumed, sampled, or filtered)
+        d.addCallback(symbols.collect, namespace.symbols_static, () if seen or prefilter is not None else mod_specs)
+
+        def _savesymbols(_arg):
+            symbols.save(namespace.symbols_path)
+
+            return _arg
+    elif namespace.symbols_static:
+        parser.error('--symbols-static requires --symbols')
+
+    for stage in stages:
+        d.addCallback(stage)
+
+    if namespace.batch_size:
+        d.addCallback(batched, namespace.batch_size, namespace.batch_interval)
+
     d.chainDeferred(namespace.deferred)
 
     def _consumeall(_pipeline):
@@ -278,23 +642,93 @@ def _main(
         except TypeError:
             # _pipeline was not iterable, so assume it was already
             # consumed
-            pass
+            return None
         else:
-            # Make sure pipeline is consumed
-            collections.deque(_pipeline, maxlen=0)
+            # Make sure pipeline is consumed, but without starving the
+            # reactor
+            return coopconsume(_pipeline, namespace.time_slice, namespace.concurrency, t_i_reactor, None if feed is None else feed.whenReady)
 
     namespace.deferred.addCallback(_consumeall)
 
-    def _stop(_arg):
-        if isinstance(_arg, t_p_failure.Failure):
-            _T_LOGGER.failure('Unhandled error', _arg)
+    if namespace.index_path:
+        namespace.deferred.addCallback(_saveindex)
+
+    if namespace.symbols_path:
+        namespace.deferred.addCallback(_savesymbols)
+
+    if content_filter is not None:
+        def _closecontentfilter(_arg):
+            content_filter.close()
+
+            return _arg
+
+        namespace.deferred.addBoth(_closecontentfilter)
+
+    if progress is not None:
+        def _stopprogress(_arg):
+            progress.stop()
+
+            return _arg
+
+        namespace.deferred.addBoth(_stopprogress)
 
-        t_i_reactor.stop()
+    if import_times is not None:
+        def _saveimporttimes(_arg):
+            import_times.save(namespace.import_times_path)
 
-        # Suppress "Main loop terminated." message
-        t_logger.globalLogPublisher.removeObserver(_T_LOG_OBSERVER)
+            return _arg
 
-    namespace.deferred.addBoth(_stop)
+        namespace.deferred.addBoth(_saveimporttimes)
+
+    if memory is not None:
+        def _reportmemory(_arg):
+            memory.stop()
+
+            if namespace.memory_path:
+                memory.save(namespace.memory_path)
+
+            if namespace.memory_top:
+                print(memory.table(namespace.memory_top), file=sys.stderr)
+                print(file=sys.stderr)
+                print(memory.table(namespace.memory_top, subtrees=True), file=sys.stderr)
+
+            return _arg
+
+        namespace.deferred.addBoth(_reportmemory)
+
+    return namespace.deferred
+
+# ========================================================================
+def _walkinterpreters(
+        interpreters,  # type: typing.List[typing.Text]
+        mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+):  # type: (...) -> t_i_defer.Deferred
+    def _onrecord(_record):
+        if _record.error is None:
+            print('{}\t{}'.format(_record.interpreter, _record.name))
+        else:
+            _LOGGER.info('unable to load "%s" in "%s" (skipping): %s', _record.name, _record.interpreter, _record.error)
+
+    def _report(_results):
+        for interpreter, result in _results.items():
+            if isinstance(result, t_p_failure.Failure):
+                _LOGGER.error('%s', result.getErrorMessage())
+            else:
+                _LOGGER.info('walked %d module(s) in "%s"', len(result), interpreter)
+
+    d = walkinterpreters(t_i_reactor, interpreters, mod_specs, _onrecord)
+    d.addCallback(_report)
+
+    return d
+
+# ========================================================================
+def _work(
+        endpoint_desc,  # type: typing.Text
+):  # type: (...) -> int
+    factory = WorkerFactory()
+    d = t_i_endpoints.clientFromString(t_i_reactor, endpoint_desc).connect(factory)
+    d.addCallback(lambda _: factory.whenDisconnected())
+    d.addBoth(_stopreactor)
     t_i_reactor.run()
 
     return 0
@@ -322,7 +756,7 @@ It defaults to "{log_fmt_dflt}".
 
     eval_callback_metavar = 'CALLBACK'
     mod_spec_metavar = 'MODULE'
-    callback_dflt_str = "functools.partial(itertools.imap, lambda x: print('{}'.format(x.__name__)) or x)"
+    callback_dflt_str = "functools.partial(map, lambda x: print('{}'.format(x.__name__)) or x)"
 
     module_callback_group = parser.add_argument_group(
         'modules and callbacks',
@@ -347,6 +781,8 @@ Import errors are always ignored when attempting to discover sub-modules and sub
     ns = {
         functools.__name__: functools,
         itertools.__name__: itertools,
+        # Lazy (from builtins above) even on py2
+        'map': map,
     }
 
     callback, callback_args, callback_kw = CallbackAppender.evalcallback(callback_dflt_str, ns)
@@ -464,4 +900,448 @@ Import errors are always ignored when attempting to discover sub-modules and sub
         help='suppress import errors for {eval_callback_metavar}s and explicitly named {mod_spec_metavar}s'.format(eval_callback_metavar=eval_callback_metavar, mod_spec_metavar=mod_spec_metavar),
     )
 
+    installed_group = parser.add_argument_group(
+        'installed packages',
+        description="""
+With --installed, every top-level module and package on the Python path is walked as if it had been given with -M, in addition to any given {mod_spec_metavar}s.
+They are found by listing the directories (and zip files) on the path and from the metadata of installed distributions, without importing anything.
+With "--installed modules", every module listed in installed distributions' RECORD files is also visited directly, so their packages needn't be searched.
+Directories belonging to the standard library are skipped unless --installed-stdlib is given.
+""".strip().format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    installed_group.add_argument(
+        '--installed',
+        choices=('roots', 'modules'),
+        const='roots',
+        dest='installed',
+        help='walk all installed modules and packages, discovering sub-modules and sub-packages from "roots" (the default), or also visiting installed "modules" directly',
+        nargs='?',
+    )
+
+    installed_group.add_argument(
+        '--installed-stdlib',
+        action='store_true',
+        dest='installed_stdlib',
+        help='with --installed, include the standard library',
+    )
+
+    installed_group.add_argument(
+        '--installed-cache',
+        dest='installed_cache_path',
+        help='with --installed, cache what is found in FILE, which is reused until the interpreter, the path, or the contents of a directory on the path change',
+        metavar='FILE',
+    )
+
+    batch_group = parser.add_argument_group(
+        'batched delivery',
+        description="""
+With --batch, the first callback in the chain is passed lists of up to N {mod_spec_metavar}s rather than the {mod_spec_metavar}s themselves, so callbacks that write to a database or call a service can do so once per list.
+``modwalk.perbatch(CALLABLE[, ARG...])`` (available with -i modwalk) adapts a CALLABLE that takes a list (followed by any ARGs) into such a callback; if CALLABLE returns Deferreds, they are waited on as usual.
+Callbacks in the default chain expect {mod_spec_metavar}s (not lists), so use -D to replace them.
+""".strip().format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    batch_group.add_argument(
+        '--batch',
+        dest='batch_size',
+        help='pass {mod_spec_metavar}s to the first callback in the chain in lists of N'.format(mod_spec_metavar=mod_spec_metavar),
+        metavar='N',
+        type=int,
+    )
+
+    batch_group.add_argument(
+        '--batch-interval',
+        dest='batch_interval',
+        help='with --batch, pass on a shorter list once the first {mod_spec_metavar} in it has waited SECS seconds'.format(mod_spec_metavar=mod_spec_metavar),
+        metavar='SECS',
+        type=float,
+    )
+
+    parser.add_argument_group(
+        'cached results',
+        description="""
+``modwalk.memoized(CALLABLE, FILE[, VERSION[, ARG...]])`` (available with -i modwalk) adapts a CALLABLE that takes a {mod_spec_metavar} (followed by any ARGs) into a callback whose results are cached in FILE (an SQLite database, whose least recently used results are evicted once they take up more than {cache_size} MiB).
+A cached result is reused until the {mod_spec_metavar}'s source file, CALLABLE (including its code, defaults, and closure), or VERSION changes.
+VERSION is required where CALLABLE has neither a stable name nor code (e.g., an instance with a __call__ method).
+With --lazy, {mod_spec_metavar}s whose results are found in FILE are never imported.
+""".strip().format(cache_size=CACHE_SIZE_DFLT // (1024 * 1024), mod_spec_metavar=mod_spec_metavar),
+    )
+
+    coop_group = parser.add_argument_group(
+        'cooperative execution',
+        description="""
+The walk and the callback chain are driven cooperatively by the Twisted reactor in time slices, so other scheduled work can run in between.
+If the iterable returned by the last callback in the chain generates Deferreds (e.g., one for each {mod_spec_metavar}), they are waited on, at most N at a time.
+""".strip().format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    coop_group.add_argument(
+        '--time-slice',
+        default=TIME_SLICE_DFLT,
+        dest='time_slice',
+        help='yield to the reactor at least once every SECS (default: %(default)s)',
+        metavar='SECS',
+        type=float,
+    )
+
+    coop_group.add_argument(
+        '--concurrency',
+        default=CONCURRENCY_DFLT,
+        dest='concurrency',
+        help='wait on at most N outstanding Deferreds at a time (default: %(default)s)',
+        metavar='N',
+        type=int,
+    )
+
+    order_group = parser.add_argument_group(
+        'visit order',
+        description="""
+ORDER determines the order in which {mod_spec_metavar}s (and their discovered sub-modules and sub-packages) are imported and passed to the callback chain.
+It is one of: "bfs" (breadth-first); "dfs" (depth-first); "sorted" (by name); or "cheapest" (shortest import time first, according to the times recorded by earlier runs with the same --import-times FILE).
+Sub-modules and sub-packages of the same package are visited in order of name, unless ORDER says otherwise, so walks are reproducible.
+""".strip().format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    order_group.add_argument(
+        '--order',
+        choices=sorted(VISIT_ORDERS),
+        default='dfs',
+        dest='order',
+        help='visit {mod_spec_metavar}s in ORDER (default: %(default)s)'.format(mod_spec_metavar=mod_spec_metavar),
+        metavar='ORDER',
+    )
+
+    order_group.add_argument(
+        '--import-times',
+        dest='import_times_path',
+        help='load import times from FILE (if it exists) and save them (updated with those from this run) back to FILE when done',
+        metavar='FILE',
+    )
+
+    module_callback_group.add_argument(
+        '--lazy',
+        action='store_true',
+        dest='lazy',
+        help='pass discovered {mod_spec_metavar}s to the first callback in the chain as proxies that import their modules only when an attribute other than __name__, __file__, __path__, etc. is accessed (so callbacks that filter by name avoid importing what they filter out)'.format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    module_callback_group.add_argument(
+        '--index',
+        dest='index_path',
+        help='save an index of the {mod_spec_metavar}s passed to the first callback in the chain to FILE (loadable with modwalk.index.ModuleIndex.load) once the chain has finished'.format(mod_spec_metavar=mod_spec_metavar),
+        metavar='FILE',
+    )
+
+    module_callback_group.add_argument(
+        '--symbols',
+        dest='symbols_path',
+        help='index the public names of the {mod_spec_metavar}s passed to the first callback in the chain, updating (or creating) FILE (loadable with modwalk.symbols.SymbolIndex.load) once the chain has finished; {mod_spec_metavar}s whose files haven\'t changed since FILE was last updated are skipped, and (unless the walk is resumed, sampled, or filtered) those that are no longer found are removed'.format(mod_spec_metavar=mod_spec_metavar),
+        metavar='FILE',
+    )
+
+    module_callback_group.add_argument(
+        '--symbols-static',
+        action='store_true',
+        dest='symbols_static',
+        help='with --symbols, parse source files rather than inspecting imported {mod_spec_metavar}s (with --lazy, nothing is imported for the index)'.format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    precompile_group = parser.add_argument_group(
+        'bytecode',
+        description="""
+With --precompile, the source files of the {mod_spec_metavar}s (and any discovered sub-modules and sub-packages) are found without importing them and compiled to bytecode in parallel before the walk begins, so the walk's imports only have to load bytecode.
+Files whose cached bytecode is up to date are skipped.
+""".strip().format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    precompile_group.add_argument(
+        '--precompile',
+        action='store_true',
+        dest='precompile',
+        help='compile source files to bytecode before walking',
+    )
+
+    precompile_group.add_argument(
+        '--pycache-prefix',
+        dest='pycache_prefix',
+        help='read and write bytecode in a parallel tree under DIR rather than in __pycache__ directories (like PYTHONPYCACHEPREFIX; useful where those are read-only)',
+        metavar='DIR',
+    )
+
+    precompile_group.add_argument(
+        '-j', '--jobs',
+        dest='jobs',
+        help='with --precompile, use at most N processes (default: one per CPU); with --fingerprint, --contains, or --contains-regex, use at most N threads',
+        metavar='N',
+        type=int,
+    )
+
+    fingerprint_group = parser.add_argument_group(
+        'fingerprints',
+        description="""
+With --fingerprint, nothing is walked (or imported); instead, the files of the {mod_spec_metavar}s (and any discovered sub-modules and sub-packages) are hashed in parallel, and a line with the digest and name of each package is printed.
+A package's digest covers its own file and the names and digests of everything beneath it, so it changes if and only if something in that subtree does.
+""".strip().format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    fingerprint_group.add_argument(
+        '--fingerprint',
+        choices=('packages', 'modules'),
+        const='packages',
+        dest='fingerprint',
+        help='print the digests of "packages" (the default, along with any modules not in a walked package), or of all "modules"',
+        nargs='?',
+    )
+
+    fingerprint_group.add_argument(
+        '--fingerprint-json',
+        dest='fingerprint_path',
+        help='with --fingerprint, also write the digests to FILE as JSON',
+        metavar='FILE',
+    )
+
+    fingerprint_group.add_argument(
+        '--fingerprint-since',
+        dest='fingerprint_since_path',
+        help='with --fingerprint, only print those whose digests differ from (or are missing from) FILE (written by an earlier --fingerprint-json)',
+        metavar='FILE',
+    )
+
+    sample_group = parser.add_argument_group(
+        'sampling',
+        description="""
+With --sample-fraction or --sample-count, only a reproducible sample of the discovered sub-modules and sub-packages is walked, which is chosen up front by listing package directories (without importing anything).
+Each {mod_spec_metavar} gets its share of the sample (but at least one), and the packages containing the sampled {mod_spec_metavar}s are walked too; everything else is skipped before it is imported.
+The same seed gives the same sample (as long as the same files are found).
+""".strip().format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    sample_group.add_argument(
+        '--sample-fraction',
+        dest='sample_fraction',
+        help='walk a sample of about F (between 0 and 1) of the discovered {mod_spec_metavar}s'.format(mod_spec_metavar=mod_spec_metavar),
+        metavar='F',
+        type=float,
+    )
+
+    sample_group.add_argument(
+        '--sample-count',
+        dest='sample_count',
+        help='walk a sample of about N of the discovered {mod_spec_metavar}s'.format(mod_spec_metavar=mod_spec_metavar),
+        metavar='N',
+        type=int,
+    )
+
+    sample_group.add_argument(
+        '--sample-seed',
+        dest='sample_seed',
+        help='seed the choice of sample with SEED (default: 0)',
+        metavar='SEED',
+    )
+
+    content_group = parser.add_argument_group(
+        'content filtering',
+        description="""
+With --contains or --contains-regex, the source of each discovered sub-module is checked before it is imported, and those that don't match are skipped.
+A sub-module matches if its source contains any of the TEXTs or matches any of the REGEXes (which are applied to the UTF-8 encoded source in multi-line mode).
+Sources are checked in parallel; sub-packages, and sub-modules whose source can't be checked (e.g., extension modules), are always walked.
+""".strip(),
+    )
+
+    content_group.add_argument(
+        '--contains',
+        action='append',
+        default=[],
+        dest='contains',
+        help='only walk sub-modules whose source contains TEXT (may be given more than once)',
+        metavar='TEXT',
+    )
+
+    content_group.add_argument(
+        '--contains-regex',
+        action='append',
+        default=[],
+        dest='contains_regexes',
+        help='only walk sub-modules whose source matches REGEX (may be given more than once)',
+        metavar='REGEX',
+    )
+
+    progress_group = parser.add_argument_group(
+        'progress',
+        description="""
+With --progress, the number of {mod_spec_metavar}s to be walked is estimated up front by listing package directories (without importing anything), and the number done so far, the recent rate, the estimated time remaining, and any import that is taking a while are shown as the walk progresses.
+Progress is shown on a single line if standard error is a terminal, or written to it one line after another otherwise.
+""".strip().format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    progress_group.add_argument(
+        '--progress',
+        action='store_true',
+        dest='progress',
+        help='show progress while walking',
+    )
+
+    progress_group.add_argument(
+        '--progress-interval',
+        dest='progress_interval',
+        help='with --progress, show progress every SECS seconds (default: 0.25 on a terminal, 10 otherwise)',
+        metavar='SECS',
+        type=float,
+    )
+
+    memory_group = parser.add_argument_group(
+        'memory profiling',
+        description="""
+With --memory or --memory-top, the memory allocated (as traced by Python's ``tracemalloc`` module) and the growth in resident set size are measured around each import, and attributed to the {mod_spec_metavar} imported and to each package above it.
+A {mod_spec_metavar} is charged for anything it imports that had not already been imported.
+Tracing slows imports down considerably, so import times recorded with --import-times during the same run will be inflated.
+Counting blocks (with --memory-blocks) slows them down further the more memory has been allocated, so blocks are not counted by default.
+Where some {mod_spec_metavar}s in a package subtree could not be measured, its totals cover those that could, and are marked as partial.
+""".strip().format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    memory_group.add_argument(
+        '--memory',
+        dest='memory_path',
+        help='save the memory attributed to each {mod_spec_metavar} and package subtree (largest first) to FILE as JSON once the chain has finished'.format(mod_spec_metavar=mod_spec_metavar),
+        metavar='FILE',
+    )
+
+    memory_group.add_argument(
+        '--memory-top',
+        dest='memory_top',
+        help='print the N {mod_spec_metavar}s and package subtrees that allocated the most to standard error once the chain has finished'.format(mod_spec_metavar=mod_spec_metavar),
+        metavar='N',
+        type=int,
+    )
+
+    memory_group.add_argument(
+        '--memory-blocks',
+        action='store_true',
+        dest='memory_blocks',
+        help='with --memory or --memory-top, also count the memory blocks allocated (which requires comparing snapshots of every allocation around each import)',
+    )
+
+    distrib_group = parser.add_argument_group(
+        'distributed walks',
+        description="""
+With --coordinate, the {mod_spec_metavar}s are not walked locally.
+Instead, each {mod_spec_metavar} (and each sub-module and sub-package discovered) is handed out to worker processes (started elsewhere with --worker, or locally with --workers), which import them.
+Work discovered by a worker is queued to that worker, but idle workers steal from busy ones, and work held by a worker that disconnects is reassigned.
+The first callback in the chain is passed a result for each {mod_spec_metavar} that was loaded (with attributes __name__, path, and worker) as it arrives.
+If no workers are connected for a while (see --worker-timeout) while {mod_spec_metavar}s are still pending, the walk fails.
+Visit order and checkpoint options are ignored.
+ENDPOINT is a Twisted endpoint description.
+With --coordinate, it is a server endpoint (e.g., "tcp:8750" or "unix:/tmp/modwalk.sock").
+With --worker, it is a client endpoint (e.g., "tcp:host=example.com:port=8750" or "unix:path=/tmp/modwalk.sock").
+""".strip().format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    distrib_group.add_argument(
+        '--coordinate',
+        dest='coordinator_endpoint',
+        help='listen for workers on the (server) ENDPOINT and coordinate the walk',
+        metavar='ENDPOINT',
+    )
+
+    distrib_group.add_argument(
+        '--workers',
+        default=0,
+        dest='workers',
+        help='with --coordinate, start (and maintain) N local workers (default: %(default)s)',
+        metavar='N',
+        type=int,
+    )
+
+    distrib_group.add_argument(
+        '--max-attempts',
+        default=MAX_ATTEMPTS_DFLT,
+        dest='max_attempts',
+        help='with --coordinate, give up on a {mod_spec_metavar} after it has been assigned to N workers that disconnected before finishing it (default: %(default)s)'.format(mod_spec_metavar=mod_spec_metavar),
+        metavar='N',
+        type=int,
+    )
+
+    distrib_group.add_argument(
+        '--worker-timeout',
+        default=WORKER_TIMEOUT_DFLT,
+        dest='worker_timeout',
+        help='with --coordinate, give up if no workers are connected for SECS seconds while work is pending (default: %(default)s)',
+        metavar='SECS',
+        type=float,
+    )
+
+    distrib_group.add_argument(
+        '--worker',
+        dest='worker_endpoint',
+        help='act as a worker for the coordinator at the (client) ENDPOINT (all other options are ignored)',
+        metavar='ENDPOINT',
+    )
+
+    interpreter_group = parser.add_argument_group(
+        'other interpreters',
+        description="""
+With --interpreter, the {mod_spec_metavar}s are walked inside each PYTHON (e.g., one in a virtualenv, or another version of Python) rather than this one, all at the same time.
+A small agent that needs nothing but the standard library is run in each, which imports each {mod_spec_metavar} (discovering sub-modules and sub-packages where asked) and streams a record of it back.
+A line with the PYTHON and name of each {mod_spec_metavar} loaded is printed as its record arrives; callbacks are not invoked.
+""".strip().format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    interpreter_group.add_argument(
+        '--interpreter',
+        action='append',
+        default=[],
+        dest='interpreters',
+        help='walk inside PYTHON (may be given more than once)',
+        metavar='PYTHON',
+    )
+
+    serve_group = parser.add_argument_group(
+        'server',
+        description="""
+With --serve, no walk is performed (beyond importing any given {mod_spec_metavar}s up front).
+Instead, a long-lived server accepts requests from ``modwalk-client SOCKET [ARG ...]``, each of which is handled as if ARGs had been given to this command, with the output returned to the client.
+Modules stay imported between requests, and those passed to the callback chain are reloaded when their files change.
+""".strip().format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    serve_group.add_argument(
+        '--serve',
+        dest='serve_path',
+        help='serve requests on the Unix domain socket at SOCKET (accessible only by the current user)',
+        metavar='SOCKET',
+    )
+
+    checkpoint_group = parser.add_argument_group(
+        'checkpoints',
+        description="""
+A walk's progress (its pending {mod_spec_metavar}s and those already passed to the callback chain) can be saved periodically to a checkpoint FILE.
+If the walk is interrupted, it can be resumed from that FILE, in which case {mod_spec_metavar}s that were already passed to the callback chain are neither imported nor passed again.
+Nor is the {mod_spec_metavar} the walk was on when interrupted (e.g., one that crashes the interpreter), which is skipped (with a warning) rather than retried.
+""".strip().format(mod_spec_metavar=mod_spec_metavar),
+    )
+
+    checkpoint_group.add_argument(
+        '--checkpoint',
+        dest='checkpoint_path',
+        help='periodically save the walk\'s progress to FILE',
+        metavar='FILE',
+    )
+
+    checkpoint_group.add_argument(
+        '--checkpoint-interval',
+        default=1000,
+        dest='checkpoint_interval',
+        help='save progress at most once every N {mod_spec_metavar}s passed to the callback chain (default: %(default)s)'.format(mod_spec_metavar=mod_spec_metavar),
+        metavar='N',
+        type=int,
+    )
+
+    checkpoint_group.add_argument(
+        '--resume',
+        action='store_true',
+        help='if the --checkpoint FILE exists, resume from it instead of starting with the given {mod_spec_metavar}s'.format(mod_spec_metavar=mod_spec_metavar),
+    )
+
     return parser
@@ -0,0 +1,411 @@
+# -*- encoding: utf-8; test-case-name: tests.test_memo -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import functools
+import hashlib
+import logging
+import pickle
+import sqlite3
+import types
+
+from .fingerprint import filedigest
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'CACHE_SIZE_DFLT',
+    'ResultCache',
+    'memoized',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+CACHE_SIZE_DFLT = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+"""
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class ResultCache(object):
+    """
+    A size-bounded store of pickled results in the SQLite database at
+    ``path`` (created if it doesn't exist). Once the results take up
+    more than ``max_bytes``, those that were least recently used are
+    evicted.
+
+    >>> cache = ResultCache(':memory:', max_bytes=150)
+    >>> cache.put('a', 'x' * 40)
+    >>> cache.put('b', 'y' * 40)
+    >>> cache.get('a') == 'x' * 40  # now b is the least recently used
+    True
+    >>> cache.put('c', 'z' * 40)
+    >>> 'a' in cache, 'b' in cache, 'c' in cache
+    (True, False, True)
+    >>> cache.get('b', 'missing')
+    'missing'
+    >>> cache.close()
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            path,  # type: typing.Text
+            max_bytes=CACHE_SIZE_DFLT,  # type: int
+    ):  # type: (...) -> None
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(path)
+
+        # Results are only a cache, so trade durability for speed
+        self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.execute('PRAGMA synchronous = NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._size, self._clock = self._conn.execute('SELECT COALESCE(SUM(size), 0), COALESCE(MAX(used), 0) FROM results').fetchone()
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __contains__(self, key):
+        # type: (typing.Any) -> bool
+        return self._conn.execute('SELECT 1 FROM results WHERE key = ?', (key,)).fetchone() is not None
+
+    def __len__(self):
+        # type: (...) -> int
+        return self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    # ---- Properties ----------------------------------------------------
+
+    @property
+    def size(self):
+        # type: (...) -> int
+        """
+        The total size (in bytes) of the stored results.
+        """
+        return self._size
+
+    # ---- Public methods ------------------------------------------------
+
+    def close(self):
+        # type: (...) -> None
+        self._conn.close()
+
+    def get(
+            self,
+            key,  # type: typing.Text
+            default=None,  # type: typing.Any
+    ):  # type: (...) -> typing.Any
+        """
+        Returns the result stored under ``key`` (marking it as the most
+        recently used), or ``default`` if there isn't one (or it can't be
+        unpickled).
+        """
+        row = self._conn.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+
+        if row is None:
+            return default
+
+        try:
+            value = pickle.loads(bytes(row[0]))
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug('unable to unpickle result for %s (discarding)', key, exc_info=True)
+            self._delete([key])
+
+            return default
+
+        with self._conn:
+            self._conn.execute('UPDATE results SET used = ? WHERE key = ?', (self._tick(), key))
+
+        return value
+
+    def put(
+            self,
+            key,  # type: typing.Text
+            value,  # type: typing.Any
+    ):  # type: (...) -> None
+        """
+        Stores ``value`` (which must be picklable) under ``key``, evicting
+        the least recently used results if necessary to stay within
+        :attr:`max_bytes`. Values larger than that aren't stored at all.
+        """
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+        if len(blob) > self.max_bytes:
+            _LOGGER.debug('result for %s is too large to cache (%d bytes)', key, len(blob))
+
+            return
+
+        self._delete([key])
+
+        with self._conn:
+            self._conn.execute('INSERT INTO results (key, value, size, used) VALUES (?, ?, ?, ?)', (key, sqlite3.Binary(blob), len(blob), self._tick()))
+
+        self._size += len(blob)
+
+        if self._size > self.max_bytes:
+            self._evict(self._size - self.max_bytes)
+
+    # ---- Private methods -----------------------------------------------
+
+    def _delete(self, keys):
+        # type: (typing.List[typing.Text]) -> None
+        for key in keys:
+            with self._conn:
+                row = self._conn.execute('SELECT size FROM results WHERE key = ?', (key,)).fetchone()
+
+                if row is not None:
+                    self._conn.execute('DELETE FROM results WHERE key = ?', (key,))
+                    self._size -= row[0]
+
+    def _evict(self, num_bytes):
+        # type: (int) -> None
+        keys = []
+        freed = 0
+
+        for key, size in self._conn.execute('SELECT key, size FROM results ORDER BY used'):
+            keys.append(key)
+            freed += size
+
+            if freed >= num_bytes:
+                break
+
+        _LOGGER.debug('evicting %d result(s) (%d bytes)', len(keys), freed)
+        self._delete(keys)
+
+    def _tick(self):
+        # type: (...) -> int
+        # Recency is tracked with a counter rather than a clock, which
+        # might not advance between uses
+        self._clock += 1
+
+        return self._clock
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def memoized(
+        callback,  # type: typing.Callable[..., typing.Any]
+        cache,  # type: typing.Union[typing.Text, ResultCache]
+        version=None,  # type: typing.Any
+        *args,  # type: typing.Any
+        **kw  # type: typing.Any
+):  # type: (...) -> typing.Callable[[typing.Iterable[typing.Any]], typing.Iterator[typing.Any]]
+    """
+    Adapts ``callback`` (which takes a module, followed by ``args`` and
+    ``kw``) into a callback for a chain that lazily calls it for each
+    module and generates its results, which are kept in ``cache`` (a
+    :class:`ResultCache`, or the path to one). A result is reused as long
+    as the module's source file, ``callback``, and ``version`` (which
+    should change whenever ``callback``'s results would for reasons its
+    code doesn't show) are all the same. ``args`` and ``kw`` are not part
+    of the key.
+
+    ``callback`` is identified by its module and qualified name and, for
+    functions (and methods, and :func:`functools.partial`\\ s of them),
+    by their code, defaults, and closures, so (e.g.) two lambdas don't
+    share results. Within defaults, closures, and a partial's arguments,
+    other callables are identified the same way, and simple values
+    (e.g., numbers, strings, and tuples of them) by their
+    representations, but any other value is only identified by its type.
+    Where ``callback`` has no stable name and no code (e.g., it is an
+    instance with a ``__call__`` method), ``version`` is required.
+
+    Only a module's name and file are needed to find its result, so
+    with :class:`~modwalk.modwalk.ModuleProxy`\\ s (e.g., from a lazy
+    walk), modules whose results are found are never imported. Modules
+    without files, and results that can't be pickled, aren't cached.
+    Where ``callback`` returns a
+    :class:`~twisted.internet.defer.Deferred`, what it fires with is
+    cached.
+    """
+    parts = []  # type: typing.List[typing.Text]
+
+    if not _describe(callback, parts, set()) \
+            and version is None:
+        raise ValueError('{!r} can\'t be identified from one run to the next, so it needs a version'.format(callback))
+
+    if not isinstance(cache, ResultCache):
+        cache = ResultCache(cache)
+
+    callback_id = '{}:{!r}'.format(hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest(), version)
+    missing = object()
+
+    def _store(_result, _key):
+        try:
+            cache.put(_key, _result)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug('unable to cache result for %s', _key, exc_info=True)
+
+        return _result
+
+    def _memoized(mods):
+        # type: (typing.Iterable[typing.Any]) -> typing.Iterator[typing.Any]
+        for mod in mods:
+            path = getattr(mod, '__file__', None)
+            key = None
+
+            if path:
+                try:
+                    digest = filedigest(path, getattr(mod, '__loader__', None))
+                except EnvironmentError:
+                    pass
+                else:
+                    key = hashlib.sha256('\0'.join((callback_id, mod.__name__)).encode('utf-8') + b'\0' + digest).hexdigest()
+
+            if key is not None:
+                result = cache.get(key, missing)
+
+                if result is not missing:
+                    yield result
+
+                    continue
+
+            result = callback(mod, *args, **kw)
+
+            if key is not None:
+                if hasattr(result, 'addCallback'):
+                    result.addCallback(_store, key)
+                else:
+                    _store(result, key)
+
+            yield result
+
+    return _memoized
+
+# ========================================================================
+def _describe(
+        obj,  # type: typing.Any
+        parts,  # type: typing.List[typing.Text]
+        seen,  # type: typing.Set[int]
+        is_value=False,  # type: bool
+):  # type: (...) -> bool
+    # Appends what identifies obj from one run to the next (but not
+    # object addresses, hash-randomized orders, etc.) to parts, and
+    # returns whether that was enough; values that aren't callables are
+    # never a problem, since those that aren't simple and immutable
+    # (e.g., lists, whose contents may change after the callback is
+    # adapted) are described by type
+    if obj is None \
+            or isinstance(obj, (bool, int, float, complex, str, bytes)):
+        parts.append(repr(obj))
+
+        return True
+
+    if isinstance(obj, tuple):
+        parts.append('tuple({})'.format(len(obj)))
+
+        return all([_describe(item, parts, seen, True) for item in obj])
+
+    if isinstance(obj, frozenset):
+        item_parts = []  # type: typing.List[typing.List[typing.Text]]
+        is_stable = True
+
+        for item in obj:
+            item_parts.append([])
+            is_stable = _describe(item, item_parts[-1], seen, True) and is_stable
+
+        parts.append('frozenset({})'.format(len(obj)))
+        parts.extend(part for item_part in sorted(item_parts) for part in item_part)
+
+        return is_stable
+
+    if isinstance(obj, types.CodeType):
+        parts.extend((obj.co_name, repr(obj.co_code), repr(obj.co_names)))
+
+        return all([_describe(const, parts, seen, True) for const in obj.co_consts])
+
+    if id(obj) in seen:
+        # E.g., a function that refers to itself through its closure
+        parts.append('<recursive>')
+
+        return True
+
+    seen.add(id(obj))
+
+    if isinstance(obj, functools.partial):
+        parts.append('<partial>')
+        is_stable = _describe(obj.func, parts, seen)
+        is_stable = _describe(obj.args, parts, seen, True) and is_stable
+
+        for name in sorted(obj.keywords or {}):
+            parts.append(name)
+            is_stable = _describe(obj.keywords[name], parts, seen, True) and is_stable
+
+        return is_stable
+
+    if isinstance(obj, types.MethodType):
+        parts.append('<method>')
+        is_stable = _describe(obj.__func__, parts, seen)
+        owner = obj.__self__ if isinstance(obj.__self__, type) else type(obj.__self__)
+        parts.append('{}:{}'.format(owner.__module__, getattr(owner, '__qualname__', owner.__name__)))
+
+        return is_stable
+
+    mod_name = getattr(obj, '__module__', None)
+    qualname = getattr(obj, '__qualname__', getattr(obj, '__name__', None))
+    code = getattr(obj, '__code__', None)
+
+    if isinstance(code, types.CodeType):
+        parts.append('{}:{}'.format(mod_name, qualname))
+        is_stable = _describe(code, parts, seen)
+        is_stable = _describe(getattr(obj, '__defaults__', None) or (), parts, seen, True) and is_stable
+        kwdefaults = getattr(obj, '__kwdefaults__', None) or {}
+
+        for name in sorted(kwdefaults):
+            parts.append(name)
+            is_stable = _describe(kwdefaults[name], parts, seen, True) and is_stable
+
+        for cell in getattr(obj, '__closure__', None) or ():
+            try:
+                cell_contents = cell.cell_contents
+            except ValueError:  # empty
+                parts.append('<empty>')
+            else:
+                is_stable = _describe(cell_contents, parts, seen, True) and is_stable
+
+        return is_stable
+
+    if isinstance(obj, type) \
+            or (qualname is not None and mod_name is not None and '<' not in qualname):
+        # A class, or something like a builtin function
+        parts.append('{}:{}'.format(mod_name, qualname))
+
+        return True
+
+    obj_type = type(obj)
+    parts.append('<{}:{}>'.format(obj_type.__module__, getattr(obj_type, '__qualname__', obj_type.__name__)))
+
+    return is_value and not callable(obj)
+
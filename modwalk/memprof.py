@@ -0,0 +1,326 @@
+# -*- encoding: utf-8; test-case-name: tests.test_memprof -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import collections
+import io
+import json
+import logging
+import os
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore
+
+try:
+    import tracemalloc
+except ImportError:  # py2
+    tracemalloc = None  # type: ignore
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'MemoryProfile',
+    'MemoryUsage',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 1
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class MemoryUsage(collections.namedtuple('MemoryUsage', ('name', 'size', 'count', 'rss', 'partial'))):
+    """
+    The memory attributed to importing ``name`` (or, for subtree totals,
+    ``name`` and everything beneath it). ``size`` and ``count`` are the
+    net bytes and number of memory blocks allocated (as traced by
+    :mod:`tracemalloc`), and ``rss`` is the growth in resident set size
+    (in bytes). Any of them may be ``None`` where they can't be measured
+    (``count`` is only measured where asked for).
+
+    A subtree total is the sum of what could be measured beneath it, and
+    is only ``None`` where nothing could be. ``partial`` is true where a
+    total leaves out some modules that couldn't be measured.
+    """
+
+    __slots__ = ()
+
+# ========================================================================
+class MemoryProfile(object):
+    """
+    Memory growth attributed to each module imported by
+    :func:`~modwalk.modwalk.modgen` (if one of these is given).
+    :mod:`tracemalloc` is started (with ``nframes`` frames per trace) on
+    the first measurement if it isn't already tracing, and stopped by
+    :meth:`stop`.
+
+    Bytes are measured from the total traced by :mod:`tracemalloc`, which
+    is cheap no matter how large the heap grows. Counting blocks means
+    taking (and comparing) a snapshot of every trace around each import,
+    which gets slower as the walk goes on, so it is only done if
+    ``blocks`` is true.
+
+    Each import is measured as a whole, so a module is charged for
+    whatever it imports that wasn't already imported. Because the walk
+    visits packages before their contents, a package's own import cost
+    is usually just its ``__init__``.
+
+    >>> profile = MemoryProfile()
+    >>> profile.record('mwmem', MemoryUsage('mwmem', 10, 1, 0, False))
+    >>> profile.record('mwmem.a', MemoryUsage('mwmem.a', 200, 3, 4096, False))
+    >>> profile.record('mwmem.b', MemoryUsage('mwmem.b', 30, None, 0, False))
+    >>> profile.subtree('mwmem')
+    MemoryUsage(name='mwmem', size=240, count=4, rss=4096, partial=True)
+    >>> [usage.name for usage in profile.top(2)]
+    ['mwmem.a', 'mwmem.b']
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            nframes=1,  # type: int
+            blocks=False,  # type: bool
+    ):  # type: (...) -> None
+        self._blocks = blocks
+        self._nframes = nframes
+        self._started = False
+        self._usages = collections.OrderedDict()  # type: typing.Dict[typing.Text, MemoryUsage]
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __contains__(self, mod_name):
+        # type: (typing.Any) -> bool
+        return mod_name in self._usages
+
+    def __getitem__(self, mod_name):
+        # type: (typing.Text) -> MemoryUsage
+        return self._usages[mod_name]
+
+    def __iter__(self):
+        # type: (...) -> typing.Iterator[MemoryUsage]
+        return iter(self._usages.values())
+
+    def __len__(self):
+        # type: (...) -> int
+        return len(self._usages)
+
+    # ---- Public methods ------------------------------------------------
+
+    def after(
+            self,
+            mod_name,  # type: typing.Text
+            before,  # type: typing.Tuple[typing.Optional[int], typing.Any, typing.Optional[int]]
+    ):  # type: (...) -> MemoryUsage
+        """
+        Records (and returns) the memory allocated to ``mod_name`` since
+        ``before`` (the result of a call to :meth:`before`).
+        """
+        traced_before, snapshot_before, rss_before = before
+        size = count = rss = None
+
+        if snapshot_before is not None:
+            # Snapshots are excluded from themselves, but not from the
+            # traced total, so take both measurements from them
+            stats = self._snapshot().compare_to(snapshot_before, 'filename')
+            size = sum(stat.size_diff for stat in stats)
+            count = sum(stat.count_diff for stat in stats)
+        elif traced_before is not None:
+            size = tracemalloc.get_traced_memory()[0] - traced_before
+
+        rss_after = _rss()
+
+        if rss_before is not None \
+                and rss_after is not None:
+            rss = rss_after - rss_before
+
+        usage = MemoryUsage(mod_name, size, count, rss, False)
+        self.record(mod_name, usage)
+
+        return usage
+
+    def before(self):
+        # type: (...) -> typing.Tuple[typing.Optional[int], typing.Any, typing.Optional[int]]
+        """
+        Samples the current state of memory in preparation for a call to
+        :meth:`after`.
+        """
+        if tracemalloc is None:
+            return None, None, _rss()
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self._nframes)
+            self._started = True
+
+        if self._blocks:
+            # Sample RSS last so it doesn't count the snapshot
+            return None, self._snapshot(), _rss()
+
+        return tracemalloc.get_traced_memory()[0], None, _rss()
+
+    def record(
+            self,
+            mod_name,  # type: typing.Text
+            usage,  # type: MemoryUsage
+    ):  # type: (...) -> None
+        self._usages[mod_name] = usage
+
+    def report(
+            self,
+            limit=None,  # type: typing.Optional[int]
+    ):  # type: (...) -> typing.Dict[typing.Text, typing.Any]
+        """
+        Returns a JSON-serializable summary of the (at most ``limit``)
+        largest modules and package subtrees.
+        """
+        return {
+            'version': _FORMAT_VERSION,
+            'modules': [usage._asdict() for usage in self.top(limit)],
+            'subtrees': [usage._asdict() for usage in self.top(limit, subtrees=True)],
+        }
+
+    def save(
+            self,
+            path,  # type: typing.Text
+            limit=None,  # type: typing.Optional[int]
+    ):  # type: (...) -> None
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write(str(json.dumps(self.report(limit), indent=2, sort_keys=True)))
+            f.write(u'\n')
+
+    def stop(self):
+        # type: (...) -> None
+        """
+        Stops :mod:`tracemalloc` if it was started by :meth:`before`.
+        """
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def subtree(self, mod_name):
+        # type: (typing.Text) -> MemoryUsage
+        """
+        Returns the total of ``mod_name`` and every module recorded beneath
+        it.
+        """
+        return self._subtrees().get(mod_name, MemoryUsage(mod_name, 0, 0, 0, False))
+
+    def table(
+            self,
+            limit=None,  # type: typing.Optional[int]
+            subtrees=False,  # type: bool
+    ):  # type: (...) -> typing.Text
+        """
+        Returns the (at most ``limit``) largest modules (or package
+        subtrees, if ``subtrees`` is true) formatted as a table. Partial
+        totals are marked with a ``*``.
+        """
+        usages = self.top(limit, subtrees)
+        names = [usage.name + u' *' if usage.partial else usage.name for usage in usages]
+        name_width = max([len('MODULE')] + [len(name) for name in names])
+        row_fmt = u'{:<{}}  {:>12}  {:>9}  {:>12}'
+        lines = [row_fmt.format(u'SUBTREE' if subtrees else u'MODULE', name_width, u'BYTES', u'BLOCKS', u'RSS')]
+
+        for name, usage in zip(names, usages):
+            lines.append(row_fmt.format(name, name_width, *(u'-' if v is None else u'{:,}'.format(v) for v in usage[1:4])))
+
+        if any(usage.partial for usage in usages):
+            lines.append(u'* leaves out modules that couldn\'t be measured')
+
+        return u'\n'.join(lines)
+
+    def top(
+            self,
+            limit=None,  # type: typing.Optional[int]
+            subtrees=False,  # type: bool
+    ):  # type: (...) -> typing.List[MemoryUsage]
+        """
+        Returns the (at most ``limit``) modules (or package subtrees, if
+        ``subtrees`` is true) that allocated the most, largest first.
+        Where allocations couldn't be traced, growth in RSS is used
+        instead.
+        """
+        usages = self._subtrees().values() if subtrees else self._usages.values()
+        usages = sorted(usages, key=lambda usage: (-(usage.size or 0), -(usage.rss or 0), usage.name))
+
+        return usages if limit is None else usages[:limit]
+
+    # ---- Private methods -----------------------------------------------
+
+    def _snapshot(self):
+        # type: (...) -> typing.Any
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def _subtrees(self):
+        # type: (...) -> typing.Dict[typing.Text, MemoryUsage]
+        totals = {}  # type: typing.Dict[typing.Text, typing.List[typing.Optional[int]]]
+        missing = {}  # type: typing.Dict[typing.Text, typing.List[bool]]
+
+        for usage in self._usages.values():
+            name = usage.name
+
+            while name:
+                total = totals.setdefault(name, [None, None, None])
+                name_missing = missing.setdefault(name, [False, False, False])
+
+                # Sum what is known, so one module that couldn't be
+                # measured doesn't hide everything else in the subtree
+                for i, v in enumerate(usage[1:4]):
+                    if v is None:
+                        name_missing[i] = True
+                    else:
+                        total[i] = v if total[i] is None else total[i] + v
+
+                name = name.rpartition('.')[0]
+
+        return dict((name, MemoryUsage(name, total[0], total[1], total[2], any(v is not None and m for v, m in zip(total, missing[name])))) for name, total in totals.items())
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def _rss():
+    # type: (...) -> typing.Optional[int]
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (EnvironmentError, ValueError, IndexError):
+        pass
+
+    if resource is None:
+        return None
+
+    # Not the current RSS, but its high-water mark, which is still good
+    # for telling which imports made it grow; it's in KiB everywhere but
+    # macOS, where it's in bytes
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return max_rss if os.uname()[0] == 'Darwin' else max_rss * 1024
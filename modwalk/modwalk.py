@@ -17,26 +17,58 @@ TYPE_CHECKING = False  # from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+    from .checkpoint import Checkpoint  # noqa: F401 # pylint: disable=unused-import,useless-suppression
+    from .memprof import MemoryProfile  # noqa: F401 # pylint: disable=unused-import,useless-suppression
+    from .order import Frontier, ImportTimes  # noqa: F401 # pylint: disable=unused-import,useless-suppression
+    from .progress import Progress  # noqa: F401 # pylint: disable=unused-import,useless-suppression
+    from .records import WalkTable  # noqa: F401 # pylint: disable=unused-import,useless-suppression
 
 from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
-from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
 
 # ---- Imports -----------------------------------------------------------
 
-import collections
 import importlib
 import logging
-import os.path
+import os
 import re
+import sys
+import timeit
+import types
+
+from .order import frontierfactory
+from .records import (
+    STATUS_FAILED,
+    STATUS_LOADED,
+    STATUS_PROXIED,
+)
+
+try:
+    from sys import intern
+except ImportError:  # py2, where it's a builtin
+    pass
+
+try:
+    from importlib import machinery as _machinery
+    from importlib import util as _util
+except ImportError:  # py2
+    _machinery = None  # type: ignore
+    _util = None  # type: ignore
 
 # ---- Data --------------------------------------------------------------
 
 __all__ = (
+    'ModuleProxy',
     'modgen',
+    'scannames',
+    'submodnames',
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Only consulted where importlib.machinery is unavailable (py2)
 _EXTS_PY = set((
     '.py',
     '.pyc',
@@ -45,10 +77,110 @@ _EXTS_PY = set((
     '.so',
 ))
 
+# Listings of the directories inside zip archives (see _archivelisting),
+# by archive path
+_ARCHIVE_LISTINGS = {}  # type: typing.Dict[typing.Text, typing.Tuple[typing.Any, typing.Dict[typing.Text, typing.Tuple[typing.Set[typing.Text], typing.Set[typing.Text]]]]]
+
 _PKG_MOD = '__init__'
 
+_PYCACHE_DIR = '__pycache__'
+
 _RE_MOD_NAME = r'^[A-Za-z_][0-9A-Za-z_]*$'
 
+# Attributes a ModuleProxy answers without importing (if it doesn't have
+# them, neither will the module)
+_PROXY_NOLOAD_ATTRS = frozenset((
+    '__cached__',
+    '__file__',
+    '__path__',
+))
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class ModuleProxy(object):
+    """
+    Stands in for the module described by ``spec`` (a
+    :class:`~importlib.machinery.ModuleSpec`) without importing it. The
+    module's ``__name__``, ``__file__``, ``__path__`` (if it is a
+    package), ``__spec__``, ``__loader__``, ``__package__``, and
+    ``__cached__`` are available as-is. Accessing (or setting) any other
+    attribute imports the module (along with its parents, as usual) and
+    is delegated to it.
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(self, spec):
+        # type: (typing.Any) -> None
+        attrs = self.__dict__
+        attrs['_ModuleProxy__module'] = None
+        attrs['__name__'] = spec.name
+        attrs['__spec__'] = spec
+        attrs['__loader__'] = spec.loader
+        attrs['__package__'] = spec.parent
+
+        if spec.has_location:
+            attrs['__file__'] = spec.origin
+
+        if spec.cached is not None:
+            attrs['__cached__'] = spec.cached
+
+        if spec.submodule_search_locations is not None:
+            attrs['__path__'] = list(spec.submodule_search_locations)
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __dir__(self):
+        # type: (...) -> typing.List[typing.Text]
+        return dir(self.load())
+
+    def __getattr__(self, attr):
+        # type: (typing.Text) -> typing.Any
+        # Only called where attr isn't one of those set in __init__
+        if attr in _PROXY_NOLOAD_ATTRS:
+            raise AttributeError('module {!r} has no attribute {!r}'.format(self.__name__, attr))
+
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        # type: (...) -> typing.Text
+        if self.__module is None:
+            return '<module {!r} (not yet loaded)>'.format(self.__name__)
+
+        return repr(self.__module)
+
+    def __setattr__(self, attr, value):
+        # type: (typing.Text, typing.Any) -> None
+        setattr(self.load(), attr, value)
+
+    # ---- Properties ----------------------------------------------------
+
+    @property
+    def __doc__(self):  # type: ignore
+        # type: (...) -> typing.Optional[typing.Text]
+        return self.load().__doc__
+
+    @property
+    def loaded(self):
+        # type: (...) -> bool
+        """
+        Whether the module has been imported via this proxy.
+        """
+        return self.__module is not None
+
+    # ---- Public methods ------------------------------------------------
+
+    def load(self):
+        # type: (...) -> types.ModuleType
+        """
+        Imports (if necessary) and returns the module.
+        """
+        if self.__module is None:
+            self.__dict__['_ModuleProxy__module'] = importlib.import_module(self.__name__)
+
+        return self.__module
+
 # ---- Functions ---------------------------------------------------------
 
 # ========================================================================
@@ -64,60 +196,430 @@ def logimporterror(logger, name, level=logging.INFO):
     logger.log(level, 'unable to load "%s" (skipping)', name, exc_info=mouthpiece.level <= logging.DEBUG)
 
 # ========================================================================
-def modgen(mod_specs):
+def modgen(
+        mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+        seen=(),  # type: typing.Iterable[typing.Text]
+        checkpoint=None,  # type: typing.Optional[Checkpoint]
+        order=None,  # type: typing.Union[None, typing.Text, typing.Callable[[], Frontier]]
+        import_times=None,  # type: typing.Optional[ImportTimes]
+        lazy=False,  # type: bool
+        records=None,  # type: typing.Optional[WalkTable]
+        memory=None,  # type: typing.Optional[MemoryProfile]
+        progress=None,  # type: typing.Optional[Progress]
+        prefilter=None,  # type: typing.Optional[typing.Callable[[typing.List[typing.Text], typing.List[typing.Text]], typing.Iterable[typing.Text]]]
+):  # type: (...) -> typing.Iterator[typing.Any]
     """
-    TODO
+    Generates each module in ``mod_specs``, an iterable of ``(module,
+    recurse)`` pairs. ``module`` is either a module object or a fully
+    qualified name (imported when visited). Where ``recurse`` is true and
+    ``module`` is a package, its sub-modules and sub-packages are
+    discovered (from every entry in its ``__path__``), loaded, and
+    generated as well. Modules named in ``seen`` are skipped.
+
+    If provided, ``checkpoint`` (a :class:`~modwalk.checkpoint.Checkpoint`)
+    is updated with the walk's state as it progresses.
+
+    ``order`` determines the order in which modules are visited (see
+    :func:`~modwalk.order.frontierfactory`). Discovered modules are not
+    imported until they are visited, so the order is also the import
+    order. If provided, ``import_times`` (an
+    :class:`~modwalk.order.ImportTimes`) records how long each import
+    took (and is what the ``"cheapest"`` order consults).
+
+    If ``lazy`` is true, modules that are named (rather than given as
+    module objects) and have not already been imported are generated as
+    :class:`ModuleProxy` objects, which import their modules only once
+    something other than their names, paths, etc. is accessed. Discovery
+    of sub-modules proceeds without importing anything, so (e.g.) a
+    callback that filters by name never pays for importing the modules it
+    filters out.
+
+    If provided, ``records`` (a :class:`~modwalk.records.WalkTable`)
+    receives a record for each module generated, and for each one that
+    could not be loaded.
+
+    If provided, ``memory`` (a :class:`~modwalk.memprof.MemoryProfile`)
+    records the memory allocated by each import (including those that
+    fail).
+
+    If provided, ``progress`` (a :class:`~modwalk.progress.Progress`) is
+    told when each module is visited, and when each import starts.
+
+    If provided, ``prefilter`` is called with the (fully qualified) names
+    of each package's discovered sub-modules and sub-packages, along with
+    the package's ``__path__``, and returns those that should be visited.
+    The rest are skipped before anything is found or imported (e.g., see
+    :class:`~modwalk.sample.Sample`).
     """
-    mod_specs = collections.deque(mod_specs)
-    seen = set()
+    frontier = frontierfactory(order, import_times)()
+    frontier.push(mod_specs)
+    seen = set(seen)
+    # A walk table already has a record of each module generated, so it
+    # stands in for the set of those seen, unless the walk starts from
+    # one or a checkpoint has to save it
+    seen_in_records = records is not None \
+        and checkpoint is None \
+        and not seen
+    lazy = lazy and _machinery is not None
+    search_paths = {}  # type: typing.Dict[typing.Text, typing.List[typing.Text]]
+
+    try:
+        while frontier:
+            if checkpoint is not None:
+                checkpoint.update(frontier, seen)
+
+            mod, recurse = frontier.pop()
+            mod_name = getattr(mod, '__name__', mod)
+
+            if seen_in_records:
+                rec_idx = records.find(mod_name)  # type: ignore
+                visited = rec_idx >= 0 and records[rec_idx].status != STATUS_FAILED  # type: ignore
+            else:
+                visited = mod_name in seen
+
+            if visited:
+                _LOGGER.warning('module "%s" already visited (skipping)', mod_name)
+                continue
+
+            if checkpoint is not None:
+                checkpoint.started(mod_name)
+
+            if lazy \
+                    and not isinstance(mod, types.ModuleType) \
+                    and mod_name not in sys.modules:
+                mod = _lazyproxy(mod_name, search_paths)
+            elif not isinstance(mod, types.ModuleType):
+                was_loaded = mod_name in sys.modules
+
+                if progress is not None \
+                        and not was_loaded:
+                    progress.started(mod_name)
 
-    while mod_specs:
-        mod, recurse = mod_specs.popleft()
+                mem_before = None if memory is None or was_loaded else memory.before()
+                start = timeit.default_timer()
 
-        if mod.__name__ in seen:
-            _LOGGER.warning('module "%s" already visited (skipping)', mod.__name__)
+                try:
+                    mod = importlib.import_module(mod_name)
+                except Exception:  # pylint: disable=broad-except
+                    logimporterror(_LOGGER, mod_name)
+                    mod = None
+                else:
+                    if import_times is not None \
+                            and not was_loaded:
+                        import_times.record(mod_name, timeit.default_timer() - start)
+
+                if mem_before is not None:
+                    memory.after(mod_name, mem_before)
+
+            if progress is not None:
+                progress.finished(mod_name)
+
+            if records is not None:
+                parent_idx = records.find(mod_name.rpartition('.')[0])
+
+                if mod is None:
+                    records.append(mod_name, parent=parent_idx, status=STATUS_FAILED)
+                else:
+                    records.append(mod_name, getattr(mod, '__file__', None), parent_idx, hasattr(mod, '__path__'), STATUS_PROXIED if isinstance(mod, ModuleProxy) else STATUS_LOADED)
+
+            if mod is None:
+                continue
+
+            if not seen_in_records:
+                seen.add(mod_name)
+
+            yield mod
+
+            search_path = getattr(mod, '__path__', None)
+
+            if lazy \
+                    and search_path:
+                # Even if not recursing, so that sub-modules given explicitly
+                # (e.g., by installedspecs) can be found without importing
+                # their packages
+                search_paths[mod_name] = search_path
+
+            if recurse \
+                    and search_path:
+                mod_pfx = mod_name + '.'
+                sub_names = [intern(mod_pfx + candidate) for candidate in sorted(submodnames(search_path))]
+
+                if prefilter is not None:
+                    sub_names = prefilter(sub_names, search_path)
+
+                frontier.push((sub_name, recurse) for sub_name in sub_names)
+
+        if checkpoint is not None:
+            checkpoint.update(frontier, seen)
+    finally:
+        if checkpoint is not None:
+            # However the walk stopped, it wasn't by crashing
+            checkpoint.stopped()
+
+# ========================================================================
+def scannames(
+        mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+):  # type: (...) -> typing.Iterator[typing.Text]
+    """
+    Generates the names of the modules in ``mod_specs`` (see
+    :func:`modgen`) and (where ``recurse`` is true) of the candidate
+    sub-modules and sub-packages found by listing their directories with
+    :func:`submodnames`, which leaves the import system's directory
+    caches warm for a later walk. Nothing is found or imported (except
+    the parents of named modules that aren't already imported), so this
+    is much cheaper than a walk, but it doesn't descend into sub-packages
+    in zip archives, and some candidates may not be importable.
+    """
+    for mod, recurse in mod_specs:
+        mod_name = getattr(mod, '__name__', mod)
+        yield mod_name
+
+        if not recurse:
+            continue
+
+        if isinstance(mod, types.ModuleType):
+            search_path = getattr(mod, '__path__', None)
+        elif mod_name in sys.modules:
+            search_path = getattr(sys.modules[mod_name], '__path__', None)
+        elif _util is not None:
+            try:
+                spec = _util.find_spec(mod_name)
+            except Exception:  # pylint: disable=broad-except
+                continue
+
+            search_path = None if spec is None else spec.submodule_search_locations
+        else:
             continue
 
-        mod_path = mod.__file__
-        mod_path_dir = os.path.dirname(mod_path)
-        mod_path_base, _ = os.path.splitext(os.path.basename(mod_path))
-        seen.add(mod.__name__)
-        yield mod
+        stack = [(mod_name, list(search_path or ()))]
+
+        while stack:
+            pkg_name, search_path = stack.pop()
+
+            for candidate in sorted(submodnames(search_path)):
+                sub_name = pkg_name + '.' + candidate
+                yield sub_name
+                sub_path = [os.path.join(path_entry, candidate) for path_entry in search_path]
+                sub_path = [path_entry for path_entry in sub_path if os.path.isdir(path_entry)]
+
+                if sub_path:
+                    stack.append((sub_name, sub_path))
+
+# ========================================================================
+def submodnames(search_path):
+    """
+    Returns the set of names of candidate sub-modules and sub-packages
+    found in ``search_path`` (e.g., a package's ``__path__``). Nothing is
+    imported. Entries inside zip archives (e.g., zipped application
+    bundles or wheels on ``sys.path``) are listed from the archive's
+    central directory without extracting anything.
+    """
+    suffixes = _suffixes()
+    candidates = set()
+
+    for path_entry in search_path:
+        archive_listing = _archivelisting(path_entry)
+
+        if archive_listing is None:
+            ent_names, dir_names = _listdir(path_entry), None
+        else:
+            ent_names, dir_names = archive_listing
+
+        for ent_name in ent_names:
+            for suffix in suffixes:
+                if ent_name.endswith(suffix):
+                    ent_base = ent_name[:-len(suffix)]
+
+                    if ent_base != _PKG_MOD \
+                            and re.search(_RE_MOD_NAME, ent_base):
+                        candidates.add(ent_base)
+
+                    break
+            else:
+                ent_path = os.path.join(path_entry, ent_name)
+
+                if ent_name != _PYCACHE_DIR \
+                        and re.search(_RE_MOD_NAME, ent_name) \
+                        and (os.path.isdir(ent_path) if dir_names is None else ent_name in dir_names):
+                    candidates.add(ent_name)
+                else:
+                    _LOGGER.debug('"%s" is not a module or package (skipping)', ent_path)
+
+    return candidates
+
+# ========================================================================
+def _archivelisting(path_entry):
+    # type: (typing.Text) -> typing.Optional[typing.Tuple[typing.Set[typing.Text], typing.Set[typing.Text]]]
+    finder = _pathfinder(path_entry)
+    archive = getattr(finder, 'archive', None)
+
+    if archive is None:
+        # Not a zipimporter, so not in an archive
+        return None
+
+    try:
+        # Use the central directory the zipimporter already read (and
+        # shares with every other zipimporter for the same archive)
+        files = finder._get_files()  # pylint: disable=protected-access
+    except AttributeError:
+        files = getattr(finder, '_files', None)
+
+    if files is not None:
+        token = files
+    else:
+        try:
+            st = os.stat(archive)
+        except OSError:
+            return set(), set()
+
+        token = (st.st_mtime, st.st_size)
+
+    cached_token, listings = _ARCHIVE_LISTINGS.get(archive, (None, None))
+
+    # A zipimporter replaces (rather than modifies) its directory when
+    # invalidated, so it's enough to check that it's the same one
+    is_stale = cached_token is not token if files is not None else cached_token != token
 
-        if recurse:
-            new_mod_specs = collections.deque()
+    if is_stale:
+        if files is None:
+            ent_paths = _archivenames(archive)
+        else:
+            ent_paths = (ent_path.replace(os.sep, '/') for ent_path in files)
+
+        listings = _archivelistings(ent_paths)
+        _ARCHIVE_LISTINGS[archive] = (token, listings)
+
+    prefix = (getattr(finder, 'prefix', '') or '').replace(os.sep, '/').strip('/')
+
+    return listings.get(prefix, (set(), set()))
+
+# ========================================================================
+def _archivelistings(ent_paths):
+    # type: (typing.Iterable[typing.Text]) -> typing.Dict[typing.Text, typing.Tuple[typing.Set[typing.Text], typing.Set[typing.Text]]]
+    # Maps each directory inside an archive to the names of its entries
+    # and the subset of those that are directories; archives need not
+    # have entries for their directories, so these are inferred from
+    # the paths of the entries inside them
+    listings = {}  # type: typing.Dict[typing.Text, typing.Tuple[typing.Set[typing.Text], typing.Set[typing.Text]]]
+
+    for ent_path in ent_paths:
+        parts = ent_path.split('/')
+        dir_path = ''
+
+        for i, part in enumerate(parts):
+            if not part:
+                break
+
+            ent_names, dir_names = listings.setdefault(dir_path, (set(), set()))
+            ent_names.add(part)
+
+            if i < len(parts) - 1:
+                dir_names.add(part)
+
+            dir_path = part if not dir_path else dir_path + '/' + part
+
+    return listings
+
+# ========================================================================
+def _archivenames(archive):
+    # type: (typing.Text) -> typing.List[typing.Text]
+    # Only needed where a zipimporter's directory isn't available, so
+    # don't make every import of this module pay for them
+    import mmap
+    import zipfile
+
+    # Map the archive rather than reading it, so that only the pages
+    # holding the central directory are ever touched
+    try:
+        with open(archive, 'rb') as f:
+            archive_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
-            if mod_path_base == _PKG_MOD:
-                candidates = set()
+        try:
+            return zipfile.ZipFile(archive_map).namelist()
+        finally:
+            archive_map.close()
+    except (EnvironmentError, ValueError, zipfile.BadZipfile):
+        _LOGGER.debug('unable to read "%s" (skipping)', archive)
 
-                for ent_name in os.listdir(mod_path_dir):
-                    ent_path = os.path.join(mod_path_dir, ent_name)
+        return []
 
-                    if os.path.isdir(ent_path):
-                        if re.search(_RE_MOD_NAME, ent_name):
-                            candidates.add(ent_name)
-                    elif os.path.isfile(ent_path):
-                        ent_base, ent_ext = os.path.splitext(ent_name)
+# ========================================================================
+def _lazyproxy(
+        mod_name,  # type: typing.Text
+        search_paths,  # type: typing.Mapping[typing.Text, typing.List[typing.Text]]
+):  # type: (...) -> typing.Optional[ModuleProxy]
+    parent_name = mod_name.rpartition('.')[0]
+
+    try:
+        if parent_name in search_paths:
+            # Avoid importlib.util.find_spec, which imports the parent
+            spec = _machinery.PathFinder.find_spec(mod_name, search_paths[parent_name])
+        else:
+            spec = _util.find_spec(mod_name)
+    except Exception:  # pylint: disable=broad-except
+        logimporterror(_LOGGER, mod_name)
+
+        return None
 
-                        if ent_base == _PKG_MOD:
-                            continue
+    if spec is None:
+        _LOGGER.info('unable to find "%s" (skipping)', mod_name)
+
+        return None
+
+    return ModuleProxy(spec)
+
+# ========================================================================
+def _listdir(path_entry):
+    finder = _pathfinder(path_entry)
 
-                        if ent_ext in _EXTS_PY \
-                                and re.search(_RE_MOD_NAME, ent_base):
-                            candidates.add(ent_base)
-                    else:
-                        _LOGGER.debug('"%s" is of unknown type (skipping)', ent_path)
+    if hasattr(finder, '_path_cache') \
+            and hasattr(finder, '_fill_cache'):
+        # This is a FileFinder, so use (and refresh, if stale) its
+        # listing the same way FileFinder.find_spec does, rather than
+        # reading the directory a second time
+        try:
+            mtime = os.stat(finder.path or os.getcwd()).st_mtime
+        except OSError:
+            mtime = -1
 
-                mod_pfx = mod.__name__ + '.'
+        if mtime != finder._path_mtime:  # pylint: disable=protected-access
+            finder._fill_cache()  # pylint: disable=protected-access
+            finder._path_mtime = mtime  # pylint: disable=protected-access
 
-                for candidate in candidates:
-                    fq_candidate = mod_pfx + candidate
+        return finder._path_cache  # pylint: disable=protected-access
 
-                    try:
-                        new_mod = importlib.import_module(fq_candidate)
-                    except Exception:  # pylint: disable=broad-except
-                        logimporterror(_LOGGER, fq_candidate)
-                    else:
-                        new_mod_specs.appendleft((new_mod, recurse))
+    try:
+        return os.listdir(path_entry)
+    except OSError:
+        _LOGGER.debug('unable to list "%s" (skipping)', path_entry)
+
+        return ()
+
+# ========================================================================
+def _pathfinder(path_entry):
+    try:
+        return sys.path_importer_cache[path_entry]
+    except KeyError:
+        pass
+
+    if _machinery is None:
+        return None
+
+    try:
+        # This creates the finder the same way the import system would
+        # and caches it in sys.path_importer_cache so subsequent imports
+        # share its listing
+        return _machinery.PathFinder._path_importer_cache(path_entry)  # pylint: disable=protected-access
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+# ========================================================================
+def _suffixes():
+    if _machinery is None:
+        suffixes = _EXTS_PY
+    else:
+        suffixes = _machinery.all_suffixes()
 
-            mod_specs.extendleft(new_mod_specs)
+    # Longest first, so that (e.g.) ".cpython-36m-darwin.so" is stripped
+    # in its entirety rather than just ".so"
+    return sorted(set(suffixes), key=len, reverse=True)
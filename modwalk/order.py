@@ -0,0 +1,314 @@
+# -*- encoding: utf-8; test-case-name: tests.test_order -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import collections
+import functools
+import heapq
+import itertools
+import logging
+
+from .persist import (
+    dumpcompact,
+    loadcompact,
+)
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'BreadthFirst',
+    'CheapestFirst',
+    'DepthFirst',
+    'Frontier',
+    'ImportTimes',
+    'SortedByName',
+    'VISIT_ORDERS',
+    'frontierfactory',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class Frontier(object):
+    """
+    Base class for the pending ``(module, recurse)`` entries of a
+    :func:`~modwalk.modwalk.modgen` walk, where ``module`` is a module
+    object or a fully qualified name. Subclasses decide the order in which
+    entries are popped (i.e., visited).
+    """
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __bool__(self):
+        # type: (...) -> bool
+        return len(self) > 0
+
+    __nonzero__ = __bool__  # py2
+
+    def __iter__(self):
+        # type: (...) -> typing.Iterator[typing.Tuple[typing.Any, bool]]
+        raise NotImplementedError
+
+    def __len__(self):
+        # type: (...) -> int
+        raise NotImplementedError
+
+    # ---- Public methods ------------------------------------------------
+
+    def pop(self):
+        # type: (...) -> typing.Tuple[typing.Any, bool]
+        """
+        Removes and returns the next entry to visit.
+        """
+        raise NotImplementedError
+
+    def push(
+            self,
+            mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+    ):  # type: (...) -> None
+        """
+        Adds ``mod_specs``. Where the order is otherwise ambiguous,
+        entries pushed together are visited in the order given.
+        """
+        raise NotImplementedError
+
+# ========================================================================
+class _DequeFrontier(Frontier):
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(self):
+        # type: (...) -> None
+        self._mod_specs = collections.deque()  # type: typing.Deque[typing.Tuple[typing.Any, bool]]
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __iter__(self):
+        # type: (...) -> typing.Iterator[typing.Tuple[typing.Any, bool]]
+        return iter(self._mod_specs)
+
+    def __len__(self):
+        # type: (...) -> int
+        return len(self._mod_specs)
+
+    def pop(self):
+        # type: (...) -> typing.Tuple[typing.Any, bool]
+        return self._mod_specs.popleft()
+
+# ========================================================================
+class BreadthFirst(_DequeFrontier):
+    """
+    Visits all modules at one depth before any at the next.
+    """
+
+    # ---- Overrides -----------------------------------------------------
+
+    def push(self, mod_specs):
+        # type: (typing.Iterable[typing.Tuple[typing.Any, bool]]) -> None
+        self._mod_specs.extend(mod_specs)
+
+# ========================================================================
+class DepthFirst(_DequeFrontier):
+    """
+    Visits each package's sub-modules (and their sub-modules) before its
+    siblings. This is the default.
+    """
+
+    # ---- Overrides -----------------------------------------------------
+
+    def push(self, mod_specs):
+        # type: (typing.Iterable[typing.Tuple[typing.Any, bool]]) -> None
+        self._mod_specs.extendleft(reversed(list(mod_specs)))
+
+# ========================================================================
+class _HeapFrontier(Frontier):
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(self):
+        # type: (...) -> None
+        self._heap = []  # type: typing.List[typing.Tuple[typing.Any, ...]]
+        self._tiebreaker = itertools.count()
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __iter__(self):
+        # type: (...) -> typing.Iterator[typing.Tuple[typing.Any, bool]]
+        return (entry[-1] for entry in sorted(self._heap))
+
+    def __len__(self):
+        # type: (...) -> int
+        return len(self._heap)
+
+    def pop(self):
+        # type: (...) -> typing.Tuple[typing.Any, bool]
+        return heapq.heappop(self._heap)[-1]
+
+    def push(self, mod_specs):
+        # type: (typing.Iterable[typing.Tuple[typing.Any, bool]]) -> None
+        for mod_spec in mod_specs:
+            mod_name = getattr(mod_spec[0], '__name__', mod_spec[0])
+            heapq.heappush(self._heap, (self.key(mod_name), next(self._tiebreaker), mod_spec))
+
+    # ---- Public methods ------------------------------------------------
+
+    def key(self, mod_name):
+        # type: (typing.Text) -> typing.Any
+        raise NotImplementedError
+
+# ========================================================================
+class SortedByName(_HeapFrontier):
+    """
+    Visits modules in lexicographic order of their fully qualified names
+    (which is also a depth-first order with sorted siblings).
+    """
+
+    # ---- Overrides -----------------------------------------------------
+
+    def key(self, mod_name):
+        # type: (typing.Text) -> typing.Any
+        return mod_name
+
+# ========================================================================
+class CheapestFirst(_HeapFrontier):
+    """
+    Visits the pending modules with the lowest expected import time first,
+    according to ``import_times`` (an :class:`ImportTimes`, typically
+    recorded by earlier walks). Ties are broken by name.
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            import_times=None,  # type: typing.Optional[ImportTimes]
+    ):  # type: (...) -> None
+        super(CheapestFirst, self).__init__()
+        self.import_times = ImportTimes() if import_times is None else import_times
+
+    # ---- Overrides -----------------------------------------------------
+
+    def key(self, mod_name):
+        # type: (typing.Text) -> typing.Any
+        return (self.import_times.cost(mod_name), mod_name)
+
+# ========================================================================
+class ImportTimes(object):
+    """
+    Import durations (in seconds) by fully qualified module name.
+    :func:`~modwalk.modwalk.modgen` records into one of these (if given),
+    and :class:`CheapestFirst` consults one.
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            times=None,  # type: typing.Optional[typing.Mapping[typing.Text, float]]
+    ):  # type: (...) -> None
+        self._times = {}  # type: typing.Dict[typing.Text, float]
+        self._total = 0.0
+
+        for mod_name, secs in (times or {}).items():
+            self.record(mod_name, secs)
+
+    # ---- Class methods -------------------------------------------------
+
+    @classmethod
+    def load(cls, path):
+        # type: (typing.Text) -> ImportTimes
+        return cls(loadcompact(path))
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __contains__(self, mod_name):
+        # type: (typing.Any) -> bool
+        return mod_name in self._times
+
+    def __len__(self):
+        # type: (...) -> int
+        return len(self._times)
+
+    # ---- Public methods ------------------------------------------------
+
+    def cost(self, mod_name):
+        # type: (typing.Text) -> float
+        """
+        Returns the recorded import time for ``mod_name``, or the mean of
+        all recorded times if there isn't one.
+        """
+        try:
+            return self._times[mod_name]
+        except KeyError:
+            return self._total / len(self._times) if self._times else 0.0
+
+    def record(self, mod_name, secs):
+        # type: (typing.Text, float) -> None
+        self._total += secs - self._times.get(mod_name, 0.0)
+        self._times[mod_name] = secs
+
+    def save(self, path):
+        # type: (typing.Text) -> None
+        dumpcompact(dict((mod_name, round(secs, 6)) for mod_name, secs in self._times.items()), path)
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def frontierfactory(
+        order=None,  # type: typing.Union[None, typing.Text, typing.Callable[[], Frontier]]
+        import_times=None,  # type: typing.Optional[ImportTimes]
+):  # type: (...) -> typing.Callable[[], Frontier]
+    """
+    Returns a callable that creates an empty :class:`Frontier` for
+    ``order``, which is either a key in :data:`VISIT_ORDERS` (``None``
+    means ``"dfs"``) or itself such a callable (which is returned as-is).
+    """
+    if order is None:
+        order = 'dfs'
+
+    if callable(order):
+        return order
+
+    try:
+        frontier_cls = VISIT_ORDERS[order]
+    except KeyError:
+        raise ValueError('unrecognized visit order {!r} (must be one of {})'.format(order, ', '.join(sorted(VISIT_ORDERS))))
+
+    if frontier_cls is CheapestFirst:
+        return functools.partial(CheapestFirst, import_times)
+
+    return frontier_cls
+
+# ---- Data --------------------------------------------------------------
+
+VISIT_ORDERS = {
+    'bfs': BreadthFirst,
+    'cheapest': CheapestFirst,
+    'dfs': DepthFirst,
+    'sorted': SortedByName,
+}  # type: typing.Dict[typing.Text, typing.Callable[..., Frontier]]
@@ -0,0 +1,89 @@
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import json
+import os
+import tempfile
+import zlib
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'dumpcompact',
+    'loadcompact',
+)
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def dumpcompact(obj, path):
+    # type: (typing.Any, typing.Text) -> None
+    """
+    Writes ``obj`` (which must be JSON-serializable) to ``path`` as
+    compressed JSON. The write is atomic, so a reader (or a process
+    restarted after being killed mid-write) never sees a partial file.
+
+    >>> import os, shutil, tempfile
+    >>> tmp_dir = tempfile.mkdtemp()
+    >>> path = os.path.join(tmp_dir, 'state')
+    >>> dumpcompact({'a': [1, 2]}, path)
+    >>> loadcompact(path) == {'a': [1, 2]}
+    True
+    >>> shutil.rmtree(tmp_dir)
+    """
+    path_dir = os.path.dirname(os.path.abspath(path))
+    data = zlib.compress(json.dumps(obj, separators=(',', ':'), sort_keys=True).encode('utf-8'))
+    fd, tmp_path = tempfile.mkstemp(dir=path_dir, prefix='.' + os.path.basename(path) + '.')
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+
+        _replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+
+        raise
+
+# ========================================================================
+def loadcompact(path):
+    # type: (typing.Text) -> typing.Any
+    """
+    Reads an object written by :func:`dumpcompact` from ``path``.
+    """
+    with open(path, 'rb') as f:
+        return json.loads(zlib.decompress(f.read()).decode('utf-8'))
+
+# ========================================================================
+def _replace(src, dst):
+    # type: (typing.Text, typing.Text) -> None
+    try:
+        replace = os.replace  # type: ignore
+    except AttributeError:  # py2 (atomic on POSIX, which is what matters)
+        replace = os.rename
+
+    replace(src, dst)
@@ -0,0 +1,203 @@
+# -*- encoding: utf-8; test-case-name: tests.test_precompile -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import os
+import py_compile
+import struct
+import sys
+
+from .modwalk import modgen
+
+try:
+    from concurrent import futures as _futures
+    from importlib import util as _util
+except ImportError:  # py2
+    _futures = None  # type: ignore
+    _util = None  # type: ignore
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'precompile',
+    'sourcefiles',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 64
+
+# Bits in a pyc's flags (see PEP 552)
+_FLAG_HASH_BASED = 0b01
+_FLAG_CHECK_SOURCE = 0b10
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def precompile(
+        paths,  # type: typing.Iterable[typing.Text]
+        pycache_prefix=None,  # type: typing.Optional[typing.Text]
+        jobs=None,  # type: typing.Optional[int]
+):  # type: (...) -> typing.Tuple[int, typing.List[typing.Tuple[typing.Text, typing.Text]]]
+    """
+    Compiles each source file in ``paths`` to bytecode where its cached
+    bytecode is missing or stale, using up to ``jobs`` processes (one per
+    CPU by default). Bytecode is written where the import system will look
+    for it: in ``__pycache__`` directories, or in a parallel tree under
+    ``pycache_prefix`` (like :envvar:`PYTHONPYCACHEPREFIX`) if one is
+    given. Otherwise, the current prefix (if any, e.g., from
+    :envvar:`PYTHONPYCACHEPREFIX`) is used.
+
+    Cached bytecode is up to date if the import system would use it,
+    whether it is checked by timestamp or by hash (e.g., where it was
+    compiled with :envvar:`SOURCE_DATE_EPOCH` set).
+
+    Returns the number of files compiled and a list of ``(path, error)``
+    for those that could not be.
+    """
+    paths = list(paths)
+    results = []  # type: typing.List[typing.Tuple[typing.Text, typing.Optional[typing.Text]]]
+
+    if _futures is None \
+            or jobs == 1 \
+            or len(paths) <= _CHUNK_SIZE:
+        if pycache_prefix is None:
+            results.extend(_compile(path) for path in paths)
+        else:
+            orig_pycache_prefix = getattr(sys, 'pycache_prefix', None)
+            _setpycacheprefix(pycache_prefix)
+
+            try:
+                results.extend(_compile(path) for path in paths)
+            finally:
+                _setpycacheprefix(orig_pycache_prefix)
+    else:
+        # Workers inherit the current prefix (if any) unless told otherwise
+        initializer = None if pycache_prefix is None else _setpycacheprefix
+
+        with _futures.ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=(pycache_prefix,)) as executor:
+            results.extend(executor.map(_compile, paths, chunksize=_CHUNK_SIZE))
+
+    compiled = 0
+    failures = []
+
+    for path, error in results:
+        if error is None:
+            compiled += 1
+        elif error:
+            failures.append((path, error))
+
+    _LOGGER.debug('compiled %d source file(s) (%d up to date, %d failed)', compiled, len(results) - compiled - len(failures), len(failures))
+
+    return compiled, failures
+
+# ========================================================================
+def sourcefiles(
+        mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+):  # type: (...) -> typing.Iterator[typing.Text]
+    """
+    Generates the path of the source file of each module that a (lazy)
+    :func:`~modwalk.modwalk.modgen` walk of ``mod_specs`` would visit.
+    Nothing new is imported.
+    """
+    for mod in modgen(mod_specs, lazy=True):
+        spec = getattr(mod, '__spec__', None)
+        loader = getattr(spec, 'loader', None)
+
+        if spec is None \
+                or not spec.has_location \
+                or not hasattr(loader, 'source_to_code'):
+            continue
+
+        if spec.origin.endswith('.py'):
+            yield spec.origin
+
+# ========================================================================
+def _compile(path):
+    # type: (typing.Text) -> typing.Tuple[typing.Text, typing.Optional[typing.Text]]
+    # Returns (path, None) if compiled, (path, '') if already up to date,
+    # or (path, error) otherwise
+    try:
+        cfile = _util.cache_from_source(path) if _util is not None else path + 'c'
+
+        if _isfresh(path, cfile):
+            return path, ''
+
+        py_compile.compile(path, cfile=cfile, doraise=True)
+    except (OSError, py_compile.PyCompileError) as exc:
+        return path, str(exc)
+
+    return path, None
+
+# ========================================================================
+def _isfresh(path, cfile):
+    # type: (typing.Text, typing.Text) -> bool
+    # Mirrors the import system's check of a pyc's header (magic, flags,
+    # then either source mtime and size, or source hash; see PEP 552)
+    if _util is None:
+        return False
+
+    try:
+        with open(cfile, 'rb') as f:
+            header = f.read(16)
+
+        st = os.stat(path)
+    except OSError:
+        return False
+
+    if len(header) < 16 \
+            or header[:4] != _util.MAGIC_NUMBER:
+        return False
+
+    flags = struct.unpack('<I', header[4:8])[0]
+
+    if flags == 0:
+        mtime, size = struct.unpack('<II', header[8:16])
+
+        return mtime == (int(st.st_mtime) & 0xffffffff) \
+            and size == (st.st_size & 0xffffffff)
+
+    if flags == _FLAG_HASH_BASED:
+        # Unchecked, so the import system uses it no matter what
+        return True
+
+    if flags != _FLAG_HASH_BASED | _FLAG_CHECK_SOURCE:
+        return False
+
+    try:
+        with open(path, 'rb') as f:
+            return header[8:16] == _util.source_hash(f.read())
+    except OSError:
+        return False
+
+# ========================================================================
+def _setpycacheprefix(pycache_prefix):
+    # type: (typing.Optional[typing.Text]) -> None
+    if hasattr(sys, 'pycache_prefix'):
+        sys.pycache_prefix = pycache_prefix  # type: ignore
+    elif pycache_prefix is not None:
+        _LOGGER.warning('this Python does not support a bytecode cache prefix (ignoring)')
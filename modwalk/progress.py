@@ -0,0 +1,276 @@
+# -*- encoding: utf-8; test-case-name: tests.test_progress -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import collections
+import logging
+import sys
+import threading
+import timeit
+
+from .modwalk import scannames
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'Progress',
+    'ProgressStatus',
+    'estimate',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# An import in progress for at least this long is shown as slow
+_SLOW_SECS = 1.0
+
+# The import rate is measured over (roughly) this many of the most
+# recent seconds
+_RATE_WINDOW_SECS = 10.0
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class ProgressStatus(collections.namedtuple('ProgressStatus', ('done', 'total', 'rate', 'slowest', 'slowest_secs', 'eta_secs'))):
+    """
+    A snapshot of a walk's :class:`Progress`: the number of modules
+    ``done`` out of an estimated ``total`` (``None`` if unknown), the
+    recent ``rate`` (in modules per second, or ``None`` before it can be
+    measured), the name of the import in progress (``slowest``, or
+    ``None`` if it hasn't taken long enough to mention) and how many
+    seconds it has taken so far (``slowest_secs``), and the estimated
+    seconds remaining (``eta_secs``, or ``None``).
+
+    >>> print(ProgressStatus(1234, 5000, 98.5, 'big.module', 3.25, 38.2))
+    1,234/5,000 modules (25%), 98.5/s, ETA 0:00:38, importing big.module (3.2s)
+    >>> print(ProgressStatus(17, None, None, None, None, None))
+    17 modules
+    """
+
+    __slots__ = ()
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __str__(self):
+        # type: (...) -> typing.Text
+        if self.total:
+            parts = ['{:,}/{:,} modules ({:.0%})'.format(self.done, self.total, self.done / self.total)]
+        else:
+            parts = ['{:,} modules'.format(self.done)]
+
+        if self.rate is not None:
+            parts.append('{:.1f}/s'.format(self.rate))
+
+        if self.eta_secs is not None:
+            minutes, secs = divmod(int(self.eta_secs), 60)
+            parts.append('ETA {}:{:02}:{:02}'.format(minutes // 60, minutes % 60, secs))
+
+        if self.slowest is not None:
+            parts.append('importing {} ({:.1f}s)'.format(self.slowest, self.slowest_secs))
+
+        return ', '.join(parts)
+
+# ========================================================================
+class Progress(object):
+    """
+    Tracks the progress of a :func:`~modwalk.modwalk.modgen` walk (if one
+    of these is given) towards ``total`` modules (e.g., from
+    :func:`estimate`). While it's running (between :meth:`start` and
+    :meth:`stop`), a background thread shows its :meth:`status` every
+    ``interval`` seconds on ``stream`` (by default, ``sys.stderr``),
+    overwriting a single line if it is a terminal, or one line after
+    another otherwise.
+
+    The walk itself only counts and timestamps modules, so it isn't
+    slowed down by the display. Because the display runs in its own
+    thread, it keeps going (and can point out the culprit) while a slow
+    import holds up the walk.
+
+    >>> times = iter((0.0, 0.5, 2.0))
+    >>> progress = Progress(total=4, clock=lambda: next(times))
+    >>> progress.finished('a')
+    >>> progress.started('b')
+    >>> print(progress.status())
+    1/4 modules (25%), 0.5/s, ETA 0:00:06, importing b (1.5s)
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            total=None,  # type: typing.Optional[int]
+            interval=None,  # type: typing.Optional[float]
+            stream=None,  # type: typing.Optional[typing.TextIO]
+            clock=timeit.default_timer,  # type: typing.Callable[[], float]
+    ):  # type: (...) -> None
+        self.total = total
+        self._stream = sys.stderr if stream is None else stream
+        self._isatty = _isatty(self._stream)
+        self._interval = (0.25 if self._isatty else 10.0) if interval is None else interval
+        self._clock = clock
+        self._done = 0
+        self._current = None  # type: typing.Optional[typing.Tuple[typing.Text, float]]
+        self._start = clock()
+        self._samples = collections.deque()  # type: typing.Deque[typing.Tuple[float, int]]
+        self._samples.append((self._start, 0))
+        self._stopped = threading.Event()
+        self._thread = None  # type: typing.Optional[threading.Thread]
+        self._line_len = 0
+
+    # ---- Properties ----------------------------------------------------
+
+    @property
+    def done(self):
+        # type: (...) -> int
+        return self._done
+
+    # ---- Public methods ------------------------------------------------
+
+    def finished(self, mod_name):
+        # type: (typing.Text) -> None
+        """
+        Called by :func:`~modwalk.modwalk.modgen` once it is done with
+        ``mod_name`` (whether or not it was imported successfully).
+        """
+        self._current = None
+        self._done += 1
+
+    def start(self):
+        # type: (...) -> None
+        """
+        Starts showing progress in a background thread.
+        """
+        if self._thread is not None:
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='modwalk-progress')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def started(self, mod_name):
+        # type: (typing.Text) -> None
+        """
+        Called by :func:`~modwalk.modwalk.modgen` as it starts importing
+        ``mod_name``.
+        """
+        self._current = (mod_name, self._clock())
+
+    def status(self):
+        # type: (...) -> ProgressStatus
+        """
+        Returns the current :class:`ProgressStatus`.
+        """
+        now = self._clock()
+        done = self._done
+        current = self._current
+        total = None if self.total is None else max(self.total, done)
+
+        # Keep just enough samples to span the rate window
+        samples = self._samples
+
+        while len(samples) > 1 \
+                and now - samples[1][0] >= _RATE_WINDOW_SECS:
+            samples.popleft()
+
+        then, then_done = samples[0]
+        samples.append((now, done))
+        rate = eta_secs = slowest = slowest_secs = None
+
+        if now > then:
+            rate = (done - then_done) / (now - then)
+
+        if rate \
+                and total is not None:
+            eta_secs = (total - done) / rate
+
+        if current is not None \
+                and now - current[1] >= _SLOW_SECS:
+            slowest, slowest_secs = current[0], now - current[1]
+
+        return ProgressStatus(done, total, rate, slowest, slowest_secs, eta_secs)
+
+    def stop(self):
+        # type: (...) -> None
+        """
+        Stops the background thread (if it was started) after showing
+        the final status.
+        """
+        thread = self._thread
+
+        if thread is None:
+            return
+
+        self._stopped.set()
+        thread.join()
+        self._thread = None
+        elapsed = self._clock() - self._start
+        self._show('{:,} modules in {:.1f}s'.format(self._done, elapsed))
+
+        if self._isatty:
+            self._stream.write('\n')
+            self._stream.flush()
+
+    # ---- Private methods -----------------------------------------------
+
+    def _run(self):
+        # type: (...) -> None
+        while not self._stopped.wait(self._interval):
+            self._show(str(self.status()))
+
+    def _show(self, line):
+        # type: (typing.Text) -> None
+        if not self._isatty:
+            self._stream.write(line + '\n')
+            self._stream.flush()
+
+            return
+
+        # Pad to clear what's left of a longer previous line
+        padding = ' ' * max(0, self._line_len - len(line))
+        self._line_len = len(line)
+        self._stream.write('\r' + line + padding)
+        self._stream.flush()
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def estimate(
+        mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+):  # type: (...) -> int
+    """
+    Returns an estimate of the number of modules a
+    :func:`~modwalk.modwalk.modgen` walk of ``mod_specs`` would visit,
+    made by counting what :func:`~modwalk.modwalk.scannames` finds.
+    """
+    return sum(1 for _ in scannames(mod_specs))
+
+# ========================================================================
+def _isatty(stream):
+    # type: (typing.Any) -> bool
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
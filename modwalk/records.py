@@ -0,0 +1,216 @@
+# -*- encoding: utf-8; test-case-name: tests.test_records -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import array
+import logging
+import os
+
+try:
+    from sys import intern
+except ImportError:  # py2, where it's a builtin
+    pass
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'STATUS_FAILED',
+    'STATUS_LOADED',
+    'STATUS_PROXIED',
+    'WalkRecord',
+    'WalkTable',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STATUS_LOADED = 1
+STATUS_PROXIED = 2
+STATUS_FAILED = 3
+
+_IS_PACKAGE = 0x80
+_STATUS_MASK = 0x7f
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class WalkRecord(object):
+    """
+    A snapshot of one entry of a :class:`WalkTable`. ``parent`` is the
+    index of the parent's record (or ``-1``), ``depth`` is the distance
+    from the root of the walk, and ``status`` is one of
+    :data:`STATUS_LOADED`, :data:`STATUS_PROXIED` (generated as a
+    :class:`~modwalk.modwalk.ModuleProxy`), or :data:`STATUS_FAILED`.
+    """
+
+    __slots__ = ('name', 'path', 'parent', 'depth', 'is_package', 'status')
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            name,  # type: typing.Text
+            path,  # type: typing.Optional[typing.Text]
+            parent,  # type: int
+            depth,  # type: int
+            is_package,  # type: bool
+            status,  # type: int
+    ):  # type: (...) -> None
+        self.name = name
+        self.path = path
+        self.parent = parent
+        self.depth = depth
+        self.is_package = is_package
+        self.status = status
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __eq__(self, other):
+        # type: (typing.Any) -> bool
+        if not isinstance(other, WalkRecord):
+            return NotImplemented
+
+        return all(getattr(self, attr) == getattr(other, attr) for attr in self.__slots__)
+
+    def __ne__(self, other):
+        # type: (typing.Any) -> bool
+        return not self == other
+
+    def __repr__(self):
+        # type: (...) -> typing.Text
+        return '{}({})'.format(type(self).__name__, ', '.join('{}={!r}'.format(attr, getattr(self, attr)) for attr in self.__slots__))
+
+# ========================================================================
+class WalkTable(object):
+    """
+    A compact, append-only table of :class:`WalkRecord`\\ s, filled by
+    :func:`~modwalk.modwalk.modgen` (if passed one as ``records``). Fields
+    are kept in parallel arrays, and names, directories, and file names
+    are interned (each distinct directory is stored once), so a table of
+    millions of entries needs little more memory than their names.
+
+    >>> table = WalkTable()
+    >>> table.append('a', '/src/a/__init__.py', is_package=True)
+    0
+    >>> table.append('a.b', '/src/a/b.py', parent=0)
+    1
+    >>> table[1]
+    WalkRecord(name='a.b', path='/src/a/b.py', parent=0, depth=1, is_package=False, status=1)
+    >>> table.find('a.b'), table.find('a.c'), len(table)
+    (1, -1, 2)
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(self):
+        # type: (...) -> None
+        self._idxs = {}  # type: typing.Dict[typing.Text, int]
+        self._names = []  # type: typing.List[typing.Text]
+        self._dir_idxs = {}  # type: typing.Dict[typing.Text, int]
+        self._dirs = []  # type: typing.List[typing.Text]
+        self._path_dirs = array.array('l')
+        self._path_bases = []  # type: typing.List[typing.Optional[typing.Text]]
+        self._parents = array.array('l')
+        self._depths = array.array('H')
+        self._flags = bytearray()
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __contains__(self, name):
+        # type: (typing.Any) -> bool
+        return name in self._idxs
+
+    def __getitem__(self, idx):
+        # type: (int) -> WalkRecord
+        dir_idx = self._path_dirs[idx]
+        path = None if dir_idx < 0 else os.path.join(self._dirs[dir_idx], self._path_bases[idx])  # type: ignore
+        flags = self._flags[idx]
+
+        return WalkRecord(self._names[idx], path, self._parents[idx], self._depths[idx], bool(flags & _IS_PACKAGE), flags & _STATUS_MASK)
+
+    def __iter__(self):
+        # type: (...) -> typing.Iterator[WalkRecord]
+        return (self[idx] for idx in range(len(self)))
+
+    def __len__(self):
+        # type: (...) -> int
+        return len(self._names)
+
+    # ---- Public methods ------------------------------------------------
+
+    def append(
+            self,
+            name,  # type: typing.Text
+            path=None,  # type: typing.Optional[typing.Text]
+            parent=-1,  # type: int
+            is_package=False,  # type: bool
+            status=STATUS_LOADED,  # type: int
+    ):  # type: (...) -> int
+        """
+        Appends a record and returns its index. ``depth`` is derived from
+        ``parent``. If there is already a record for ``name``, it is
+        replaced (at the same index).
+        """
+        name = intern(name)
+        depth = 0 if parent < 0 else self._depths[parent] + 1
+
+        if path is None:
+            dir_idx = -1
+            base = None
+        else:
+            dir_name, base = os.path.split(path)
+            base = intern(base)
+            dir_idx = self._dir_idxs.get(dir_name, -1)
+
+            if dir_idx < 0:
+                dir_idx = self._dir_idxs[dir_name] = len(self._dirs)
+                self._dirs.append(dir_name)
+
+        flags = (status & _STATUS_MASK) | (_IS_PACKAGE if is_package else 0)
+        idx = self._idxs.get(name, -1)
+
+        if idx >= 0:
+            self._path_dirs[idx] = dir_idx
+            self._path_bases[idx] = base
+            self._parents[idx] = parent
+            self._depths[idx] = depth
+            self._flags[idx] = flags
+        else:
+            idx = self._idxs[name] = len(self._names)
+            self._names.append(name)
+            self._path_dirs.append(dir_idx)
+            self._path_bases.append(base)
+            self._parents.append(parent)
+            self._depths.append(depth)
+            self._flags.append(flags)
+
+        return idx
+
+    def find(self, name):
+        # type: (typing.Text) -> int
+        """
+        Returns the index of the record for ``name``, or ``-1``.
+        """
+        return self._idxs.get(name, -1)
@@ -0,0 +1,177 @@
+# -*- encoding: utf-8; test-case-name: tests.test_remote -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import collections
+import json
+import logging
+import os
+import pkgutil
+
+from twisted.internet import defer as t_i_defer
+from twisted.internet import error as t_i_error
+from twisted.internet import protocol as t_i_protocol
+
+from .records import (
+    STATUS_FAILED,
+    STATUS_LOADED,
+    WalkTable,
+)
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'AgentRecord',
+    'walkinterpreter',
+    'walkinterpreters',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# These belong to the controlling interpreter, and would confuse others
+_SCRUBBED_ENV_VARS = ('PYTHONHOME', 'PYTHONPATH')
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+AgentRecord = collections.namedtuple('AgentRecord', ('interpreter', 'name', 'path', 'is_package', 'error'))
+
+# ========================================================================
+class _AgentProcessProtocol(t_i_protocol.ProcessProtocol):
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            interpreter,  # type: typing.Text
+            onrecord,  # type: typing.Optional[typing.Callable[[AgentRecord], typing.Any]]
+    ):  # type: (...) -> None
+        self.deferred = t_i_defer.Deferred()
+        self._interpreter = interpreter
+        self._onrecord = onrecord
+        self._buf = b''
+        self._records = WalkTable()
+
+    # ---- Overrides -----------------------------------------------------
+
+    def outReceived(self, data):
+        # type: (bytes) -> None
+        lines = (self._buf + data).split(b'\n')
+        self._buf = lines.pop()
+
+        for line in lines:
+            try:
+                name, path, is_package, error = json.loads(line.decode('utf-8'))
+            except ValueError:
+                _LOGGER.warning('unexpected output from agent in "%s": %r', self._interpreter, line)
+
+                continue
+
+            record = AgentRecord(self._interpreter, name, path, bool(is_package), error)
+            parent_idx = self._records.find(name.rpartition('.')[0])
+
+            if error is None:
+                self._records.append(name, path, parent_idx, record.is_package, STATUS_LOADED)
+            else:
+                self._records.append(name, parent=parent_idx, status=STATUS_FAILED)
+
+            if self._onrecord is not None:
+                self._onrecord(record)
+
+    def processEnded(self, reason):
+        if reason.check(t_i_error.ProcessDone):
+            self.deferred.callback(self._records)
+        else:
+            self.deferred.errback(RuntimeError('agent in "{}" failed after {} record(s) ({})'.format(self._interpreter, len(self._records), reason.getErrorMessage())))
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def walkinterpreter(
+        reactor,  # type: typing.Any
+        interpreter,  # type: typing.Text
+        mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+        onrecord=None,  # type: typing.Optional[typing.Callable[[AgentRecord], typing.Any]]
+        path=(),  # type: typing.Iterable[typing.Text]
+):  # type: (...) -> t_i_defer.Deferred
+    """
+    Walks ``mod_specs`` (see :func:`~modwalk.modwalk.modgen`; any module
+    objects are replaced by their names) inside ``interpreter`` (the path
+    to another Python executable, e.g., one in a virtualenv), which needs
+    nothing but its standard library. A small agent (see
+    :mod:`modwalk.agent`) is run there, which imports each module (and,
+    where asked, discovers and imports sub-modules and sub-packages) and
+    streams back a record of each as it goes.
+
+    ``onrecord`` (if given) is called with an :class:`AgentRecord` for
+    each module as it arrives. Entries in ``path`` are put at the front
+    of the agent's ``sys.path``, which otherwise is that of
+    ``interpreter`` (:envvar:`PYTHONPATH` and :envvar:`PYTHONHOME` are
+    not passed on). Returns a :class:`~twisted.internet.defer.Deferred`
+    that fires with a :class:`~modwalk.records.WalkTable` of the records
+    once the agent is done, or fails if it can't be run (or dies).
+    """
+    source = pkgutil.get_data(__package__, 'agent.py').decode('utf-8')
+    args = json.dumps({
+        'mod_specs': [(getattr(mod, '__name__', mod), bool(recurse)) for mod, recurse in mod_specs],
+        'path': list(path),
+    })
+    env = dict((k, v) for k, v in os.environ.items() if k not in _SCRUBBED_ENV_VARS)
+    proto = _AgentProcessProtocol(interpreter, onrecord)
+
+    try:
+        reactor.spawnProcess(proto, interpreter, [interpreter, '-c', source, args], env=env, childFDs={0: 'w', 1: 'r', 2: 2})
+    except (EnvironmentError, t_i_error.ProcessExitedAlready) as exc:
+        return t_i_defer.fail(RuntimeError('unable to run agent in "{}" ({})'.format(interpreter, exc)))
+
+    return proto.deferred
+
+# ========================================================================
+def walkinterpreters(
+        reactor,  # type: typing.Any
+        interpreters,  # type: typing.Iterable[typing.Text]
+        mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+        onrecord=None,  # type: typing.Optional[typing.Callable[[AgentRecord], typing.Any]]
+        path=(),  # type: typing.Iterable[typing.Text]
+):  # type: (...) -> t_i_defer.Deferred
+    """
+    Like :func:`walkinterpreter`, but walks each of ``interpreters`` at
+    the same time. The returned
+    :class:`~twisted.internet.defer.Deferred` fires once they're all done
+    with an ordered ``dict`` mapping each interpreter to its
+    :class:`~modwalk.records.WalkTable` (or to a
+    :class:`~twisted.python.failure.Failure`, if its agent failed).
+    """
+    interpreters = list(interpreters)
+    mod_specs = list(mod_specs)
+    path = list(path)
+    ds = [walkinterpreter(reactor, interpreter, mod_specs, onrecord, path) for interpreter in interpreters]
+
+    def _results(_results):
+        return collections.OrderedDict((interpreter, result) for interpreter, (_, result) in zip(interpreters, _results))
+
+    d = t_i_defer.DeferredList(ds, consumeErrors=True)
+    d.addCallback(_results)
+
+    return d
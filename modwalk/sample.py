@@ -0,0 +1,136 @@
+# -*- encoding: utf-8; test-case-name: tests.test_sample -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import random
+
+from .modwalk import scannames
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'Sample',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class Sample(object):
+    """
+    A reproducible sample of the modules a :func:`~modwalk.modwalk.modgen`
+    walk of ``mod_specs`` would visit, for use as its ``prefilter``, so
+    that modules outside the sample are skipped before they are found or
+    imported. Either a ``fraction`` (between 0 and 1) or a ``count`` of
+    the candidates found by :func:`~modwalk.modwalk.scannames` is chosen.
+
+    The sample is stratified by ``mod_specs``: each one is allotted its
+    share of the sample (but at least one module), and its modules are
+    chosen with a random number generator seeded by ``seed`` and its
+    name, so a given one's sample doesn't depend on what else is walked.
+    The ``mod_specs`` themselves (e.g., every top-level package, with
+    ``--installed``), and the packages containing chosen modules, are
+    always visited.
+
+    >>> sample = Sample([('mwsample', False)], fraction=0.5)
+    >>> len(sample), 'mwsample' in sample
+    (1, True)
+    >>> sample(['mwsample.a', 'mwsample.b'], [])
+    []
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(
+            self,
+            mod_specs,  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+            fraction=None,  # type: typing.Optional[float]
+            count=None,  # type: typing.Optional[int]
+            seed=0,  # type: typing.Any
+    ):  # type: (...) -> None
+        if (fraction is None) == (count is None):
+            raise ValueError('exactly one of fraction or count must be provided')
+
+        if fraction is not None \
+                and not 0 <= fraction <= 1:
+            raise ValueError('fraction must be between 0 and 1 (not {})'.format(fraction))
+
+        if count is not None \
+                and count < 0:
+            raise ValueError('count must not be negative (not {})'.format(count))
+
+        strata = [list(scannames([mod_spec])) for mod_spec in mod_specs]
+        num_candidates = sum(len(stratum) - 1 for stratum in strata)
+
+        if fraction is None:
+            fraction = count / num_candidates if num_candidates else 0
+
+        names = set()  # type: typing.Set[typing.Text]
+
+        for stratum in strata:
+            root_name, candidates = stratum[0], sorted(stratum[1:])
+            names.add(root_name)
+
+            if not candidates:
+                continue
+
+            share = min(len(candidates), max(1, int(round(fraction * len(candidates)))))
+            rng = random.Random('{}:{}'.format(seed, root_name))
+
+            for mod_name in rng.sample(candidates, share):
+                # Packages must be visited to get to what's in them
+                while mod_name not in names:
+                    names.add(mod_name)
+                    mod_name = mod_name.rpartition('.')[0]
+
+                    if not mod_name:
+                        break
+
+        self._names = frozenset(names)
+        _LOGGER.info('sampled %d of %d module(s)', len(self._names) - len(strata), num_candidates)
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __call__(
+            self,
+            names,  # type: typing.List[typing.Text]
+            search_path,  # type: typing.List[typing.Text]
+    ):  # type: (...) -> typing.List[typing.Text]
+        return [name for name in names if name in self._names]
+
+    def __contains__(self, mod_name):
+        # type: (typing.Any) -> bool
+        return mod_name in self._names
+
+    def __iter__(self):
+        # type: (...) -> typing.Iterator[typing.Text]
+        return iter(sorted(self._names))
+
+    def __len__(self):
+        # type: (...) -> int
+        return len(self._names)
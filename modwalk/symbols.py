@@ -0,0 +1,424 @@
+# -*- encoding: utf-8; test-case-name: tests.test_symbols -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+if str is bytes:  # py2
+    from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import ast
+import collections
+import inspect
+import logging
+import os
+import types
+
+from .modwalk import ModuleProxy
+from .persist import (
+    dumpcompact,
+    loadcompact,
+)
+
+try:
+    from sys import intern
+except ImportError:  # py2, where it's a builtin
+    pass
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = (
+    'SymbolIndex',
+    'SymbolRef',
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 1
+
+_SOURCE_EXT = '.py'
+
+# Some of these don't exist in older versions of Python (and isinstance
+# is happy with an empty tuple)
+_AST_ANN_ASSIGN = getattr(ast, 'AnnAssign', ())
+_AST_DEFS = tuple(getattr(ast, node_type) for node_type in ('AsyncFunctionDef', 'ClassDef', 'FunctionDef') if hasattr(ast, node_type))
+_AST_TRIES = tuple(getattr(ast, node_type) for node_type in ('Try', 'TryExcept', 'TryFinally') if hasattr(ast, node_type))
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+SymbolRef = collections.namedtuple('SymbolRef', ('module', 'defined'))
+
+# ========================================================================
+class SymbolIndex(object):
+    """
+    An inverted index of the public names of modules, so that the modules
+    that define or export a name can be found without importing (or
+    scanning) anything. A name is public if it is in the module's
+    ``__all__`` or, where there isn't one, if it doesn't start with an
+    underscore. It is *defined* by a module unless it was imported
+    there from elsewhere (e.g., a class re-exported by a package's
+    ``__init__``).
+
+    Each module's entry is stamped with its file's modification time and
+    size, so that refreshing an index with another walk (see
+    :meth:`collect`) only inspects modules that have changed.
+
+    >>> idx = SymbolIndex()
+    >>> idx.update('pkg', ('Thing',), defined=())
+    >>> idx.update('pkg.impl', ('Thing', 'helper'))
+    >>> idx.find('Thing')
+    [SymbolRef(module='pkg.impl', defined=True), SymbolRef(module='pkg', defined=False)]
+    >>> idx.find('nonesuch')
+    []
+    """
+
+    # ---- Constructor ---------------------------------------------------
+
+    def __init__(self):
+        # type: (...) -> None
+        # mod_name -> (stamp, names, defined names)
+        self._modules = {}  # type: typing.Dict[typing.Text, typing.Tuple[typing.Optional[typing.Tuple[float, int]], typing.Tuple[typing.Text, ...], typing.FrozenSet[typing.Text]]]
+        # name -> mod_names
+        self._symbols = {}  # type: typing.Dict[typing.Text, typing.Set[typing.Text]]
+
+    # ---- Class methods -------------------------------------------------
+
+    @classmethod
+    def load(cls, path):
+        # type: (typing.Text) -> SymbolIndex
+        """
+        Returns an index previously written to ``path`` by :meth:`save`.
+        """
+        state = loadcompact(path)
+
+        if state.get('version') != _FORMAT_VERSION:
+            raise ValueError('"{}" has unsupported symbol index version {!r}'.format(path, state.get('version')))
+
+        idx = cls()
+
+        for mod_name, stamp, defined, imported in state['modules']:
+            idx.update(mod_name, defined + imported, defined, None if stamp is None else tuple(stamp))
+
+        return idx
+
+    # ---- Overrides -----------------------------------------------------
+
+    def __contains__(self, mod_name):
+        # type: (typing.Any) -> bool
+        return mod_name in self._modules
+
+    def __iter__(self):
+        # type: (...) -> typing.Iterator[typing.Text]
+        return iter(sorted(self._modules))
+
+    def __len__(self):
+        # type: (...) -> int
+        return len(self._modules)
+
+    # ---- Public methods ------------------------------------------------
+
+    def addmodule(self, mod):
+        # type: (typing.Any) -> None
+        """
+        Indexes the public names of the (imported) module object ``mod``.
+        """
+        mod_name = mod.__name__
+        names = getattr(mod, '__all__', None)
+
+        if names is None:
+            names = (name for name in dir(mod) if not name.startswith('_'))
+
+        defined = []
+        exported = []
+
+        for name in names:
+            try:
+                value = getattr(mod, name)
+            except AttributeError:
+                # E.g., a stale entry in __all__
+                continue
+
+            if isinstance(value, types.ModuleType):
+                continue
+
+            exported.append(name)
+
+            # Functions and classes know where they came from; anything
+            # else (e.g., a constant, or an instance of a class from
+            # elsewhere) is assumed to be defined here
+            if not (isinstance(value, type) or inspect.isroutine(value)) \
+                    or getattr(value, '__module__', mod_name) == mod_name:
+                defined.append(name)
+
+        self.update(mod_name, exported, defined, _stamp(getattr(mod, '__file__', None)))
+
+    def addsource(
+            self,
+            mod_name,  # type: typing.Text
+            path,  # type: typing.Text
+    ):  # type: (...) -> bool
+        """
+        Indexes the public names of the module ``mod_name`` by parsing its
+        source at ``path`` (without importing it). Names are those bound
+        at the top level (including in ``if`` and ``try`` blocks), or those
+        listed in ``__all__`` where it is assigned a literal list or tuple.
+        Returns ``False`` (and leaves the index unchanged) if the source
+        can't be read or parsed.
+        """
+        try:
+            with open(path, 'rb') as f:
+                tree = ast.parse(f.read(), path)
+        except (EnvironmentError, SyntaxError, ValueError) as exc:
+            _LOGGER.debug('unable to parse "%s" (%s)', path, exc)
+
+            return False
+
+        defined = []  # type: typing.List[typing.Text]
+        imported = []  # type: typing.List[typing.Text]
+        all_names = None
+        stack = list(reversed(tree.body))
+
+        while stack:
+            node = stack.pop()
+
+            if isinstance(node, _AST_DEFS):
+                defined.append(node.name)
+            elif isinstance(node, ast.ImportFrom):
+                # Plain imports only bind modules, which aren't indexed
+                imported.extend(alias.asname or alias.name for alias in node.names if alias.name != '*')
+            elif isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        defined.append(target.id)
+
+                        if target.id == '__all__':
+                            all_names = _literalnames(node.value)
+                    elif isinstance(target, (ast.Tuple, ast.List)):
+                        defined.extend(elt.id for elt in target.elts if isinstance(elt, ast.Name))
+            elif isinstance(node, _AST_ANN_ASSIGN) \
+                    and isinstance(node.target, ast.Name):
+                defined.append(node.target.id)
+            elif isinstance(node, ast.If):
+                stack.extend(reversed(node.body + node.orelse))
+            elif isinstance(node, _AST_TRIES):
+                stmts = list(node.body)
+
+                for handler in getattr(node, 'handlers', ()):
+                    stmts.extend(handler.body)
+
+                stmts.extend(getattr(node, 'orelse', ()))
+                stmts.extend(getattr(node, 'finalbody', ()))
+                stack.extend(reversed(stmts))
+
+        defined_set = set(defined)
+        bound = defined + [name for name in imported if name not in defined_set]
+
+        if all_names is None:
+            names = [name for name in bound if not name.startswith('_')]
+        else:
+            bound_set = set(bound)
+            names = [name for name in all_names if name in bound_set]
+
+        self.update(mod_name, names, defined_set.intersection(names), _stamp(path))
+
+        return True
+
+    def collect(
+            self,
+            mods,  # type: typing.Iterable[typing.Any]
+            static=False,  # type: bool
+            roots=(),  # type: typing.Iterable[typing.Tuple[typing.Any, bool]]
+    ):  # type: (...) -> typing.Iterator[typing.Any]
+        """
+        Indexes each module in ``mods`` (e.g., as generated by
+        :func:`~modwalk.modwalk.modgen`) as it is generated (i.e., as a
+        pipeline stage), skipping those whose files haven't changed since
+        they were last indexed. If ``static`` is true, modules with source
+        files are parsed (see :meth:`addsource`) rather than inspected, so
+        with :class:`~modwalk.modwalk.ModuleProxy`\\ s (from a lazy walk),
+        nothing is imported.
+
+        ``roots`` are the module specs ``mods`` was walked from (see
+        :func:`~modwalk.modwalk.modgen`). Once ``mods`` is exhausted, any
+        module indexed under them (i.e., a root, or beneath one walked
+        recursively) that wasn't generated (e.g., because it was deleted)
+        is removed, as is any generated module that was indexed from a
+        file that no longer exists.
+        """
+        seen = set()  # type: typing.Set[typing.Text]
+
+        for mod in mods:
+            mod_name = mod.__name__
+            path = getattr(mod, '__file__', None)
+            seen.add(mod_name)
+            entry = self._modules.get(mod_name)
+            stamp = _stamp(path)
+
+            if entry is not None \
+                    and entry[0] is not None \
+                    and stamp is None:
+                # It was indexed from a file that has since been deleted
+                self.discard(mod_name)
+            elif entry is None \
+                    or entry[0] is None \
+                    or entry[0] != stamp:
+                if static \
+                        and path \
+                        and path.endswith(_SOURCE_EXT):
+                    self.addsource(mod_name, path)
+                elif not static \
+                        or not isinstance(mod, ModuleProxy) \
+                        or mod.loaded:
+                    self.addmodule(mod)
+
+            yield mod
+
+        for mod, recurse in roots:
+            root_name = getattr(mod, '__name__', mod)
+            prefix = root_name + '.'
+
+            for mod_name in list(self._modules):
+                if mod_name not in seen \
+                        and (mod_name == root_name or recurse and mod_name.startswith(prefix)):
+                    self.discard(mod_name)
+
+    def discard(self, mod_name):
+        # type: (typing.Text) -> None
+        """
+        Removes ``mod_name`` (and its names) from the index, if present.
+        """
+        entry = self._modules.pop(mod_name, None)
+
+        if entry is None:
+            return
+
+        for name in entry[1]:
+            mod_names = self._symbols[name]
+            mod_names.discard(mod_name)
+
+            if not mod_names:
+                del self._symbols[name]
+
+    def find(self, name):
+        # type: (typing.Text) -> typing.List[SymbolRef]
+        """
+        Returns a :class:`SymbolRef` for each module that defines or
+        exports ``name``, those that define it first, then in order of
+        module name.
+        """
+        refs = [SymbolRef(mod_name, name in self._modules[mod_name][2]) for mod_name in self._symbols.get(name, ())]
+        refs.sort(key=lambda ref: (not ref.defined, ref.module))
+
+        return refs
+
+    def isfresh(
+            self,
+            mod_name,  # type: typing.Text
+            path,  # type: typing.Optional[typing.Text]
+    ):  # type: (...) -> bool
+        """
+        Returns whether ``mod_name`` is indexed from ``path`` as it is
+        now. Modules without files are never fresh.
+        """
+        entry = self._modules.get(mod_name)
+
+        return entry is not None \
+            and entry[0] is not None \
+            and entry[0] == _stamp(path)
+
+    def names(self, mod_name):
+        # type: (typing.Text) -> typing.Tuple[typing.Text, ...]
+        """
+        Returns the indexed names of ``mod_name``.
+        """
+        return self._modules[mod_name][1]
+
+    def save(self, path):
+        # type: (typing.Text) -> None
+        """
+        Writes the index to ``path``.
+        """
+        modules = []
+
+        for mod_name in sorted(self._modules):
+            stamp, names, defined = self._modules[mod_name]
+            modules.append((mod_name, stamp, [name for name in names if name in defined], [name for name in names if name not in defined]))
+
+        dumpcompact({
+            'version': _FORMAT_VERSION,
+            'modules': modules,
+        }, path)
+
+    def update(
+            self,
+            mod_name,  # type: typing.Text
+            names,  # type: typing.Iterable[typing.Text]
+            defined=None,  # type: typing.Optional[typing.Iterable[typing.Text]]
+            stamp=None,  # type: typing.Optional[typing.Tuple[float, int]]
+    ):  # type: (...) -> None
+        """
+        Replaces the names indexed for ``mod_name`` with ``names``, of
+        which those in ``defined`` (all of them, by default) are defined
+        there, rather than imported. ``stamp`` is used by
+        :meth:`isfresh`.
+        """
+        self.discard(mod_name)
+        names = tuple(intern(str(name)) for name in collections.OrderedDict.fromkeys(names))
+        defined = frozenset(names if defined is None else defined)
+        self._modules[mod_name] = (stamp, names, defined)
+
+        for name in names:
+            self._symbols.setdefault(name, set()).add(mod_name)
+
+# ---- Functions ---------------------------------------------------------
+
+# ========================================================================
+def _literalnames(node):
+    # type: (typing.Any) -> typing.Optional[typing.List[typing.Text]]
+    if not isinstance(node, (ast.List, ast.Tuple)):
+        return None
+
+    names = []
+
+    for elt in node.elts:
+        # ast.Str on py2 (and before 3.8), ast.Constant after
+        value = getattr(elt, 'value', getattr(elt, 's', None))
+
+        if not isinstance(value, str):
+            return None
+
+        names.append(value)
+
+    return names
+
+# ========================================================================
+def _stamp(path):
+    # type: (typing.Optional[typing.Text]) -> typing.Optional[typing.Tuple[float, int]]
+    if not path:
+        return None
+
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    return st.st_mtime, st.st_size
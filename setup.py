@@ -96,6 +96,7 @@ SETUP_ARGS = {
     'entry_points': {
         'console_scripts': (
             'modwalk = modwalk.main:main',
+            'modwalk-client = modwalk.client:main',
         ),
     },
 }
@@ -0,0 +1,94 @@
+# -*- encoding: utf-8 -*-
+# ======================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not
+expressly waived or licensed are reserved. If those files are missing or
+appear to be modified from their originals, then please contact the
+author before viewing or using this software in any capacity.
+"""
+# ======================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports ---------------------------------------------------------
+
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# ---- Data ------------------------------------------------------------
+
+__all__ = ()
+
+# ---- Classes ---------------------------------------------------------
+
+# ======================================================================
+class PkgTreeTestCase(unittest.TestCase):
+    """
+    Base for test cases that need throwaway package trees on
+    ``sys.path``. Anything imported from those trees is evicted from
+    ``sys.modules`` on tear down.
+    """
+
+    # ---- Hooks -------------------------------------------------------
+
+    def setUp(self):
+        # type: (...) -> None
+        super(PkgTreeTestCase, self).setUp()
+        self.tmp_dir = os.path.realpath(tempfile.mkdtemp())
+        self._orig_mod_names = set(sys.modules)
+        sys.path.insert(0, self.tmp_dir)
+
+    def tearDown(self):
+        # type: (...) -> None
+        sys.path.remove(self.tmp_dir)
+
+        for name in set(sys.modules) - self._orig_mod_names:
+            del sys.modules[name]
+
+        for path_entry in list(sys.path_importer_cache):
+            if path_entry.startswith(self.tmp_dir):
+                del sys.path_importer_cache[path_entry]
+
+        shutil.rmtree(self.tmp_dir)
+        importlib.invalidate_caches()
+        super(PkgTreeTestCase, self).tearDown()
+
+    # ---- Methods -----------------------------------------------------
+
+    def mktree(
+            self,
+            files,  # type: typing.Mapping[typing.Text, typing.Text]
+            root=None,  # type: typing.Optional[typing.Text]
+    ):  # type: (...) -> typing.Text
+        """
+        Creates each relative path in ``files`` (with its contents) under
+        ``root`` (``self.tmp_dir`` by default) and returns ``root``.
+        """
+        root = self.tmp_dir if root is None else root
+
+        for rel_path, contents in files.items():
+            path = os.path.join(root, *rel_path.split('/'))
+
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+
+            with open(path, 'w') as f:
+                f.write(contents)
+
+        importlib.invalidate_caches()
+
+        return root
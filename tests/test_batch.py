@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import unittest
+
+from modwalk.batch import (
+    batched,
+    perbatch,
+)
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class BatchTestCase(unittest.TestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def test_batched(self):
+        # type: (...) -> None
+        self.assertEqual(list(batched(range(6), 2)), [[0, 1], [2, 3], [4, 5]])
+        self.assertEqual(list(batched(range(3), 5)), [[0, 1, 2]])
+        self.assertEqual(list(batched((), 5)), [])
+
+        with self.assertRaises(ValueError):
+            list(batched(range(3), 0))
+
+    def test_batched_interval(self):
+        # type: (...) -> None
+        now = [0.0]
+
+        def _items():
+            for item, arrival in enumerate((0.0, 0.1, 1.2, 1.5, 1.6, 3.0, 3.1)):
+                now[0] = arrival
+                yield item
+
+        # Items 2 and 5 are the first to arrive after the intervals that
+        # started with 0 and 3, respectively
+        self.assertEqual(list(batched(_items(), 5, 1.0, lambda: now[0])), [[0, 1, 2], [3, 4, 5], [6]])
+
+    def test_perbatch(self):
+        # type: (...) -> None
+        batches = []
+
+        def _callback(batch, offset, scale=1):
+            batches.append(batch)
+
+            return sum(batch) * scale + offset
+
+        results = perbatch(_callback, 1, scale=10)(batched(range(5), 2))
+        self.assertEqual(batches, [])
+        self.assertEqual(list(results), [11, 51, 41])
+        self.assertEqual(batches, [[0, 1], [2, 3], [4]])
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import os
+import subprocess
+import sys
+import unittest
+
+from modwalk.checkpoint import Checkpoint
+from modwalk.modwalk import modgen
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class CheckpointTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def test_resume(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwckpt/__init__.py': '',
+            'mwckpt/a.py': '',
+            'mwckpt/b/__init__.py': '',
+            'mwckpt/b/c.py': '',
+            'mwckpt/d.py': '',
+        })
+
+        path = os.path.join(self.tmp_dir, 'walk.ckpt')
+        walk = modgen([('mwckpt', True)], checkpoint=Checkpoint(path, interval=1))
+        delivered = [next(walk).__name__, next(walk).__name__]
+        next(walk)  # saves (after the second delivery), then delivers a third
+        walk.close()
+
+        # Simulate a fresh process that only knows what was checkpointed
+        for name in [n for n in sys.modules if n.startswith('mwckpt')]:
+            del sys.modules[name]
+
+        mod_specs, seen = Checkpoint(path).load()
+        self.assertCountEqual(seen, delivered)
+        rest = [m.__name__ for m in modgen(mod_specs, seen)]
+        self.assertCountEqual(delivered + rest, ('mwckpt', 'mwckpt.a', 'mwckpt.b', 'mwckpt.b.c', 'mwckpt.d'))
+
+        # Delivered modules are not imported again unless they are the
+        # parent of something still pending
+        for name in delivered:
+            if not any(r.startswith(name + '.') for r in rest):
+                self.assertNotIn(name, sys.modules)
+
+    def test_complete(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwckptdone/__init__.py': '',
+            'mwckptdone/a.py': '',
+        })
+
+        path = os.path.join(self.tmp_dir, 'walk.ckpt')
+        names = [m.__name__ for m in modgen([('mwckptdone', True)], checkpoint=Checkpoint(path, interval=1000))]
+        mod_specs, seen = Checkpoint(path).load()
+        self.assertEqual(mod_specs, [])
+        self.assertCountEqual(seen, names)
+
+    def test_crash(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwckptcrash/__init__.py': '',
+            'mwckptcrash/a.py': '',
+            'mwckptcrash/b.py': 'import os\nos._exit(3)\n',
+            'mwckptcrash/c.py': '',
+        })
+
+        path = os.path.join(self.tmp_dir, 'walk.ckpt')
+        script = '; '.join((
+            'from modwalk.checkpoint import Checkpoint',
+            'from modwalk.modwalk import modgen',
+            'print([m.__name__ for m in modgen([("mwckptcrash", True)], checkpoint=Checkpoint({!r}, interval=1))])'.format(path),
+        ))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join((self.tmp_dir, _REPO_DIR))
+        self.assertEqual(subprocess.call([sys.executable, '-c', script], cwd=self.tmp_dir, env=env), 3)
+
+        # The module that crashed the interpreter isn't retried
+        checkpoint = Checkpoint(path, interval=1)
+        mod_specs, seen = checkpoint.load()
+        self.assertEqual(checkpoint.failed, set(['mwckptcrash.b']))
+        self.assertCountEqual(seen, ('mwckptcrash', 'mwckptcrash.a', 'mwckptcrash.b'))
+        self.assertEqual([m.__name__ for m in modgen(mod_specs, seen, checkpoint)], ['mwckptcrash.c'])
+        self.assertFalse(os.path.exists(path + '.inflight'))
+
+        # It stays failed (rather than delivered) in later checkpoints
+        checkpoint = Checkpoint(path)
+        self.assertEqual(checkpoint.load(), ([], set(['mwckptcrash', 'mwckptcrash.a', 'mwckptcrash.b', 'mwckptcrash.c'])))
+        self.assertEqual(checkpoint.failed, set(['mwckptcrash.b']))
+
+    def test_bad_interval(self):
+        # type: (...) -> None
+        with self.assertRaises(ValueError):
+            Checkpoint(os.path.join(self.tmp_dir, 'walk.ckpt'), interval=0)
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
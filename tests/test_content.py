@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import re
+import sys
+import unittest
+
+from modwalk.content import ContentFilter
+from modwalk.modwalk import modgen
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class ContentFilterTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def test_content_filter(self):
+        # type: (...) -> None
+        files = dict(('mwcontent/m{:02}.py'.format(i), 'X = {}\n'.format(i)) for i in range(20))
+        files.update({
+            'mwcontent/__init__.py': '',
+            'mwcontent/empty.py': '',
+            'mwcontent/marked.py': 'from .registry import register\n\n@register\ndef f():\n    pass\n',
+            'mwcontent/regexed.py': 'import os\nclass Thing(object):\n    pass\n',
+            'mwcontent/sub/__init__.py': '',
+            'mwcontent/sub/unmarked.py': 'raise RuntimeError\n',
+            'mwcontent/sub/marked.py': '@register\nclass C(object):\n    pass\n',
+        })
+        self.mktree(files)
+
+        for jobs in (1, 4):
+            content_filter = ContentFilter([b'@register', re.compile(br'^class Thing\b', re.M)], jobs)
+
+            try:
+                mod_names = [mod.__name__ for mod in modgen([('mwcontent', True)], lazy=True, prefilter=content_filter)]
+            finally:
+                content_filter.close()
+
+            self.assertEqual(sorted(mod_names), ['mwcontent', 'mwcontent.marked', 'mwcontent.regexed', 'mwcontent.sub', 'mwcontent.sub.marked'], msg='jobs={}'.format(jobs))
+
+        content_filter = ContentFilter([b'X = 1'])
+        mod_names = [mod.__name__ for mod in modgen([('mwcontent', True)], prefilter=content_filter)]
+        content_filter.close()
+        self.assertEqual(sorted(mod_names), ['mwcontent', 'mwcontent.m01', 'mwcontent.m10', 'mwcontent.m11', 'mwcontent.m12', 'mwcontent.m13', 'mwcontent.m14', 'mwcontent.m15', 'mwcontent.m16', 'mwcontent.m17', 'mwcontent.m18', 'mwcontent.m19', 'mwcontent.sub'])
+        self.assertNotIn('mwcontent.sub.unmarked', sys.modules)
+        self.assertNotIn('mwcontent.m02', sys.modules)
+
+    def test_predicates(self):
+        # type: (...) -> None
+        with self.assertRaises(ValueError):
+            ContentFilter([])
+
+        with self.assertRaises(TypeError):
+            ContentFilter([u'text'])
+
+        with self.assertRaises(TypeError):
+            ContentFilter([re.compile(u'text')])
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
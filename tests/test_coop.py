@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import unittest
+
+from twisted.internet import defer as t_i_defer
+from twisted.internet import task as t_i_task
+
+from modwalk.coop import coopconsume
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class CoopTestCase(unittest.TestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def setUp(self):
+        # type: (...) -> None
+        self.clock = t_i_task.Clock()
+        self.results = []  # type: typing.List[typing.Any]
+
+    def test_concurrency(self):
+        # type: (...) -> None
+        ds = [t_i_defer.Deferred() for _ in range(5)]
+        pulled = []
+
+        def _gen():
+            for i, d in enumerate(ds):
+                pulled.append(i)
+                yield d
+
+        done = coopconsume(_gen(), time_slice=0, concurrency=2, reactor=self.clock)
+        done.addBoth(self.results.append)
+        self.clock.advance(0)
+        self.assertEqual(pulled, [0, 1])
+
+        ds[1].callback(None)
+        self.clock.advance(0)
+        self.assertEqual(pulled, [0, 1, 2])
+
+        for d in ds[:1] + ds[2:]:
+            d.callback(None)
+            self.clock.advance(0)
+
+        self.assertEqual(pulled, [0, 1, 2, 3, 4])
+        self.assertEqual(self.results, [None])
+
+    def test_ready(self):
+        # type: (...) -> None
+        waiting = []
+        items = []
+        pulled = []
+
+        def _ready():
+            # None marks the end
+            if items \
+                    or None in pulled:
+                return None
+
+            d = t_i_defer.Deferred()
+            waiting.append(d)
+
+            return d
+
+        def _gen():
+            # Only ever asked for an item once one is ready
+            while True:
+                item = items.pop(0)
+                pulled.append(item)
+                yield item
+
+                if item is None:
+                    return
+
+        coopconsume(_gen(), time_slice=0, reactor=self.clock, ready=_ready).addBoth(self.results.append)
+        self.clock.advance(0)
+        self.assertEqual((pulled, len(waiting)), ([], 1))
+
+        # Each item is consumed as soon as it is ready
+        items.append(1)
+        waiting.pop().callback(None)
+        self.clock.advance(0)
+        self.assertEqual(pulled, [1])
+        self.assertEqual(len(waiting), 1)
+        items.append(None)
+        waiting.pop().callback(None)
+        self.clock.advance(0)
+        self.assertEqual(pulled, [1, None])
+        self.assertEqual(self.results, [None])
+
+    def test_time_slice(self):
+        # type: (...) -> None
+        ticks = []
+        orig_call_later = self.clock.callLater
+
+        def _calllater(*args, **kw):
+            ticks.append(None)
+
+            return orig_call_later(*args, **kw)
+
+        self.clock.callLater = _calllater  # type: ignore
+        coopconsume(range(5), time_slice=0, reactor=self.clock).addBoth(self.results.append)
+        self.clock.advance(0)
+        self.assertEqual(self.results, [None])
+        # One unit of work per slice
+        self.assertGreaterEqual(len(ticks), 5)
+
+    def test_failures(self):
+        # type: (...) -> None
+        d = t_i_defer.Deferred()
+        coopconsume([d, 1, 2], reactor=self.clock).addBoth(self.results.append)
+        self.clock.advance(0)
+        self.assertEqual(self.results, [])
+        d.errback(RuntimeError('boom'))
+        self.clock.advance(0)
+        self.assertEqual(len(self.results), 1)
+        self.assertTrue(self.results[0].check(RuntimeError))
+
+        def _gen():
+            yield 1
+            raise RuntimeError('bang')
+
+        del self.results[:]
+        coopconsume(_gen(), reactor=self.clock).addBoth(self.results.append)
+        self.clock.advance(0)
+        self.assertTrue(self.results[0].check(RuntimeError))
+
+        with self.assertRaises(ValueError):
+            coopconsume((), concurrency=0, reactor=self.clock)
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
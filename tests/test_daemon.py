@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import importlib
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+import unittest
+
+from modwalk.client import request
+from modwalk.daemon import WalkServer
+from modwalk.modwalk import modgen
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class WalkServerTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def setUp(self):
+        # type: (...) -> None
+        super(WalkServerTestCase, self).setUp()
+        self.mktree({
+            'mwserve/__init__.py': '',
+            'mwserve/a.py': 'VALUE = 1\n',
+            'mwserve/b.py': '',
+        })
+
+    def test_handle(self):
+        # type: (...) -> None
+        def _walk(_argv, _track):
+            if not _argv:
+                raise SystemExit(2)
+
+            for mod in _track(modgen([(_argv[0], True)])):
+                print(mod.__name__)
+
+            print('values: {}'.format(sys.modules['mwserve.a'].VALUE), file=sys.stderr)
+
+        server = WalkServer(_walk)
+        responses = []
+        server.handle(['mwserve']).addCallback(responses.append)
+        self.assertEqual(responses.pop(), {'status': 0, 'stdout': 'mwserve\nmwserve.a\nmwserve.b\n', 'stderr': 'values: 1\n'})
+        self.assertEqual(server.refresh(), [])
+
+        # Changed files are reloaded and deleted ones are evicted
+        self._rewrite('mwserve/a.py', 'VALUE = 2\n')
+        os.remove(os.path.join(self.tmp_dir, 'mwserve', 'b.py'))
+        server.handle(['mwserve']).addCallback(responses.append)
+        self.assertEqual(responses.pop(), {'status': 0, 'stdout': 'mwserve\nmwserve.a\n', 'stderr': 'values: 2\n'})
+        self.assertNotIn('mwserve.b', sys.modules)
+
+        server.handle([]).addCallback(responses.append)
+        self.assertEqual(responses.pop(), {'status': 2, 'stdout': '', 'stderr': ''})
+
+        # Modules whose reloads fail are evicted, too
+        self._rewrite('mwserve/a.py', 'raise RuntimeError()\n')
+        self.assertEqual(server.refresh(), ['mwserve.a'])
+        self.assertNotIn('mwserve.a', sys.modules)
+
+    def test_serve(self):
+        # type: (...) -> None
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join((self.tmp_dir, _REPO_DIR))
+        sock_path = os.path.join(self.tmp_dir, 'serve.sock')
+        args = [
+            sys.executable, '-c', 'from modwalk.main import main ; main()',
+            '--serve', sock_path,
+            '-M', 'mwserve',
+        ]
+
+        server = subprocess.Popen(args, env=env, cwd=self.tmp_dir)
+        self.addCleanup(server.wait)
+        self.addCleanup(server.terminate)
+        deadline = time.time() + 30
+
+        # The socket exists (bound) a moment before it's listening
+        while True:
+            self.assertIsNone(server.poll())
+            self.assertLess(time.time(), deadline)
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+            try:
+                probe.connect(sock_path)
+            except socket.error:
+                time.sleep(0.05)
+            else:
+                break
+            finally:
+                probe.close()
+
+        response = request(sock_path, ['-M', 'mwserve'], timeout=30)
+        self.assertEqual((response['status'], response['stdout'].split()), (0, ['mwserve', 'mwserve.a', 'mwserve.b']))
+        response = request(sock_path, ['-m', 'mwserve', '-c', '1/0'], timeout=30)
+        self.assertEqual(response['status'], 1)
+        self.assertIn('ZeroDivisionError', response['stderr'])
+        response = request(sock_path, ['--worker', 'unix:nowhere'], timeout=30)
+        self.assertEqual(response['status'], 2)
+        self.assertIn('cannot be used with a server', response['stderr'])
+
+    # ---- Private methods -----------------------------------------------
+
+    def _rewrite(self, rel_path, contents):
+        # type: (typing.Text, typing.Text) -> None
+        path = os.path.join(self.tmp_dir, *rel_path.split('/'))
+
+        with open(path, 'w') as f:
+            f.write(contents)
+
+        # Make sure the change is visible even where mtimes are coarse
+        st = os.stat(path)
+        os.utime(path, (st.st_atime, st.st_mtime + 10))
+        importlib.invalidate_caches()
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+from twisted.internet import task as t_i_task
+from twisted.python import failure as t_p_failure
+
+from modwalk.distrib import (
+    Coordinator,
+    ResultFeed,
+    WalkResult,
+    WorkQueue,
+    _chunks,
+)
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class WorkQueueTestCase(unittest.TestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def test_locality_and_stealing(self):
+        # type: (...) -> None
+        queue = WorkQueue([('r1', True), ('r2', True)])
+        queue.add('w1')
+        queue.add('w2')
+        self.assertEqual(queue.next('w1'), ('r1', True))
+        self.assertEqual(queue.next('w2'), ('r2', True))
+        queue.push('w1', [('r1.a', True), ('r1.b', True), ('r1.c', True)])
+        self.assertEqual(queue.complete('w1'), ('r1', True))
+        self.assertEqual(queue.complete('w2'), ('r2', True))
+
+        # w1 takes from its own queue (front), w2 steals from w1's (back)
+        self.assertEqual(queue.next('w1'), ('r1.a', True))
+        self.assertEqual(queue.next('w2'), ('r1.c', True))
+        self.assertFalse(queue.isidle('w2'))
+        queue.complete('w1')
+        queue.complete('w2')
+        self.assertEqual(queue.next('w1'), ('r1.b', True))
+        self.assertIsNone(queue.next('w2'))
+        self.assertFalse(queue.done())
+        queue.complete('w1')
+        self.assertTrue(queue.done())
+
+    def test_reassignment(self):
+        # type: (...) -> None
+        queue = WorkQueue([('r', True)], max_attempts=2)
+        queue.add('w1')
+        queue.add('w2')
+        self.assertEqual(queue.next('w1'), ('r', True))
+        queue.push('w1', [('r.a', True)])
+        self.assertIsNone(queue.remove('w1'))
+        # The reassigned unit comes first, then w1's queued units
+        self.assertEqual(queue.next('w2'), ('r', True))
+        self.assertEqual(queue.remove('w2'), ('r', True))
+        queue.add('w3')
+        self.assertEqual(queue.next('w3'), ('r.a', True))
+        queue.complete('w3')
+        self.assertTrue(queue.done())
+
+    def test_chunks(self):
+        # type: (...) -> None
+        names = ['m{:05}'.format(i) for i in range(20000)]
+        chunks = list(_chunks(names))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(sum(chunks, []), names)
+
+    def test_result_name(self):
+        # type: (...) -> None
+        self.assertEqual(WalkResult('a.b', None, None, 'w').__name__, 'a.b')
+
+    def test_result_feed(self):
+        # type: (...) -> None
+        feed = ResultFeed(t_i_task.Clock())
+        ready = feed.whenReady()
+        fired = []
+        ready.addCallback(fired.append)
+        feed.push(WalkResult('a', None, None, 'w'))
+        self.assertEqual(fired, [None])
+        self.assertIsNone(feed.whenReady())
+        self.assertEqual(next(feed).name, 'a')
+
+        # Not waiting on the reactor when it isn't running
+        with self.assertRaises(RuntimeError):
+            next(feed)
+
+        feed.push(WalkResult('b', None, None, 'w'))
+        feed.finish(t_p_failure.Failure(ValueError('bust')))
+        self.assertIsNone(feed.whenReady())
+        self.assertEqual(next(feed).name, 'b')
+
+        with self.assertRaises(ValueError):
+            next(feed)
+
+    def test_timeout(self):
+        # type: (...) -> None
+        clock = t_i_task.Clock()
+        coordinator = Coordinator([('r', True)], timeout=5, reactor=clock)
+        coordinator.startFactory()
+        failures = []
+        coordinator.whenDone().addErrback(failures.append)
+        clock.advance(4)
+        self.assertEqual(failures, [])
+        clock.advance(1)
+        self.assertEqual(len(failures), 1)
+        self.assertTrue(failures[0].check(RuntimeError))
+        self.assertTrue(coordinator.finished)
+        self.assertTrue(coordinator.whenDone().called)
+        coordinator.whenDone().addErrback(lambda _: None)
+
+# ========================================================================
+class DistribTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def test_local_workers(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwdist/__init__.py': '',
+            'mwdist/a.py': '',
+            'mwdist/b/__init__.py': '',
+            'mwdist/b/c.py': '',
+            'mwdist/bad.py': 'raise ImportError("nope")\n',
+            # Kills whichever worker imports it
+            'mwdist/crash.py': 'import os\nos._exit(3)\n',
+        })
+
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join((self.tmp_dir, _REPO_DIR))
+        sock_path = os.path.join(self.tmp_dir, 'coord.sock')
+        args = [
+            sys.executable, '-c', 'from modwalk.main import main ; main()',
+            '--coordinate', 'unix:' + sock_path,
+            '--workers', '2',
+            '--max-attempts', '2',
+            '-M', 'mwdist',
+        ]
+
+        out = subprocess.check_output(args, env=env, cwd=self.tmp_dir)
+        self.assertCountEqual(out.decode('utf-8').split(), ('mwdist', 'mwdist.a', 'mwdist.b', 'mwdist.b.c'))
+
+    def test_unix_endpoints(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwunix/__init__.py': '',
+            'mwunix/a.py': '',
+        })
+
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join((self.tmp_dir, _REPO_DIR))
+        sock_path = os.path.join(self.tmp_dir, 'unix.sock')
+        cmd = [sys.executable, '-c', 'from modwalk.main import main ; main()']
+        coordinator = subprocess.Popen(
+            cmd + ['--coordinate', 'unix:' + sock_path, '-M', 'mwunix'],
+            cwd=self.tmp_dir,
+            env=env,
+            stdout=subprocess.PIPE,
+        )
+        self.addCleanup(coordinator.stdout.close)
+
+        for _ in range(200):
+            if os.path.exists(sock_path) or coordinator.poll() is not None:
+                break
+
+            time.sleep(0.05)
+
+        self.assertIsNone(coordinator.poll(), 'coordinator exited early')
+        worker = subprocess.Popen(
+            cmd + ['--worker', 'unix:path=' + sock_path],
+            cwd=self.tmp_dir,
+            env=env,
+        )
+        self.addCleanup(worker.wait)
+        out = coordinator.stdout.read()
+        self.assertEqual(coordinator.wait(), 0)
+        self.assertCountEqual(out.decode('utf-8').split(), ('mwunix', 'mwunix.a'))
+
+    def test_no_workers(self):
+        # type: (...) -> None
+        self.mktree({'mwnowork.py': ''})
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join((self.tmp_dir, _REPO_DIR))
+        args = [
+            sys.executable, '-c', 'from modwalk.main import main ; main()',
+            '--coordinate', 'unix:' + os.path.join(self.tmp_dir, 'nowork.sock'),
+            '--worker-timeout', '0.5',
+            '-M', 'mwnowork',
+        ]
+
+        # Gives up rather than waiting forever
+        proc = subprocess.Popen(args, env=env, cwd=self.tmp_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        stdout, stderr = proc.communicate()
+        self.assertEqual(stdout, '')
+        self.assertIn('no workers connected for 0.5 second(s)', stderr)
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import os
+import sys
+import unittest
+
+from modwalk.fingerprint import (
+    changed,
+    fingerprints,
+    loadfingerprints,
+    savefingerprints,
+)
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class FingerprintTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def test_fingerprints(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwfp/__init__.py': '',
+            'mwfp/a.py': 'A = 1\n',
+            'mwfp/empty.py': '',
+            'mwfp/sub/__init__.py': '',
+            'mwfp/sub/b.py': 'B = 2\n',
+            'mwfp/other/__init__.py': '',
+            'mwfp/other/c.py': 'C = 3\n',
+            'mwfp/not-a-module.py': 'raise RuntimeError\n',
+        })
+
+        before = fingerprints([('mwfp', True)], jobs=2)
+        self.assertEqual(sorted(before), ['mwfp', 'mwfp.a', 'mwfp.empty', 'mwfp.other', 'mwfp.other.c', 'mwfp.sub', 'mwfp.sub.b'])
+        self.assertNotIn('mwfp', sys.modules)
+        self.assertEqual(fingerprints([('mwfp', True)], jobs=1), before)
+        self.assertEqual(sorted(fingerprints([('mwfp', True)], modules=False)), ['mwfp', 'mwfp.other', 'mwfp.sub'])
+        self.assertEqual(list(fingerprints([('mwfp.sub.b', False)], modules=False)), ['mwfp.sub.b'])
+
+        # Files with the same contents have the same digests
+        self.mktree({'mwfp/sub/b2.py': 'B = 2\n'})
+        after = fingerprints([('mwfp', True)])
+        self.assertEqual(after['mwfp.sub.b2'], after['mwfp.sub.b'])
+        self.assertEqual(changed(before, after), ['mwfp', 'mwfp.sub', 'mwfp.sub.b2'])
+
+        with open(os.path.join(self.tmp_dir, 'mwfp', 'other', 'c.py'), 'a') as f:
+            f.write('D = 4\n')
+
+        fp_path = os.path.join(self.tmp_dir, 'fp.json')
+        savefingerprints(after, fp_path)
+        self.assertEqual(loadfingerprints(fp_path), after)
+        self.assertEqual(changed(loadfingerprints(fp_path), fingerprints([('mwfp', True)])), ['mwfp', 'mwfp.other', 'mwfp.other.c'])
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import os
+import unittest
+
+from modwalk.index import ModuleIndex
+from modwalk.modwalk import modgen
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class ModuleIndexTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def test_index(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwidx/__init__.py': '',
+            'mwidx/a.py': '',
+            'mwidx/b/__init__.py': '',
+            'mwidx/b/c.py': '',
+            'mwidx/b/d/__init__.py': '',
+            'mwidx/b/d/e.py': '',
+        })
+
+        idx = ModuleIndex.fromwalk(modgen([('mwidx', True)]))
+        self.assertEqual(len(idx), 6)
+        self.assertEqual([r.name for r in idx.prefix('mwidx.b')], ['mwidx.b', 'mwidx.b.c', 'mwidx.b.d', 'mwidx.b.d.e'])
+        self.assertEqual([r.name for r in idx.children('mwidx')], ['mwidx.a', 'mwidx.b'])
+        self.assertEqual([r.name for r in idx.ancestors('mwidx.b.d.e')], ['mwidx.b.d', 'mwidx.b', 'mwidx'])
+        self.assertEqual(list(idx.prefix('mwidx.nope')), [])
+        self.assertEqual(idx.children('mwidx.a'), [])
+        self.assertTrue(idx['mwidx.b'].is_package)
+        self.assertFalse(idx['mwidx.b.c'].is_package)
+        self.assertEqual(idx['mwidx.b.c'].path, os.path.join(self.tmp_dir, 'mwidx', 'b', 'c.py'))
+
+        with self.assertRaises(KeyError):
+            idx['mwidx.nope']  # pylint: disable=pointless-statement
+
+        path = os.path.join(self.tmp_dir, 'idx')
+        idx.save(path)
+        loaded = ModuleIndex.load(path)
+        self.assertEqual(list(loaded), list(idx))
+
+        loaded.discard('mwidx.b')
+        self.assertNotIn('mwidx.b', loaded)
+        self.assertIn('mwidx.b.c', loaded)
+        self.assertEqual(len(loaded), 5)
+        self.assertEqual([r.name for r in loaded.ancestors('mwidx.b.c')], ['mwidx'])
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import glob
+import importlib
+import logging
+import os
+import subprocess
+import sys
+import unittest
+
+import modwalk
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative microseconds "import modwalk" (and accessing modgen) may
+# take, per -X importtime; it took over 200ms when Twisted came with it,
+# and is well under 50ms without
+_IMPORT_BUDGET_US = 100000
+
+# Top-level packages the core walker must not import
+_HEAVY_PKGS = ('future', 'past', 'six', 'twisted')
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class InitTestCase(unittest.TestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def test_exports(self):
+        # type: (...) -> None
+        exported = {}
+
+        for path in glob.glob(os.path.join(os.path.dirname(modwalk.__file__), '*.py')):
+            sub_name = os.path.splitext(os.path.basename(path))[0]
+
+            if sub_name == '__init__':
+                continue
+
+            mod = importlib.import_module('modwalk.' + sub_name)
+
+            for name in getattr(mod, '__all__', ()):
+                exported[name] = sub_name
+
+        self.assertEqual(dict(modwalk._EXPORTS, precompile='precompile'), exported)  # pylint: disable=protected-access
+
+        for name, sub_name in exported.items():
+            self.assertIs(getattr(modwalk, name), getattr(sys.modules['modwalk.' + sub_name], name), name)
+
+        with self.assertRaises(AttributeError):
+            modwalk.nonesuch  # pylint: disable=no-member,pointless-statement
+
+    def test_import_lightweight(self):
+        # type: (...) -> None
+        if str is bytes:
+            self.skipTest('modwalk needs future on py2')
+
+        script = '; '.join((
+            'import sys',
+            'import modwalk',
+            'modwalk.modgen, modwalk.ModuleIndex, modwalk.WalkTable',
+            'print(" ".join(sorted(set(m.split(".")[0] for m in sys.modules) & set({!r}))))'.format(_HEAVY_PKGS),
+        ))
+
+        self.assertEqual(self._python('-c', script).strip(), '')
+
+    def test_import_budget(self):
+        # type: (...) -> None
+        if sys.version_info < (3, 7):
+            self.skipTest('-X importtime requires Python 3.7 or newer')
+
+        # The last line for modwalk is the package itself; its cumulative
+        # time includes everything it imported
+        lines = self._python('-X', 'importtime', '-c', 'import modwalk ; modwalk.modgen', stderr=subprocess.STDOUT).splitlines()
+        cumulative_us = [int(line.split('|')[1]) for line in lines if line.split('|')[-1].strip() == 'modwalk']
+        self.assertEqual(len(cumulative_us), 1)
+        self.assertLess(cumulative_us[0], _IMPORT_BUDGET_US)
+
+    # ---- Private methods -----------------------------------------------
+
+    def _python(self, *args, **kw):
+        # type: (*typing.Text, **typing.Any) -> typing.Text
+        env = dict(os.environ)
+        env['PYTHONPATH'] = _REPO_DIR
+        out = subprocess.check_output((sys.executable,) + args, cwd=_REPO_DIR, env=env, **kw)
+
+        return out.decode('utf-8')
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
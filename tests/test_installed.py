@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import os
+import sys
+import unittest
+
+from modwalk.installed import (
+    _metadata,
+    installedspecs,
+)
+from modwalk.modwalk import modgen
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class InstalledTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def setUp(self):
+        # type: (...) -> None
+        super(InstalledTestCase, self).setUp()
+        self.mktree({
+            'mwinst/__init__.py': '',
+            'mwinst/a.py': '',
+            'mwinst/sub/__init__.py': '',
+            'mwinst/sub/b.py': '',
+            'mwinst-1.0.dist-info/METADATA': 'Metadata-Version: 2.1\nName: mwinst\nVersion: 1.0\n',
+            'mwinst-1.0.dist-info/RECORD': '\n'.join((
+                '../../bin/mwinst,,',
+                'mwinst-1.0.dist-info/METADATA,,',
+                'mwinst-1.0.dist-info/RECORD,,',
+                'mwinst/__init__.py,sha256=x,0',
+                'mwinst/__pycache__/a.cpython-99.pyc,,',
+                'mwinst/a.py,sha256=x,0',
+                'mwinst/sub/__init__.py,sha256=x,0',
+                'mwinst/sub/b.py,sha256=x,0',
+                '',
+            )),
+            # mwgone is claimed, but not installed
+            'mwinst-1.0.dist-info/top_level.txt': 'mwgone\nmwinst\n',
+            'mwloose.py': '',
+        })
+
+    def test_installed(self):
+        # type: (...) -> None
+        if _metadata is None:
+            self.skipTest('importlib.metadata is unavailable')
+
+        self.assertEqual(installedspecs([self.tmp_dir]), [('mwgone', True), ('mwinst', True), ('mwloose', True)])
+        mod_specs = installedspecs([self.tmp_dir], submodules=True)
+        self.assertEqual(mod_specs, [
+            ('mwgone', True),
+            ('mwinst', False),
+            ('mwinst.a', False),
+            ('mwinst.sub', False),
+            ('mwinst.sub.b', False),
+            ('mwloose', True),
+        ])
+
+        # Visiting the modules directly imports nothing
+        self.assertEqual([mod.__name__ for mod in modgen(mod_specs, lazy=True)], ['mwinst', 'mwinst.a', 'mwinst.sub', 'mwinst.sub.b', 'mwloose'])
+        self.assertNotIn('mwinst', sys.modules)
+
+    def test_installed_cache(self):
+        # type: (...) -> None
+        cache_path = os.path.join(self.tmp_dir, 'cache', 'installed')
+        os.mkdir(os.path.dirname(cache_path))
+        mod_specs = installedspecs([self.tmp_dir], cache_path=cache_path)
+        self.assertTrue(os.path.exists(cache_path))
+        self.assertEqual(installedspecs([self.tmp_dir], cache_path=cache_path), mod_specs)
+
+        # The path changes, so the cache isn't consulted
+        self.assertEqual(installedspecs([self.tmp_dir, os.path.dirname(cache_path)], cache_path=cache_path), mod_specs)
+
+        self.mktree({'mwnew.py': ''})
+        st = os.stat(self.tmp_dir)
+        os.utime(self.tmp_dir, (st.st_atime, st.st_mtime + 10))
+        self.assertIn(('mwnew', True), installedspecs([self.tmp_dir], cache_path=cache_path))
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
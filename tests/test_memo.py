@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import functools
+import logging
+import os
+import subprocess
+import sys
+import unittest
+
+from twisted.internet import defer as t_i_defer
+
+from modwalk.memo import (
+    ResultCache,
+    memoized,
+)
+from modwalk.modwalk import modgen
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class MemoTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def test_memoized(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwmemo/__init__.py': '',
+            'mwmemo/a.py': 'VALUE = 1\n',
+            'mwmemo/b.py': 'VALUE = 2\n',
+        })
+
+        cache_path = os.path.join(self.tmp_dir, 'cache.db')
+        calls = []
+
+        def _analyze(mod, offset=0):
+            calls.append(mod.__name__)
+
+            return getattr(mod, 'VALUE', 0) + offset
+
+        def _walk(version=None):
+            cache = ResultCache(cache_path)
+
+            try:
+                return list(memoized(_analyze, cache, version, offset=10)(modgen([('mwmemo', True)], lazy=True)))
+            finally:
+                cache.close()
+
+        self.assertEqual(_walk(), [10, 11, 12])
+        self.assertEqual(calls, ['mwmemo', 'mwmemo.a', 'mwmemo.b'])
+        self._unload()
+        del calls[:]
+
+        # Unchanged modules aren't even imported
+        self.assertEqual(_walk(), [10, 11, 12])
+        self.assertEqual(calls, [])
+        self.assertNotIn('mwmemo.a', sys.modules)
+
+        with open(os.path.join(self.tmp_dir, 'mwmemo', 'b.py'), 'w') as f:
+            f.write('VALUE = 3\n')
+
+        self.assertEqual(_walk(), [10, 11, 13])
+        self.assertEqual(calls, ['mwmemo.b'])
+        self.assertNotIn('mwmemo.a', sys.modules)
+        del calls[:]
+
+        self.assertEqual(_walk(version=2), [10, 11, 13])
+        self.assertEqual(calls, ['mwmemo', 'mwmemo.a', 'mwmemo.b'])
+
+    def test_memoized_deferred(self):
+        # type: (...) -> None
+        self.mktree({'mwmemod.py': ''})
+        cache = ResultCache(os.path.join(self.tmp_dir, 'cache.db'))
+        self.addCleanup(cache.close)
+        d = t_i_defer.Deferred()
+        results = list(memoized(lambda mod: d, cache)(modgen([('mwmemod', False)])))
+        self.assertEqual(results, [d])
+        self.assertEqual(len(cache), 0)
+        d.callback('done')
+
+        self.assertEqual(list(memoized(lambda mod: d, cache)(modgen([('mwmemod', False)]))), ['done'])
+
+    def test_memoized_identity(self):
+        # type: (...) -> None
+        self.mktree({'mwmemoid.py': ''})
+        cache = ResultCache(os.path.join(self.tmp_dir, 'cache.db'))
+        self.addCleanup(cache.close)
+
+        def _walk(callback, version=None):
+            return list(memoized(callback, cache, version)(modgen([('mwmemoid', False)])))
+
+        def _adder(offset):
+            return lambda mod: offset
+
+        def _offset(mod, offset=0):
+            return offset
+
+        # Lambdas share a qualified name (and may not have a module), but
+        # not their code or closures
+        self.assertEqual(_walk(lambda mod: 'first'), ['first'])
+        self.assertEqual(_walk(lambda mod: 'second'), ['second'])
+        self.assertEqual(_walk(_adder(1)), [1])
+        self.assertEqual(_walk(_adder(2)), [2])
+        first = eval('lambda mod: "first"', {})  # pylint: disable=eval-used
+        self.assertIsNone(first.__module__)
+        self.assertEqual(_walk(first), ['first'])
+        self.assertEqual(_walk(eval('lambda mod: "other"', {})), ['other'])  # pylint: disable=eval-used
+
+        # Partials are identified by what they wrap, not their addresses
+        self.assertEqual(_walk(functools.partial(_offset, offset=3)), [3])
+        self.assertEqual(_walk(functools.partial(_offset, offset=4)), [4])
+        self.assertEqual(len(cache), 8)
+        self.assertEqual(_walk(functools.partial(_offset, offset=3)), [3])
+        self.assertEqual(len(cache), 8)
+
+        class _Analyzer(object):
+            def __call__(self, mod):
+                return 'called'
+
+        with self.assertRaises(ValueError):
+            memoized(_Analyzer(), cache)
+
+        self.assertEqual(_walk(_Analyzer(), version=1), ['called'])
+
+    def test_memoized_runs(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwmemorun.py': '',
+            'mwmemorunfn.py': 'import os\n\ndef analyze(mod, tags=frozenset()):\n    return os.getpid()\n',
+        })
+        script = '; '.join((
+            'import functools, mwmemorunfn',
+            'from modwalk.memo import memoized',
+            'from modwalk.modwalk import modgen',
+            'callback = functools.partial(mwmemorunfn.analyze, tags=frozenset(("a", "b", "c", "d")))',
+            'print(list(memoized(callback, "cache.db")(modgen([("mwmemorun", False)])))[0])',
+        ))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join((self.tmp_dir, _REPO_DIR))
+        pids = []
+
+        # Strings (and so sets of them) hash differently in each run
+        for hash_seed in ('1', '2'):
+            env['PYTHONHASHSEED'] = hash_seed
+            pids.append(subprocess.check_output([sys.executable, '-c', script], cwd=self.tmp_dir, env=env).strip())
+
+        self.assertEqual(pids[0], pids[1])
+
+    # ---- Private methods -----------------------------------------------
+
+    def _unload(self):
+        # type: (...) -> None
+        for mod_name in [mod_name for mod_name in sys.modules if mod_name.startswith('mwmemo')]:
+            del sys.modules[mod_name]
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import json
+import logging
+import os
+import time
+import unittest
+
+from modwalk.memprof import (
+    MemoryProfile,
+    MemoryUsage,
+    tracemalloc,
+)
+from modwalk.modwalk import modgen
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class MemoryProfileTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def setUp(self):
+        # type: (...) -> None
+        super(MemoryProfileTestCase, self).setUp()
+        self.mktree({
+            'mwmem/__init__.py': '',
+            'mwmem/big.py': 'BIG = [object() for _ in range(20000)]\n',
+            'mwmem/broken.py': 'raise RuntimeError()\n',
+            'mwmem/sub/__init__.py': '',
+            'mwmem/sub/small.py': 'SMALL = 1\n',
+        })
+
+    def test_memory(self):
+        # type: (...) -> None
+        if tracemalloc is None:
+            self.skipTest('tracemalloc is unavailable')
+
+        was_tracing = tracemalloc.is_tracing()
+        memory = MemoryProfile(blocks=True)
+        mod_names = [mod.__name__ for mod in modgen([('mwmem', True)], memory=memory)]
+        memory.stop()
+        self.assertEqual(tracemalloc.is_tracing(), was_tracing)
+
+        # Failed imports are charged, too
+        self.assertNotIn('mwmem.broken', mod_names)
+        self.assertEqual(sorted(usage.name for usage in memory), sorted(mod_names + ['mwmem.broken']))
+        self.assertGreater(memory['mwmem.big'].size, 20000 * 16)
+        self.assertGreaterEqual(memory['mwmem.big'].count, 20000)
+        self.assertEqual(memory.top(1)[0].name, 'mwmem.big')
+
+        subtree = memory.subtree('mwmem')
+        self.assertEqual(subtree.size, sum(usage.size for usage in memory))
+        self.assertEqual(subtree.count, sum(usage.count for usage in memory))
+        self.assertEqual(memory.subtree('mwmem.sub').size, memory['mwmem.sub'].size + memory['mwmem.sub.small'].size)
+        self.assertEqual(memory.top(1, subtrees=True)[0].name, 'mwmem')
+
+        table_lines = memory.table(2).splitlines()
+        self.assertEqual(len(table_lines), 3)
+        self.assertTrue(table_lines[1].startswith('mwmem.big '))
+
+        report_path = os.path.join(self.tmp_dir, 'memory.json')
+        memory.save(report_path, limit=3)
+
+        with open(report_path) as f:
+            report = json.load(f)
+
+        self.assertEqual(report['modules'][0]['name'], 'mwmem.big')
+        self.assertEqual(len(report['modules']), 3)
+        self.assertEqual(report['subtrees'][0], dict(memory.subtree('mwmem')._asdict()))
+
+    def test_memory_overhead(self):
+        # type: (...) -> None
+        if tracemalloc is None:
+            self.skipTest('tracemalloc is unavailable')
+
+        memory = MemoryProfile()
+        self.addCleanup(memory.stop)
+        memory.before()
+
+        # Grow the traced heap well beyond what a snapshot can be taken of
+        # quickly
+        heap = [object() for _ in range(200000)]  # noqa: F841 # pylint: disable=unused-variable
+        orig_take_snapshot = tracemalloc.take_snapshot
+
+        def _take_snapshot():
+            raise AssertionError('unexpected snapshot')
+
+        tracemalloc.take_snapshot = _take_snapshot
+        self.addCleanup(setattr, tracemalloc, 'take_snapshot', orig_take_snapshot)
+        start = time.time()
+
+        for i in range(1000):
+            usage = memory.after('mwmem{}'.format(i), memory.before())
+
+        # Without counting blocks, each measurement is (roughly) constant
+        # time, no matter how large the heap is
+        self.assertLess(time.time() - start, 1.0)
+        self.assertIsNotNone(usage.size)
+        self.assertIsNone(usage.count)
+        mod_names = [mod.__name__ for mod in modgen([('mwmem', True)], memory=memory)]
+        self.assertGreater(memory['mwmem.big'].size, 20000 * 16)
+        self.assertEqual(memory.top(1)[0].name, 'mwmem.big')
+        self.assertIn('-', memory.table(1).splitlines()[1])
+        self.assertEqual(memory.subtree('mwmem').size, sum(memory[mod_name].size for mod_name in mod_names + ['mwmem.broken']))
+
+    def test_memory_partial(self):
+        # type: (...) -> None
+        memory = MemoryProfile()
+        memory.record('mwmem', MemoryUsage('mwmem', 10, None, 0, False))
+        memory.record('mwmem.sub', MemoryUsage('mwmem.sub', 20, None, None, False))
+        memory.record('mwmem.sub.small', MemoryUsage('mwmem.sub.small', 30, None, 4096, False))
+
+        # Totals are of what could be measured, and are only missing where
+        # nothing could be
+        self.assertEqual(memory.subtree('mwmem'), MemoryUsage('mwmem', 60, None, 4096, True))
+        self.assertEqual(memory.subtree('mwmem.sub.small'), MemoryUsage('mwmem.sub.small', 30, None, 4096, False))
+
+        table_lines = memory.table(subtrees=True).splitlines()
+        self.assertEqual(len(table_lines), 5)
+        self.assertTrue(table_lines[1].startswith('mwmem * '))
+        self.assertTrue(table_lines[3].startswith('mwmem.sub.small '))
+        self.assertTrue(table_lines[4].startswith('* '))
+        self.assertNotIn('*', memory.table())
+
+    def test_memory_loaded(self):
+        # type: (...) -> None
+        import mwmem.sub  # noqa: F401 # pylint: disable=import-error,unused-variable
+        memory = MemoryProfile()
+        mod_names = [mod.__name__ for mod in modgen([('mwmem.sub', True)], memory=memory)]
+        memory.stop()
+
+        # Already imported modules aren't charged for anything
+        self.assertEqual(mod_names, ['mwmem.sub', 'mwmem.sub.small'])
+        self.assertEqual([usage.name for usage in memory], ['mwmem.sub.small'])
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
@@ -24,8 +24,21 @@ from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-n
 
 # ---- Imports -----------------------------------------------------------
 
+import importlib
 import logging
+import os
+import sys
 import unittest
+import zipfile
+
+from modwalk.modwalk import (
+    ModuleProxy,
+    _archivenames,
+    modgen,
+    submodnames,
+)
+
+from tests.pkgtree import PkgTreeTestCase
 
 # ---- Data --------------------------------------------------------------
 
@@ -36,7 +49,7 @@ _LOGGER = logging.getLogger(__name__)
 # ---- Classes -----------------------------------------------------------
 
 # ========================================================================
-class ModwalkTestCase(unittest.TestCase):
+class ModwalkTestCase(PkgTreeTestCase):
 
     longMessage = True
 
@@ -44,7 +57,156 @@ class ModwalkTestCase(unittest.TestCase):
 
     def test_modwalk(self):
         # type: (...) -> None
-        pass
+        self.mktree({
+            'mwpkg/__init__.py': '',
+            'mwpkg/a.py': '',
+            'mwpkg/b/__init__.py': '',
+            'mwpkg/b/c.py': '',
+            'mwpkg/b/not-a-module.py': '',
+            'mwpkg/d.txt': '',
+        })
+
+        mwpkg = importlib.import_module('mwpkg')
+        self.assertCountEqual([m.__name__ for m in modgen([(mwpkg, True)])], ('mwpkg', 'mwpkg.a', 'mwpkg.b', 'mwpkg.b.c'))
+        self.assertEqual([m.__name__ for m in modgen([(mwpkg, False)])], ['mwpkg'])
+
+    def test_lazy(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwlazy/__init__.py': '',
+            'mwlazy/a.py': '"""doc"""\nX = 1\n',
+            'mwlazy/b/__init__.py': 'raise RuntimeError("never import me")\n',
+            'mwlazy/b/c.py': '',
+        })
+
+        mods = dict((m.__name__, m) for m in modgen([('mwlazy', True)], lazy=True))
+        self.assertCountEqual(mods, ('mwlazy', 'mwlazy.a', 'mwlazy.b', 'mwlazy.b.c'))
+
+        for name in ('mwlazy', 'mwlazy.a', 'mwlazy.b', 'mwlazy.b.c'):
+            self.assertIsInstance(mods[name], ModuleProxy)
+            self.assertNotIn(name, sys.modules)
+
+        a = mods['mwlazy.a']
+        self.assertEqual(a.__file__, os.path.join(self.tmp_dir, 'mwlazy', 'a.py'))
+        self.assertFalse(hasattr(a, '__path__'))
+        self.assertEqual(mods['mwlazy.b'].__path__, [os.path.join(self.tmp_dir, 'mwlazy', 'b')])
+        self.assertFalse(a.loaded)
+        self.assertEqual(a.X, 1)
+        self.assertTrue(a.loaded)
+        self.assertIs(a.load(), sys.modules['mwlazy.a'])
+        self.assertEqual(a.__doc__, 'doc')
+        a.Y = 2
+        self.assertEqual(sys.modules['mwlazy.a'].Y, 2)
+
+        with self.assertRaisesRegex(RuntimeError, r'never import me'):
+            mods['mwlazy.b.c'].load()
+
+    def test_multi_entry_path(self):
+        # type: (...) -> None
+        other_dir = os.path.join(self.tmp_dir, 'other')
+        os.mkdir(other_dir)
+        self.mktree({
+            'mwsplit/__init__.py': '__path__.append({!r})\n'.format(os.path.join(other_dir, 'mwsplit')),
+            'mwsplit/a.py': '',
+        })
+        self.mktree({
+            'mwsplit/b.py': '',
+            'mwsplit/c/__init__.py': '',
+        }, root=other_dir)
+
+        mwsplit = importlib.import_module('mwsplit')
+        self.assertCountEqual(submodnames(mwsplit.__path__), ('a', 'b', 'c'))
+        self.assertCountEqual([m.__name__ for m in modgen([(mwsplit, True)])], ('mwsplit', 'mwsplit.a', 'mwsplit.b', 'mwsplit.c'))
+
+    def test_submodnames_suffixes(self):
+        # type: (...) -> None
+        ext_suffix = '.cpython-99-fake.so'
+        self.mktree({
+            'mwexts/__init__.py': '',
+            'mwexts/a.py': '',
+            'mwexts/a.pyc': '',
+            'mwexts/b' + ext_suffix: '',
+            'mwexts/__init__.pyc': '',
+            'mwexts/c.txt': '',
+        })
+
+        try:
+            from importlib import machinery
+        except ImportError:
+            self.skipTest('importlib.machinery unavailable')
+
+        orig_ext_suffixes = list(machinery.EXTENSION_SUFFIXES)
+        machinery.EXTENSION_SUFFIXES.insert(0, ext_suffix)
+
+        try:
+            self.assertCountEqual(submodnames([os.path.join(self.tmp_dir, 'mwexts')]), ('a', 'b'))
+        finally:
+            machinery.EXTENSION_SUFFIXES[:] = orig_ext_suffixes
+
+    def test_reuses_finder_listing(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwcached/__init__.py': '',
+            'mwcached/a.py': '',
+        })
+
+        # Importing a sub-module lists the package's directory
+        importlib.import_module('mwcached.a')
+        mwcached = sys.modules['mwcached']
+        path_entry = mwcached.__path__[0]
+        finder = sys.path_importer_cache.get(path_entry)
+
+        if not hasattr(finder, '_path_cache') \
+                or not hasattr(finder, '_fill_cache'):
+            self.skipTest('path entry finder does not cache listings')
+
+        # The import above already listed the directory, so neither reading
+        # it directly nor refilling the finder's cache should be necessary
+        fills = []
+        orig_fill_cache = finder._fill_cache  # pylint: disable=protected-access
+
+        def _fill_cache():
+            fills.append(path_entry)
+            orig_fill_cache()
+
+        def _listdir(path):
+            raise AssertionError('unexpected listing of "{}"'.format(path))
+
+        finder._fill_cache = _fill_cache  # pylint: disable=protected-access
+        self.addCleanup(delattr, finder, '_fill_cache')
+        orig_listdir = os.listdir
+        os.listdir = _listdir
+        self.addCleanup(setattr, os, 'listdir', orig_listdir)
+
+        self.assertCountEqual(submodnames(mwcached.__path__), ('a',))
+        self.assertEqual(fills, [])
+
+        # Once the directory changes, the finder's listing is refreshed
+        # (rather than read separately)
+        self.mktree({'mwcached/b.py': ''})
+        st = os.stat(path_entry)
+        os.utime(path_entry, (st.st_atime, st.st_mtime + 10))
+        self.assertCountEqual(submodnames(mwcached.__path__), ('a', 'b'))
+        self.assertEqual(fills, [path_entry])
+
+    def test_zip(self):
+        # type: (...) -> None
+        zip_path = os.path.join(self.tmp_dir, 'bundle.zip')
+
+        # No entries for directories, which zip files need not have
+        with zipfile.ZipFile(zip_path, 'w') as zip_file:
+            zip_file.writestr('mwzip/__init__.py', '')
+            zip_file.writestr('mwzip/a.py', '')
+            zip_file.writestr('mwzip/notes.txt', '')
+            zip_file.writestr('mwzip/sub/__init__.py', '')
+            zip_file.writestr('mwzip/sub/b.py', '')
+
+        sys.path.insert(0, zip_path)
+        self.addCleanup(sys.path.remove, zip_path)
+        self.assertCountEqual([m.__name__ for m in modgen([('mwzip', True)])], ('mwzip', 'mwzip.a', 'mwzip.sub', 'mwzip.sub.b'))
+        self.assertCountEqual([m.__name__ for m in modgen([('mwzip', True)], lazy=True)], ('mwzip', 'mwzip.a', 'mwzip.sub', 'mwzip.sub.b'))
+        self.assertEqual(sorted(_archivenames(zip_path)), ['mwzip/__init__.py', 'mwzip/a.py', 'mwzip/notes.txt', 'mwzip/sub/__init__.py', 'mwzip/sub/b.py'])
+        self.assertEqual(_archivenames(os.path.join(self.tmp_dir, 'missing.zip')), [])
 
 # ---- Initialization ----------------------------------------------------
 
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import os
+import unittest
+
+from modwalk.modwalk import modgen
+from modwalk.order import ImportTimes
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+_TREE = {
+    'mword/__init__.py': '',
+    'mword/b/__init__.py': '',
+    'mword/b/c.py': '',
+    'mword/a.py': '',
+    'mword/d/__init__.py': '',
+    'mword/d/e.py': '',
+}
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class OrderTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def setUp(self):
+        # type: (...) -> None
+        super(OrderTestCase, self).setUp()
+        self.mktree(_TREE)
+
+    def test_orders(self):
+        # type: (...) -> None
+        def _names(order):
+            return [m.__name__ for m in modgen([('mword', True)], order=order)]
+
+        self.assertEqual(_names(None), ['mword', 'mword.a', 'mword.b', 'mword.b.c', 'mword.d', 'mword.d.e'])
+        self.assertEqual(_names('dfs'), _names(None))
+        self.assertEqual(_names('bfs'), ['mword', 'mword.a', 'mword.b', 'mword.d', 'mword.b.c', 'mword.d.e'])
+        self.assertEqual(_names('sorted'), sorted(_names('bfs')))
+
+        with self.assertRaisesRegex(ValueError, r'unrecognized visit order'):
+            _names('nope')
+
+    def test_cheapest(self):
+        # type: (...) -> None
+        import_times = ImportTimes({
+            'mword.a': 5.0,
+            'mword.b': 0.5,
+            'mword.d': 1.0,
+            'mword.d.e': 0.1,
+        })
+
+        names = [m.__name__ for m in modgen([('mword', True)], order='cheapest', import_times=import_times)]
+        # mword.b.c is unknown, so it costs the mean (about 1.3, counting the
+        # time for mword, which is recorded when it is imported)
+        self.assertEqual(names, ['mword', 'mword.b', 'mword.d', 'mword.d.e', 'mword.b.c', 'mword.a'])
+
+    def test_record_import_times(self):
+        # type: (...) -> None
+        import_times = ImportTimes()
+        names = [m.__name__ for m in modgen([('mword', True)], import_times=import_times)]
+        self.assertCountEqual(names, ('mword', 'mword.a', 'mword.b', 'mword.b.c', 'mword.d', 'mword.d.e'))
+
+        for name in names:
+            self.assertIn(name, import_times)
+
+        path = os.path.join(self.tmp_dir, 'times')
+        import_times.save(path)
+        self.assertEqual(len(ImportTimes.load(path)), len(names))
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
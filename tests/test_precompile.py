@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import os
+import py_compile
+import sys
+import unittest
+
+from modwalk.precompile import (
+    precompile,
+    sourcefiles,
+)
+
+from tests.pkgtree import PkgTreeTestCase
+
+try:
+    # Imported lazily by the first process pool, so load it here, lest
+    # it be unloaded (and then reloaded, breaking pickling) between tests
+    import concurrent.futures.process  # noqa: F401 # pylint: disable=unused-import
+except ImportError:  # py2
+    pass
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class PrecompileTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def test_precompile(self):
+        # type: (...) -> None
+        if not hasattr(sys, 'pycache_prefix'):
+            self.skipTest('bytecode cache prefixes are unsupported')
+
+        files = dict(('mwpyc/m{:03}.py'.format(i), 'X = {}\n'.format(i)) for i in range(100))
+        files['mwpyc/__init__.py'] = ''
+        files['mwpyc/sub/__init__.py'] = ''
+        files['mwpyc/sub/broken.py'] = 'def (:\n'
+        self.mktree(files)
+
+        paths = sorted(sourcefiles([('mwpyc', True)]))
+        self.assertEqual(len(paths), 103)
+        self.assertNotIn('mwpyc', sys.modules)
+
+        prefix = os.path.join(self.tmp_dir, 'pyc')
+        compiled, failures = precompile(paths, pycache_prefix=prefix, jobs=2)
+        self.assertEqual(compiled, 102)
+        self.assertEqual([path for path, _ in failures], [os.path.join(self.tmp_dir, 'mwpyc', 'sub', 'broken.py')])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, 'mwpyc', '__pycache__')))
+        self.assertIsNone(sys.pycache_prefix)
+
+        pyc_names = []
+
+        for _, _, file_names in os.walk(prefix):
+            pyc_names.extend(file_names)
+
+        self.assertEqual(len(pyc_names), 102)
+
+        # Everything is now up to date
+        compiled, failures = precompile(paths, pycache_prefix=prefix, jobs=1)
+        self.assertEqual(compiled, 0)
+        self.assertEqual(len(failures), 1)
+
+    def test_precompile_hash_based(self):
+        # type: (...) -> None
+        if not hasattr(py_compile, 'PycInvalidationMode'):
+            self.skipTest('hash-based bytecode is unsupported')
+
+        self.mktree({
+            'mwpychash/__init__.py': '',
+            'mwpychash/checked.py': 'X = 1\n',
+            'mwpychash/unchecked.py': 'Y = 1\n',
+        })
+        paths = sorted(sourcefiles([('mwpychash', True)]))
+        prefix = os.path.join(self.tmp_dir, 'pyc')
+        precompile(paths, pycache_prefix=prefix, jobs=1)
+        orig_pycache_prefix = sys.pycache_prefix
+        sys.pycache_prefix = prefix
+
+        try:
+            for path, mode in (
+                (paths[1], py_compile.PycInvalidationMode.CHECKED_HASH),
+                (paths[2], py_compile.PycInvalidationMode.UNCHECKED_HASH),
+            ):
+                py_compile.compile(path, doraise=True, invalidation_mode=mode)
+        finally:
+            sys.pycache_prefix = orig_pycache_prefix
+
+        self.assertEqual(precompile(paths, pycache_prefix=prefix, jobs=1), (0, []))
+
+        # Only a checked hash is compared against the source
+        for path in paths[1:]:
+            with open(path, 'a') as f:
+                f.write('Z = 2\n')
+
+        self.assertEqual(precompile(paths, pycache_prefix=prefix, jobs=1), (1, []))
+
+    def test_precompile_inherited_prefix(self):
+        # type: (...) -> None
+        if not hasattr(sys, 'pycache_prefix'):
+            self.skipTest('bytecode cache prefixes are unsupported')
+
+        files = dict(('mwpycenv/m{:03}.py'.format(i), 'X = {}\n'.format(i)) for i in range(100))
+        files['mwpycenv/__init__.py'] = ''
+        self.mktree(files)
+        paths = sorted(sourcefiles([('mwpycenv', True)]))
+        prefix = os.path.join(self.tmp_dir, 'pyc')
+
+        # As if inherited from PYTHONPYCACHEPREFIX
+        orig_pycache_prefix = sys.pycache_prefix
+        orig_env_prefix = os.environ.get('PYTHONPYCACHEPREFIX')
+        sys.pycache_prefix = prefix
+        os.environ['PYTHONPYCACHEPREFIX'] = prefix
+
+        try:
+            self.assertEqual(precompile(paths[:10], jobs=1), (10, []))
+            self.assertEqual(precompile(paths, jobs=2), (91, []))
+            self.assertEqual(sys.pycache_prefix, prefix)
+        finally:
+            sys.pycache_prefix = orig_pycache_prefix
+
+            if orig_env_prefix is None:
+                del os.environ['PYTHONPYCACHEPREFIX']
+            else:
+                os.environ['PYTHONPYCACHEPREFIX'] = orig_env_prefix
+
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, 'mwpycenv', '__pycache__')))
+        pyc_names = []
+
+        for _, _, file_names in os.walk(prefix):
+            pyc_names.extend(file_names)
+
+        self.assertEqual(len(pyc_names), 101)
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
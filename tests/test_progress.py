@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import io
+import logging
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+from modwalk.modwalk import modgen
+from modwalk.progress import (
+    Progress,
+    estimate,
+)
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class _TtyIO(io.StringIO):
+
+    # ---- Overrides -----------------------------------------------------
+
+    def isatty(self):
+        # type: (...) -> bool
+        return True
+
+# ========================================================================
+class ProgressTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def test_estimate(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwprog/__init__.py': '',
+            'mwprog/a.py': '',
+            'mwprog/b.py': '',
+            'mwprog/sub/__init__.py': '',
+            'mwprog/sub/c.py': '',
+            'mwprog/sub/deeper/__init__.py': '',
+            'mwprog/sub/deeper/d.py': '',
+            'mwprog/not-a-module.py': '',
+            'mwprogmod.py': '',
+        })
+
+        mod_specs = [('mwprog', True), ('mwprogmod', False)]
+        self.assertEqual(estimate(mod_specs), 8)
+        self.assertEqual(estimate([('mwprog', False)]), 1)
+        self.assertNotIn('mwprog', sys.modules)
+        self.assertEqual(sum(1 for _ in modgen(mod_specs)), 8)
+
+    def test_progress(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwprog/__init__.py': '',
+            'mwprog/a.py': 'import time\ntime.sleep(0.2)\n',
+            'mwprog/broken.py': 'raise RuntimeError\n',
+        })
+
+        stream = _TtyIO()
+        progress = Progress(3, interval=0.05, stream=stream)
+        progress.start()
+        self.assertEqual([mod.__name__ for mod in modgen([('mwprog', True)], progress=progress)], ['mwprog', 'mwprog.a'])
+        progress.stop()
+        self.assertEqual(progress.done, 3)
+
+        lines = stream.getvalue().split('\r')
+        self.assertTrue(any('/3 modules' in line for line in lines), msg=lines)
+        self.assertTrue(lines[-1].startswith('3 modules in '), msg=lines)
+        self.assertTrue(lines[-1].endswith('\n'), msg=lines)
+
+        status = progress.status()
+        self.assertEqual((status.done, status.total, status.slowest), (3, 3, None))
+        self.assertEqual(status.eta_secs, 0)
+
+    def test_progress_lines(self):
+        # type: (...) -> None
+        stream = io.StringIO()
+        progress = Progress(interval=0.01, stream=stream)
+        progress.start()
+        progress.finished('mwprog')
+        time.sleep(0.05)
+        progress.stop()
+        lines = stream.getvalue().splitlines()
+        self.assertNotIn('\r', stream.getvalue())
+        self.assertTrue(lines[0].startswith('1 modules, '))
+        self.assertRegex(lines[-1], r'^1 modules in \d+\.\ds$')
+
+    def test_progress_main(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwprogmain/__init__.py': '',
+            'mwprogmain/a.py': '',
+        })
+
+        # Shown without raising the log level, even though standard error
+        # isn't a terminal
+        env = dict(os.environ)
+        env.pop('LOG_LVL', None)
+        env['PYTHONPATH'] = os.pathsep.join((self.tmp_dir, _REPO_DIR))
+        proc = subprocess.Popen(
+            [sys.executable, '-c', 'from modwalk.main import main ; main()', '--progress', '-M', 'mwprogmain'],
+            cwd=self.tmp_dir,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        out, err = proc.communicate()
+        self.assertEqual(proc.returncode, 0)
+        self.assertEqual(out.decode('utf-8').split(), ['mwprogmain', 'mwprogmain.a'])
+        self.assertRegex(err.decode('utf-8'), r'(?m)^2 modules in \d+\.\ds$')
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
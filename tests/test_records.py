@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import os
+import unittest
+
+from modwalk.modwalk import modgen
+from modwalk.records import (
+    STATUS_FAILED,
+    STATUS_LOADED,
+    STATUS_PROXIED,
+    WalkTable,
+)
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class WalkTableTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def setUp(self):
+        # type: (...) -> None
+        super(WalkTableTestCase, self).setUp()
+        self.mktree({
+            'mwrec/__init__.py': '',
+            'mwrec/a.py': '',
+            'mwrec/b/__init__.py': '',
+            'mwrec/b/c.py': '',
+            'mwrec/bad.py': 'raise ImportError("nope")\n',
+        })
+
+    def test_records(self):
+        # type: (...) -> None
+        table = WalkTable()
+        names = [m.__name__ for m in modgen([('mwrec', True)], records=table)]
+        self.assertEqual(names, ['mwrec', 'mwrec.a', 'mwrec.b', 'mwrec.b.c'])
+        self.assertEqual(len(table), 5)
+        self.assertIn('mwrec.bad', table)
+
+        root = table[table.find('mwrec')]
+        self.assertEqual((root.parent, root.depth, root.is_package, root.status), (-1, 0, True, STATUS_LOADED))
+        self.assertEqual(root.path, os.path.join(self.tmp_dir, 'mwrec', '__init__.py'))
+
+        c = table[table.find('mwrec.b.c')]
+        self.assertEqual(c.parent, table.find('mwrec.b'))
+        self.assertEqual((c.depth, c.is_package, c.status), (2, False, STATUS_LOADED))
+        self.assertEqual(c.path, os.path.join(self.tmp_dir, 'mwrec', 'b', 'c.py'))
+
+        bad = table[table.find('mwrec.bad')]
+        self.assertEqual((bad.parent, bad.depth, bad.path, bad.status), (0, 1, None, STATUS_FAILED))
+
+    def test_lazy_records(self):
+        # type: (...) -> None
+        table = WalkTable()
+        list(modgen([('mwrec', True)], lazy=True, records=table))
+        self.assertEqual(set(r.status for r in table), set((STATUS_PROXIED,)))
+        self.assertTrue(table[table.find('mwrec.b')].is_package)
+
+    def test_revisit(self):
+        # type: (...) -> None
+        table = WalkTable()
+        names = [m.__name__ for m in modgen([('mwrec', True), ('mwrec.a', False), ('mwrec.bad', False)], records=table)]
+
+        # The table is what marks modules as visited, but failed ones are
+        # tried again
+        self.assertEqual(sorted(names), ['mwrec', 'mwrec.a', 'mwrec.b', 'mwrec.b.c'])
+        self.assertEqual(len(table), 5)
+        self.assertEqual(table[table.find('mwrec.bad')].status, STATUS_FAILED)
+
+    def test_replace(self):
+        # type: (...) -> None
+        table = WalkTable()
+        self.assertEqual(table.append('x', status=STATUS_FAILED), 0)
+        self.assertEqual(table.append('x', '/y/x.py'), 0)
+        self.assertEqual(len(table), 1)
+        self.assertEqual(table[0].status, STATUS_LOADED)
+        self.assertEqual(table[0].path, os.path.join('/y', 'x.py'))
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
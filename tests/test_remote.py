@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import os
+import subprocess
+import sys
+import unittest
+
+from modwalk import agent
+from modwalk.modwalk import modgen
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class RemoteTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def setUp(self):
+        # type: (...) -> None
+        super(RemoteTestCase, self).setUp()
+        self.mktree({
+            'mwremote/__init__.py': '',
+            'mwremote/a.py': 'print("noise")\n',
+            'mwremote/broken.py': 'raise RuntimeError("broken")\n',
+            'mwremote/sub/__init__.py': '',
+            'mwremote/sub/b.py': '',
+        })
+
+    def test_agent_walk(self):
+        # type: (...) -> None
+        records = list(agent.walk([('mwremote', True), ('mwremote.a', False), ('mwnonesuch', False)]))
+        self.assertEqual([(name, is_package) for name, _, is_package, _ in records], [
+            ('mwremote', 1),
+            ('mwremote.a', 0),
+            ('mwremote.broken', 0),
+            ('mwremote.sub', 1),
+            ('mwremote.sub.b', 0),
+            ('mwnonesuch', 0),
+        ])
+        self.assertEqual(records[1][1], os.path.join(self.tmp_dir, 'mwremote', 'a.py'))
+        self.assertEqual([record[3] for record in records if record[3] is not None], ['RuntimeError: broken', "ModuleNotFoundError: No module named 'mwnonesuch'"])
+
+    def test_agent_matches_modgen(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwremote/ns/c.py': '',
+            'mwremote/ns/deeper/d.py': '',
+            'mwremote/__pycache__/stale.py': '',
+            'mwremote/not-a-module.py': '',
+            'mwremote/not-a-package/e.py': '',
+        })
+        records = list(agent.walk([('mwremote', True)]))
+        mod_names = [mod.__name__ for mod in modgen([('mwremote', True)])]
+
+        # Namespace sub-packages are walked, too
+        self.assertIn('mwremote.ns.deeper.d', mod_names)
+        self.assertEqual(sorted(name for name, _, _, error in records if error is None), sorted(mod_names))
+
+    def test_interpreters(self):
+        # type: (...) -> None
+        env = dict(os.environ)
+        env['PYTHONPATH'] = _REPO_DIR
+        env['LOG_LVL'] = 'INFO'
+        args = [
+            sys.executable, '-c', 'from modwalk.main import main ; main()',
+            '--interpreter', sys.executable,
+            '--interpreter', os.path.join(self.tmp_dir, 'nonesuch'),
+            '-M', 'mwremote',
+        ]
+
+        # The agent's sys.path starts with its working directory
+        proc = subprocess.Popen(args, env=env, cwd=self.tmp_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        stdout, stderr = proc.communicate()
+        self.assertEqual(proc.returncode, 0, msg=stderr)
+        self.assertEqual(stdout.splitlines(), ['{}\t{}'.format(sys.executable, name) for name in ('mwremote', 'mwremote.a', 'mwremote.sub', 'mwremote.sub.b')])
+        self.assertIn('noise', stderr)
+        self.assertIn('unable to load "mwremote.broken" in "{}" (skipping): RuntimeError: broken'.format(sys.executable), stderr)
+        self.assertIn('walked 5 module(s) in "{}"'.format(sys.executable), stderr)
+        self.assertIn('unable to run agent in "{}"'.format(os.path.join(self.tmp_dir, 'nonesuch')), stderr)
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import re
+import sys
+import unittest
+
+from modwalk.modwalk import modgen
+from modwalk.sample import Sample
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class SampleTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def setUp(self):
+        # type: (...) -> None
+        super(SampleTestCase, self).setUp()
+        files = {}
+
+        for pkg_name, num_mods in (('mwsamplea', 60), ('mwsampleb', 30), ('mwsamplec', 0)):
+            files[pkg_name + '/__init__.py'] = ''
+            files[pkg_name + '/sub/__init__.py'] = ''
+
+            for i in range(num_mods):
+                files['{}/{}m{:02}.py'.format(pkg_name, 'sub/' if i % 2 else '', i)] = ''
+
+        self.mktree(files)
+        self.mod_specs = [('mwsamplea', True), ('mwsampleb', True), ('mwsamplec', True)]
+
+    def test_sample(self):
+        # type: (...) -> None
+        sample = Sample(self.mod_specs, count=10, seed='spam')
+        mod_names = [mod.__name__ for mod in modgen(self.mod_specs, prefilter=sample)]
+        self.assertEqual(sorted(mod_names), list(sample))
+
+        for pkg_name in ('mwsamplea', 'mwsampleb', 'mwsamplec'):
+            self.assertIn(pkg_name, mod_names)
+            self.assertTrue(any(mod_name.startswith(pkg_name + '.') for mod_name in mod_names), msg=pkg_name)
+
+        leaf_names = [mod_name for mod_name in mod_names if re.search(r'\.m\d+\Z', mod_name)]
+        self.assertTrue(8 <= len(leaf_names) <= 12, msg=leaf_names)
+        self.assertEqual([mod_name for mod_name in sys.modules if mod_name.startswith('mwsample') and mod_name not in sample], [])
+
+        self.assertEqual(list(Sample(self.mod_specs, count=10, seed='spam')), list(sample))
+        self.assertNotEqual(list(Sample(self.mod_specs, count=10, seed='eggs')), list(sample))
+
+        # Each one's sample is independent of the others
+        sample_a = Sample(self.mod_specs[:1], fraction=0.2, seed='spam')
+        self.assertEqual([mod_name for mod_name in Sample(self.mod_specs, fraction=0.2, seed='spam') if mod_name.startswith('mwsamplea')], list(sample_a))
+
+    def test_sample_bounds(self):
+        # type: (...) -> None
+        self.assertEqual(list(Sample(self.mod_specs[-1:], fraction=0)), ['mwsamplec', 'mwsamplec.sub'])
+        self.assertEqual(len(Sample(self.mod_specs, fraction=1)), 3 + 3 + 60 + 30)
+
+        with self.assertRaises(ValueError):
+            Sample(self.mod_specs)
+
+        with self.assertRaises(ValueError):
+            Sample(self.mod_specs, fraction=0.5, count=5)
+
+        with self.assertRaises(ValueError):
+            Sample(self.mod_specs, fraction=1.5)
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+# ========================================================================
+"""
+Copyright and other protections apply. Please see the accompanying
+:doc:`LICENSE <LICENSE>` and :doc:`CREDITS <CREDITS>` file(s) for rights
+and restrictions governing use of this software. All rights not expressly
+waived or licensed are reserved. If those files are missing or appear to
+be modified from their originals, then please contact the author before
+viewing or using this software in any capacity.
+"""
+# ========================================================================
+
+from __future__ import absolute_import, division, print_function
+
+TYPE_CHECKING = False  # from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import typing  # noqa: F401 # pylint: disable=import-error,unused-import,useless-suppression
+
+from builtins import *  # noqa: F401,F403 # pylint: disable=redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+from future.builtins.disabled import *  # noqa: F401,F403 # pylint: disable=no-name-in-module,redefined-builtin,unused-wildcard-import,useless-suppression,wildcard-import
+
+# ---- Imports -----------------------------------------------------------
+
+import logging
+import os
+import sys
+import types
+import unittest
+
+from modwalk.modwalk import modgen
+from modwalk.symbols import (
+    SymbolIndex,
+    SymbolRef,
+)
+
+from tests.pkgtree import PkgTreeTestCase
+
+# ---- Data --------------------------------------------------------------
+
+__all__ = ()
+
+_LOGGER = logging.getLogger(__name__)
+
+_FILES = {
+    'mwsym/__init__.py': 'from .impl import Thing, helper\nimport os\n__all__ = (\'Thing\',)\n',
+    'mwsym/impl.py': 'import sys\nfrom os import path as _path\n\nclass Thing(object):\n    pass\n\ndef helper():\n    pass\n\ntry:\n    LIMIT = 1\nexcept ImportError:\n    LIMIT = None\n\n_private = 0\n',
+}
+
+# ---- Classes -----------------------------------------------------------
+
+# ========================================================================
+class SymbolIndexTestCase(PkgTreeTestCase):
+
+    longMessage = True
+
+    # ---- Public hooks --------------------------------------------------
+
+    def test_collect(self):
+        # type: (...) -> None
+        self.mktree(_FILES)
+
+        for static in (True, False):
+            idx = SymbolIndex()
+            mods = list(idx.collect(modgen([('mwsym', True)], lazy=static), static))
+            self.assertEqual([mod.__name__ for mod in mods], ['mwsym', 'mwsym.impl'], msg='static={}'.format(static))
+            self.assertEqual(idx.names('mwsym'), ('Thing',), msg='static={}'.format(static))
+            self.assertEqual(sorted(idx.names('mwsym.impl')), ['LIMIT', 'Thing', 'helper'], msg='static={}'.format(static))
+            self.assertEqual(idx.find('Thing'), [SymbolRef('mwsym.impl', True), SymbolRef('mwsym', False)], msg='static={}'.format(static))
+            self.assertEqual(idx.find('helper'), [SymbolRef('mwsym.impl', True)], msg='static={}'.format(static))
+            self.assertEqual(idx.find('os'), [], msg='static={}'.format(static))
+            self.assertEqual(idx.find('_private'), [], msg='static={}'.format(static))
+
+            if static:
+                self.assertNotIn('mwsym.impl', sys.modules)
+
+    def test_deleted(self):
+        # type: (...) -> None
+        files = dict(_FILES)
+        files.update({
+            'mwsym/gone.py': 'GONE = 1\n',
+            'mwsym/sub/__init__.py': 'SUB = 1\n',
+            'mwsymother.py': 'OTHER = 1\n',
+        })
+        self.mktree(files)
+        pkg_dir = os.path.join(self.tmp_dir, 'mwsym')
+        mod_specs = [('mwsym', True)]
+        idx = SymbolIndex()
+        list(idx.collect(modgen(mod_specs + [('mwsymother', False)], lazy=True), static=True))
+        self.assertEqual(list(idx), ['mwsym', 'mwsym.gone', 'mwsym.impl', 'mwsym.sub', 'mwsymother'])
+
+        os.remove(os.path.join(pkg_dir, 'gone.py'))
+        st = os.stat(pkg_dir)
+        os.utime(pkg_dir, (st.st_atime, st.st_mtime + 10))
+        list(idx.collect(modgen(mod_specs, lazy=True), static=True, roots=mod_specs))
+
+        # Only modules beneath the walked roots are removed
+        self.assertEqual(list(idx), ['mwsym', 'mwsym.impl', 'mwsym.sub', 'mwsymother'])
+        self.assertEqual(idx.find('GONE'), [])
+        self.assertEqual(idx.find('OTHER'), [SymbolRef('mwsymother', True)])
+
+        # Without recursion, only the root itself is considered
+        list(idx.collect((), roots=[('mwsym', False), ('mwsymother', False)]))
+        self.assertEqual(list(idx), ['mwsym.impl', 'mwsym.sub'])
+
+        # Generated modules whose files have gone away are removed, too
+        sub = types.ModuleType(str('mwsym.sub'))
+        sub.__file__ = os.path.join(pkg_dir, 'sub', '__init__.py')
+        os.remove(sub.__file__)
+        list(idx.collect([sub]))
+        self.assertEqual(list(idx), ['mwsym.impl'])
+        self.assertEqual(idx.find('SUB'), [])
+
+    def test_foreign_instance(self):
+        # type: (...) -> None
+        self.mktree({
+            'mwsyminst.py': 'import logging\nfrom collections import OrderedDict\nfrom os.path import join\n\nLOGGER = logging.getLogger(__name__)\nCACHE = OrderedDict()\n',
+        })
+        idx = SymbolIndex()
+        list(idx.collect(modgen([('mwsyminst', False)])))
+        self.assertEqual(sorted(idx.names('mwsyminst')), ['CACHE', 'LOGGER', 'OrderedDict', 'join'])
+
+        # Module-level instances of foreign classes are defined where they
+        # are bound; imported classes and functions are not
+        self.assertEqual(idx.find('LOGGER'), [SymbolRef('mwsyminst', True)])
+        self.assertEqual(idx.find('CACHE'), [SymbolRef('mwsyminst', True)])
+        self.assertEqual(idx.find('OrderedDict'), [SymbolRef('mwsyminst', False)])
+        self.assertEqual(idx.find('join'), [SymbolRef('mwsyminst', False)])
+
+    def test_incremental(self):
+        # type: (...) -> None
+        self.mktree(_FILES)
+        impl_path = os.path.join(self.tmp_dir, 'mwsym', 'impl.py')
+        idx_path = os.path.join(self.tmp_dir, 'symbols.z')
+        idx = SymbolIndex()
+        list(idx.collect(modgen([('mwsym', True)], lazy=True), static=True))
+        idx.save(idx_path)
+
+        idx = SymbolIndex.load(idx_path)
+        self.assertEqual(list(idx), ['mwsym', 'mwsym.impl'])
+        self.assertEqual(idx.find('Thing'), [SymbolRef('mwsym.impl', True), SymbolRef('mwsym', False)])
+        self.assertTrue(idx.isfresh('mwsym.impl', impl_path))
+
+        with open(impl_path, 'a') as f:
+            f.write('\ndef other():\n    pass\n')
+
+        st = os.stat(impl_path)
+        os.utime(impl_path, (st.st_atime, st.st_mtime + 10))
+        self.assertFalse(idx.isfresh('mwsym.impl', impl_path))
+        list(idx.collect(modgen([('mwsym', True)], lazy=True), static=True))
+        self.assertEqual(idx.find('other'), [SymbolRef('mwsym.impl', True)])
+        self.assertTrue(idx.isfresh('mwsym.impl', impl_path))
+
+        idx.discard('mwsym.impl')
+        self.assertNotIn('mwsym.impl', idx)
+        self.assertEqual(idx.find('Thing'), [SymbolRef('mwsym', False)])
+        self.assertEqual(idx.find('other'), [])
+
+# ---- Initialization ----------------------------------------------------
+
+if __name__ == '__main__':
+    import tests  # noqa: F401; pylint: disable=unused-import
+    unittest.main()